@@ -1,10 +1,31 @@
 import fs from 'fs'
 import path from 'path'
+import zlib from 'zlib'
 import { fileURLToPath } from 'url'
 
 const __filename = fileURLToPath(import.meta.url)
 const __dirname = path.dirname(__filename)
 
+const DEFAULT_PAGE_SIZE = 100
+
+// Page shards written by scripts/data_shards.py: <name>.shards/manifest.json + page-NNNNN.json.gz
+// A manifest whose recorded source size or mtime doesn't match the JSON file is stale and ignored
+function readManifest(filePath) {
+  const manifestPath = path.join(
+    path.dirname(filePath), `${path.basename(filePath, '.json')}.shards`, 'manifest.json'
+  )
+  if (!fs.existsSync(manifestPath)) {
+    return null
+  }
+  const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'))
+  // bigint stat: nanosecond mtimes don't fit in a JS number, so the manifest stores a string
+  const stats = fs.statSync(filePath, { bigint: true })
+  if (manifest.source_bytes !== Number(stats.size) || manifest.source_mtime_ns !== String(stats.mtimeNs)) {
+    return null
+  }
+  return { ...manifest, dir: path.dirname(manifestPath) }
+}
+
 export default async function handler(req, res) {
   // Set CORS headers
   res.setHeader('Access-Control-Allow-Credentials', true)
@@ -21,7 +42,7 @@ export default async function handler(req, res) {
   }
 
   try {
-    const { file } = req.query
+    const { file, page } = req.query
     const dataDir = path.join(__dirname, '../scripts/data')
 
     // If file parameter is provided, return the file contents
@@ -39,6 +60,45 @@ export default async function handler(req, res) {
         return res.status(404).json({ error: 'File not found' })
       }
 
+      // Paged read: one gzip'd shard when the file has been sharded, else slice the full file
+      if (page !== undefined) {
+        const pageNumber = parseInt(page, 10)
+        if (isNaN(pageNumber) || pageNumber < 0) {
+          return res.status(400).json({ error: 'page must be a non-negative integer' })
+        }
+
+        const manifest = readManifest(filePath)
+        if (manifest) {
+          if (pageNumber >= manifest.pages) {
+            return res.status(404).json({ error: 'Page not found' })
+          }
+          const shard = manifest.shards[pageNumber]
+          const rows = JSON.parse(zlib.gunzipSync(fs.readFileSync(path.join(manifest.dir, shard.file))).toString('utf8'))
+          return res.status(200).json({
+            filename: file,
+            page: pageNumber,
+            pages: manifest.pages,
+            page_size: manifest.page_size,
+            total_rows: manifest.total_rows,
+            data: rows
+          })
+        }
+
+        const all = JSON.parse(fs.readFileSync(filePath, 'utf8'))
+        if (!Array.isArray(all)) {
+          return res.status(400).json({ error: 'Paging needs a JSON array of properties' })
+        }
+        const pages = Math.ceil(all.length / DEFAULT_PAGE_SIZE)
+        return res.status(200).json({
+          filename: file,
+          page: pageNumber,
+          pages,
+          page_size: DEFAULT_PAGE_SIZE,
+          total_rows: all.length,
+          data: all.slice(pageNumber * DEFAULT_PAGE_SIZE, (pageNumber + 1) * DEFAULT_PAGE_SIZE)
+        })
+      }
+
       // Read and return the file
       const fileContent = fs.readFileSync(filePath, 'utf8')
       const data = JSON.parse(fileContent)
@@ -59,10 +119,13 @@ export default async function handler(req, res) {
       .map(file => {
         const filePath = path.join(dataDir, file)
         const stats = fs.statSync(filePath)
+        const manifest = readManifest(filePath)
         return {
           name: file,
           size: stats.size,
-          modified: stats.mtime
+          modified: stats.mtime,
+          rows: manifest ? manifest.total_rows : null,
+          pages: manifest ? manifest.pages : null
         }
       })
       .sort((a, b) => b.modified - a.modified) // Sort by most recent first
@@ -16,7 +16,7 @@ export default async function handler(req, res) {
   }
 
   try {
-    const { country = 'CA', pack_id } = req.query
+    const { country = 'CA', pack_id, near, like } = req.query
 
     // Validate country
     if (!['US', 'CA'].includes(country)) {
@@ -32,6 +32,35 @@ export default async function handler(req, res) {
       }
     }
 
+    // Validate near/like if provided
+    const uuidPattern = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i
+    if (near && !uuidPattern.test(near)) {
+      return res.status(400).json({ error: 'near must be a property id' })
+    }
+    if (like && !uuidPattern.test(like)) {
+      return res.status(400).json({ error: 'like must be a property id' })
+    }
+
+    // Paired modes: a random precomputed neighbour of `near` (scripts/pair_index.py)
+    // or lookalike of `like` (scripts/lookalike_index.py).
+    // Properties without one fall through to a random property.
+    const pairing = near
+      ? { fn: 'get_nearby_property', source: near }
+      : like ? { fn: 'get_lookalike_property', source: like } : null
+    if (pairing) {
+      const { data: paired, error: pairedError } = await supabase
+        .rpc(pairing.fn, { source_property_id: pairing.source })
+
+      if (pairedError) {
+        console.error('Database error:', pairedError)
+        return res.status(500).json({ error: 'Failed to fetch property' })
+      }
+
+      if (paired && paired.length > 0) {
+        return res.status(200).json(paired[0])
+      }
+    }
+
     // Get random property using the database function
     // If pack_id is provided, pass it; otherwise null will get any pack
     const { data, error } = await supabase
@@ -0,0 +1,96 @@
+-- ============================================
+-- Migration 008: Property Sync Columns for Diff Import
+-- Supports import_pack2_to_supabase.py --diff (only write changed listings)
+-- ============================================
+
+-- Step 1: Track listings that disappeared from the latest scrape
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS delisted_at TIMESTAMP WITH TIME ZONE;
+
+-- Step 2: Compact image fingerprint so the snapshot doesn't have to ship full URLs
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS image_hash TEXT
+  GENERATED ALWAYS AS (md5(COALESCE(image_url, ''))) STORED;
+
+-- Step 3: Replace the partial unique index with a full one
+-- PostgREST upserts (on_conflict=mls_number) cannot target a partial index.
+-- NULLs are still distinct, so properties without an MLS number are unaffected.
+DROP INDEX IF EXISTS idx_properties_mls_number;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_properties_mls_number ON properties(mls_number);
+
+-- Step 4: Index for keyset pagination of the per-pack snapshot
+CREATE INDEX IF NOT EXISTS idx_properties_pack_mls ON properties(pack_id, mls_number);
+
+-- Step 5: Exclude delisted properties from the game
+CREATE OR REPLACE FUNCTION get_random_property(
+  property_country VARCHAR(2),
+  filter_pack_id INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  mls_number VARCHAR(50),
+  property_id VARCHAR(50),
+  address TEXT,
+  city VARCHAR(255),
+  state VARCHAR(50),
+  province VARCHAR(50),
+  postal_code VARCHAR(20),
+  country VARCHAR(2),
+  latitude NUMERIC,
+  longitude NUMERIC,
+  price INTEGER,
+  bedrooms INTEGER,
+  bathrooms INTEGER,
+  sqft INTEGER,
+  lot_size VARCHAR(50),
+  year_built INTEGER,
+  property_type VARCHAR(100),
+  listing_url TEXT,
+  image_url TEXT,
+  image_url_med TEXT,
+  image_url_low TEXT,
+  local_image_path TEXT,
+  pack_id INTEGER
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    p.id,
+    p.mls_number,
+    p.property_id,
+    p.address,
+    p.city,
+    p.state,
+    p.province,
+    p.postal_code,
+    p.country,
+    p.latitude,
+    p.longitude,
+    p.price,
+    p.bedrooms,
+    p.bathrooms,
+    p.sqft,
+    p.lot_size,
+    p.year_built,
+    p.property_type,
+    p.listing_url,
+    p.image_url,
+    p.image_url_med,
+    p.image_url_low,
+    p.local_image_path,
+    COALESCE(p.pack_id, 1) as pack_id -- Default to Pack 1 if NULL
+  FROM properties p
+  WHERE p.country = property_country
+    AND p.delisted_at IS NULL
+    AND (filter_pack_id IS NULL OR COALESCE(p.pack_id, 1) = filter_pack_id)
+  ORDER BY RANDOM()
+  LIMIT 1;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'Property sync columns added (delisted_at, image_hash)';
+  RAISE NOTICE 'Next: python import_pack2_to_supabase.py --diff';
+  RAISE NOTICE '================================================';
+END $$;
@@ -0,0 +1,239 @@
+-- ============================================
+-- Migration 009: Precomputed Per-Pack Leaderboard Ranks
+-- Maintained by scripts/rank_leaderboard.py (best score per player, dense rank,
+-- score-percentile buckets) so leaderboard and percentile reads are index lookups
+-- ============================================
+
+-- Step 1: Best entry per player per pack
+-- player_key is lower(trim(player_name)); the displayed name/selfie come from the best entry
+CREATE TABLE IF NOT EXISTS leaderboard_ranks (
+  pack_id INTEGER NOT NULL REFERENCES packs(id),
+  player_key VARCHAR(50) NOT NULL,
+  player_name VARCHAR(50) NOT NULL,
+  best_entry_id UUID NOT NULL,
+  best_score INTEGER NOT NULL,
+  correct_guesses INTEGER DEFAULT 0,
+  total_guesses INTEGER DEFAULT 0,
+  selfie_url TEXT,
+  achieved_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  dense_rank INTEGER NOT NULL,
+  percentile INTEGER NOT NULL,  -- % of the pack's players with a lower best score
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL,
+  PRIMARY KEY (pack_id, player_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leaderboard_ranks_pack_rank
+  ON leaderboard_ranks(pack_id, dense_rank, achieved_at);
+
+-- Step 2: One bucket per distinct best score - "you beat X% of players" for any score
+CREATE TABLE IF NOT EXISTS leaderboard_score_buckets (
+  pack_id INTEGER NOT NULL REFERENCES packs(id),
+  score INTEGER NOT NULL,
+  dense_rank INTEGER NOT NULL,
+  players_at_score INTEGER NOT NULL,
+  players_below INTEGER NOT NULL,
+  percentile INTEGER NOT NULL,
+  PRIMARY KEY (pack_id, score)
+);
+
+-- Step 3: Per-pack high-water mark for incremental refreshes
+CREATE TABLE IF NOT EXISTS leaderboard_rank_state (
+  pack_id INTEGER PRIMARY KEY REFERENCES packs(id),
+  high_water_mark TIMESTAMP WITH TIME ZONE,
+  player_count INTEGER NOT NULL DEFAULT 0,
+  refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL
+);
+
+-- Step 4: Public read, writes only through the service role (rank_leaderboard.py)
+ALTER TABLE leaderboard_ranks ENABLE ROW LEVEL SECURITY;
+ALTER TABLE leaderboard_score_buckets ENABLE ROW LEVEL SECURITY;
+ALTER TABLE leaderboard_rank_state ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON leaderboard_ranks;
+CREATE POLICY "Allow public read access" ON leaderboard_ranks FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow public read access" ON leaderboard_score_buckets;
+CREATE POLICY "Allow public read access" ON leaderboard_score_buckets FOR SELECT USING (true);
+DROP POLICY IF EXISTS "Allow public read access" ON leaderboard_rank_state;
+CREATE POLICY "Allow public read access" ON leaderboard_rank_state FOR SELECT USING (true);
+
+-- Step 5: Serve per-pack leaderboards from the rank table once it has been built
+-- (one row per player), merged with scores newer than the pack's high-water mark
+-- so new scores show up before the next refresh. All-pack and not-yet-ranked
+-- packs keep the raw query.
+DROP FUNCTION IF EXISTS get_top_scores(INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION get_top_scores(limit_count INTEGER DEFAULT 10, filter_pack_id INTEGER DEFAULT NULL)
+RETURNS TABLE (
+  id UUID,
+  player_name VARCHAR(50),
+  score INTEGER,
+  correct_guesses INTEGER,
+  total_guesses INTEGER,
+  pack_id INTEGER,
+  selfie_url TEXT,
+  created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+DECLARE
+  hwm TIMESTAMP WITH TIME ZONE;
+BEGIN
+  IF filter_pack_id IS NOT NULL THEN
+    SELECT s.high_water_mark INTO hwm FROM leaderboard_rank_state s WHERE s.pack_id = filter_pack_id;
+
+    IF FOUND THEN
+      -- Ranked pack: the rank table's top rows plus scores submitted since its last refresh.
+      -- Best entries only ever improve, so nothing outside the top limit_count can move into it
+      -- except the fresh players themselves (whose rank rows are pulled in to compare against)
+      RETURN QUERY
+      WITH fresh AS (
+        SELECT
+          l.id AS e_id,
+          lower(trim(l.player_name)) AS e_key,
+          trim(l.player_name)::VARCHAR(50) AS e_name,
+          l.score AS e_score,
+          l.correct_guesses AS e_correct,
+          l.total_guesses AS e_total,
+          l.selfie_url AS e_selfie,
+          l.created_at AS e_at
+        FROM leaderboard l
+        WHERE l.pack_id = filter_pack_id
+          AND (hwm IS NULL OR l.created_at > hwm)
+      ),
+      candidates AS (
+        SELECT * FROM fresh
+        UNION ALL
+        SELECT r.best_entry_id, r.player_key::TEXT, r.player_name, r.best_score, r.correct_guesses,
+               r.total_guesses, r.selfie_url, r.achieved_at
+        FROM leaderboard_ranks r
+        WHERE r.pack_id = filter_pack_id
+          AND (r.player_key IN (SELECT f.e_key FROM fresh f)
+               OR r.player_key IN (
+                 SELECT t.player_key FROM leaderboard_ranks t
+                 WHERE t.pack_id = filter_pack_id
+                 ORDER BY t.dense_rank ASC, t.achieved_at ASC
+                 LIMIT limit_count))
+      ),
+      best AS (
+        -- Same order as rank_leaderboard.is_better: higher score, then the earlier entry
+        SELECT DISTINCT ON (c.e_key) c.*
+        FROM candidates c
+        ORDER BY c.e_key, c.e_score DESC, c.e_at ASC
+      )
+      SELECT b.e_id, b.e_name, b.e_score, b.e_correct, b.e_total, filter_pack_id, b.e_selfie, b.e_at
+      FROM best b
+      ORDER BY b.e_score DESC, b.e_at ASC
+      LIMIT limit_count;
+      RETURN;
+    END IF;
+  END IF;
+
+  RETURN QUERY
+  SELECT
+    l.id,
+    l.player_name,
+    l.score,
+    l.correct_guesses,
+    l.total_guesses,
+    l.pack_id,
+    l.selfie_url,
+    l.created_at
+  FROM leaderboard l
+  WHERE (filter_pack_id IS NULL OR l.pack_id = filter_pack_id)
+  ORDER BY l.score DESC, l.created_at ASC
+  LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Step 6: Percentile/rank a score would get in a pack (GameOver screen)
+-- Two bucket lookups plus the players whose best changed since the last refresh;
+-- a pack that hasn't been ranked yet is counted from the leaderboard itself
+CREATE OR REPLACE FUNCTION get_score_percentile(filter_pack_id INTEGER, player_score INTEGER)
+RETURNS TABLE (
+  percentile INTEGER,
+  dense_rank INTEGER,
+  player_count INTEGER
+) AS $$
+DECLARE
+  hwm TIMESTAMP WITH TIME ZONE;
+  ranked BOOLEAN;
+  total INTEGER;
+  beaten INTEGER;
+  above INTEGER;
+  new_players INTEGER;
+  beaten_change INTEGER;
+  above_change INTEGER;
+BEGIN
+  SELECT s.high_water_mark, s.player_count INTO hwm, total
+  FROM leaderboard_rank_state s WHERE s.pack_id = filter_pack_id;
+  ranked := FOUND;
+
+  IF ranked THEN
+    SELECT b.players_below + b.players_at_score INTO beaten
+    FROM leaderboard_score_buckets b
+    WHERE b.pack_id = filter_pack_id AND b.score < player_score
+    ORDER BY b.score DESC
+    LIMIT 1;
+
+    SELECT b.dense_rank INTO above
+    FROM leaderboard_score_buckets b
+    WHERE b.pack_id = filter_pack_id AND b.score > player_score
+    ORDER BY b.score ASC
+    LIMIT 1;
+  END IF;
+
+  -- Fold in scores newer than the last refresh (every score, for a pack not ranked yet):
+  -- each player whose best changed leaves their old bucket and joins the new one
+  WITH fresh AS (
+    SELECT lower(trim(l.player_name)) AS f_key, MAX(l.score) AS f_best
+    FROM leaderboard l
+    WHERE l.pack_id = filter_pack_id
+      AND (hwm IS NULL OR l.created_at > hwm)
+    GROUP BY 1
+  ),
+  moved AS (
+    SELECT r.best_score AS old_score, f.f_best AS new_score
+    FROM fresh f
+    LEFT JOIN leaderboard_ranks r
+      ON ranked AND r.pack_id = filter_pack_id AND r.player_key = f.f_key
+    WHERE r.best_score IS NULL OR f.f_best > r.best_score
+  ),
+  delta AS (
+    SELECT m.old_score AS d_score, -1 AS d_players FROM moved m WHERE m.old_score IS NOT NULL
+    UNION ALL
+    SELECT m.new_score, 1 FROM moved m
+  ),
+  changed AS (
+    SELECT d.d_score, SUM(d.d_players)::INTEGER AS d_players, COALESCE(MAX(b.players_at_score), 0) AS had
+    FROM delta d
+    LEFT JOIN leaderboard_score_buckets b
+      ON ranked AND b.pack_id = filter_pack_id AND b.score = d.d_score
+    GROUP BY d.d_score
+  )
+  SELECT
+    COALESCE(SUM(c.d_players), 0),
+    COALESCE(SUM(c.d_players) FILTER (WHERE c.d_score < player_score), 0),
+    COUNT(*) FILTER (WHERE c.d_score > player_score AND c.had = 0 AND c.d_players > 0)
+      - COUNT(*) FILTER (WHERE c.d_score > player_score AND c.had > 0 AND c.had + c.d_players = 0)
+  INTO new_players, beaten_change, above_change
+  FROM changed c;
+
+  total := COALESCE(total, 0) + new_players;
+  IF total = 0 THEN
+    RETURN QUERY SELECT 100, 1, 0;
+    RETURN;
+  END IF;
+
+  RETURN QUERY SELECT
+    ROUND((COALESCE(beaten, 0) + beaten_change) * 100.0 / total)::INTEGER,
+    COALESCE(above, 0) + above_change + 1,
+    total;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'Leaderboard rank tables created';
+  RAISE NOTICE 'Next: python rank_leaderboard.py (then on a schedule / after backups)';
+  RAISE NOTICE '================================================';
+END $$;
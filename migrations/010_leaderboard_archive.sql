@@ -0,0 +1,37 @@
+-- ============================================
+-- Migration 010: Leaderboard Archive
+-- Cold storage for old, low-ranked scores moved out by scripts/archive_leaderboard.py
+-- so leaderboard and its score indexes only hold what is actually read.
+-- Restore with: python restore_leaderboard.py --archive [pack_id]
+-- ============================================
+
+-- Step 1: Same columns as leaderboard, plus when the row was archived
+CREATE TABLE IF NOT EXISTS leaderboard_archive (
+  id UUID PRIMARY KEY,
+  player_name VARCHAR(50) NOT NULL,
+  score INTEGER NOT NULL,
+  correct_guesses INTEGER DEFAULT 0,
+  total_guesses INTEGER DEFAULT 0,
+  pack_id INTEGER,
+  selfie_url TEXT,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  archived_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc'::text, NOW()) NOT NULL
+);
+
+-- Only used for restores, so one index is enough
+CREATE INDEX IF NOT EXISTS idx_leaderboard_archive_pack_created
+  ON leaderboard_archive(pack_id, created_at);
+
+-- Step 2: Service role only (no public policies)
+ALTER TABLE leaderboard_archive ENABLE ROW LEVEL SECURITY;
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'leaderboard_archive table created';
+  RAISE NOTICE 'Next: python archive_leaderboard.py --dry-run';
+  RAISE NOTICE 'Autovacuum reclaims the archived index entries; after a large first';
+  RAISE NOTICE 'run, REINDEX INDEX CONCURRENTLY idx_leaderboard_pack_score shrinks it at once';
+  RAISE NOTICE '================================================';
+END $$;
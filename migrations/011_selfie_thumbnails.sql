@@ -0,0 +1,111 @@
+-- ============================================
+-- Migration 011: Selfie Thumbnails
+-- Small WebP avatars generated by scripts/thumbnail_selfies.py and stored next to
+-- the originals (leaderboard-selfies/thumbs/). The leaderboard renders the
+-- thumbnail and only loads the original when a selfie is opened.
+-- ============================================
+
+-- Step 1: Thumbnail URL alongside every copy of selfie_url
+ALTER TABLE leaderboard ADD COLUMN IF NOT EXISTS selfie_thumb_url TEXT;
+ALTER TABLE leaderboard_ranks ADD COLUMN IF NOT EXISTS selfie_thumb_url TEXT;
+ALTER TABLE leaderboard_archive ADD COLUMN IF NOT EXISTS selfie_thumb_url TEXT;
+
+-- Step 2: Backfill queue for the thumbnail job (selfies without a thumbnail yet)
+CREATE INDEX IF NOT EXISTS idx_leaderboard_selfie_pending ON leaderboard(created_at)
+  WHERE selfie_url IS NOT NULL AND selfie_thumb_url IS NULL;
+
+-- Step 3: Return the thumbnail from get_top_scores
+DROP FUNCTION IF EXISTS get_top_scores(INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION get_top_scores(limit_count INTEGER DEFAULT 10, filter_pack_id INTEGER DEFAULT NULL)
+RETURNS TABLE (
+  id UUID,
+  player_name VARCHAR(50),
+  score INTEGER,
+  correct_guesses INTEGER,
+  total_guesses INTEGER,
+  pack_id INTEGER,
+  selfie_url TEXT,
+  selfie_thumb_url TEXT,
+  created_at TIMESTAMP WITH TIME ZONE
+) AS $$
+DECLARE
+  hwm TIMESTAMP WITH TIME ZONE;
+BEGIN
+  IF filter_pack_id IS NOT NULL THEN
+    SELECT s.high_water_mark INTO hwm FROM leaderboard_rank_state s WHERE s.pack_id = filter_pack_id;
+
+    IF FOUND THEN
+      -- Ranked pack: the rank table's top rows plus scores submitted since its last refresh.
+      -- Best entries only ever improve, so nothing outside the top limit_count can move into it
+      -- except the fresh players themselves (whose rank rows are pulled in to compare against)
+      RETURN QUERY
+      WITH fresh AS (
+        SELECT
+          l.id AS e_id,
+          lower(trim(l.player_name)) AS e_key,
+          trim(l.player_name)::VARCHAR(50) AS e_name,
+          l.score AS e_score,
+          l.correct_guesses AS e_correct,
+          l.total_guesses AS e_total,
+          l.selfie_url AS e_selfie,
+          l.selfie_thumb_url AS e_thumb,
+          l.created_at AS e_at
+        FROM leaderboard l
+        WHERE l.pack_id = filter_pack_id
+          AND (hwm IS NULL OR l.created_at > hwm)
+      ),
+      candidates AS (
+        SELECT * FROM fresh
+        UNION ALL
+        SELECT r.best_entry_id, r.player_key::TEXT, r.player_name, r.best_score, r.correct_guesses,
+               r.total_guesses, r.selfie_url, r.selfie_thumb_url, r.achieved_at
+        FROM leaderboard_ranks r
+        WHERE r.pack_id = filter_pack_id
+          AND (r.player_key IN (SELECT f.e_key FROM fresh f)
+               OR r.player_key IN (
+                 SELECT t.player_key FROM leaderboard_ranks t
+                 WHERE t.pack_id = filter_pack_id
+                 ORDER BY t.dense_rank ASC, t.achieved_at ASC
+                 LIMIT limit_count))
+      ),
+      best AS (
+        -- Same order as rank_leaderboard.is_better: higher score, then the earlier entry
+        SELECT DISTINCT ON (c.e_key) c.*
+        FROM candidates c
+        ORDER BY c.e_key, c.e_score DESC, c.e_at ASC
+      )
+      SELECT b.e_id, b.e_name, b.e_score, b.e_correct, b.e_total, filter_pack_id, b.e_selfie, b.e_thumb, b.e_at
+      FROM best b
+      ORDER BY b.e_score DESC, b.e_at ASC
+      LIMIT limit_count;
+      RETURN;
+    END IF;
+  END IF;
+
+  RETURN QUERY
+  SELECT
+    l.id,
+    l.player_name,
+    l.score,
+    l.correct_guesses,
+    l.total_guesses,
+    l.pack_id,
+    l.selfie_url,
+    l.selfie_thumb_url,
+    l.created_at
+  FROM leaderboard l
+  WHERE (filter_pack_id IS NULL OR l.pack_id = filter_pack_id)
+  ORDER BY l.score DESC, l.created_at ASC
+  LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'selfie_thumb_url added; get_top_scores returns it';
+  RAISE NOTICE 'Next: python thumbnail_selfies.py (then on a schedule)';
+  RAISE NOTICE '================================================';
+END $$;
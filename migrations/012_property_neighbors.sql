@@ -0,0 +1,104 @@
+-- ============================================
+-- Migration 012: Precomputed Nearby-Property Lists
+-- Maintained by scripts/pair_index.py (k nearest listings per property, same pack)
+-- so a "same neighbourhood" comparison is one index lookup instead of a
+-- distance scan or ORDER BY RANDOM() over the whole pack
+-- ============================================
+
+-- Step 1: k nearest neighbours per property, nearest first
+CREATE TABLE IF NOT EXISTS property_neighbors (
+  property_id UUID NOT NULL REFERENCES properties(id) ON DELETE CASCADE,
+  neighbor_rank SMALLINT NOT NULL,  -- 0 = nearest
+  neighbor_id UUID NOT NULL REFERENCES properties(id) ON DELETE CASCADE,
+  distance_m INTEGER NOT NULL,
+  pack_id INTEGER NOT NULL,
+  built_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  PRIMARY KEY (property_id, neighbor_rank)
+);
+
+-- Stale rows of a pack are dropped by build time after each rebuild
+CREATE INDEX IF NOT EXISTS idx_property_neighbors_pack_built
+  ON property_neighbors(pack_id, built_at);
+
+-- Step 2: Public read, writes only through the service role (pair_index.py)
+ALTER TABLE property_neighbors ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON property_neighbors;
+CREATE POLICY "Allow public read access" ON property_neighbors FOR SELECT USING (true);
+
+-- Step 3: A random still-listed neighbour of a property (empty if it has none)
+CREATE OR REPLACE FUNCTION get_nearby_property(
+  source_property_id UUID,
+  max_distance_m INTEGER DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  mls_number VARCHAR(50),
+  property_id VARCHAR(50),
+  address TEXT,
+  city VARCHAR(255),
+  state VARCHAR(50),
+  province VARCHAR(50),
+  postal_code VARCHAR(20),
+  country VARCHAR(2),
+  latitude NUMERIC,
+  longitude NUMERIC,
+  price INTEGER,
+  bedrooms INTEGER,
+  bathrooms INTEGER,
+  sqft INTEGER,
+  lot_size VARCHAR(50),
+  year_built INTEGER,
+  property_type VARCHAR(100),
+  listing_url TEXT,
+  image_url TEXT,
+  image_url_med TEXT,
+  image_url_low TEXT,
+  local_image_path TEXT,
+  pack_id INTEGER
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    p.id,
+    p.mls_number,
+    p.property_id,
+    p.address,
+    p.city,
+    p.state,
+    p.province,
+    p.postal_code,
+    p.country,
+    p.latitude,
+    p.longitude,
+    p.price,
+    p.bedrooms,
+    p.bathrooms,
+    p.sqft,
+    p.lot_size,
+    p.year_built,
+    p.property_type,
+    p.listing_url,
+    p.image_url,
+    p.image_url_med,
+    p.image_url_low,
+    p.local_image_path,
+    COALESCE(p.pack_id, 1) as pack_id
+  FROM property_neighbors n
+  JOIN properties p ON p.id = n.neighbor_id
+  WHERE n.property_id = source_property_id
+    AND (max_distance_m IS NULL OR n.distance_m <= max_distance_m)
+    AND p.delisted_at IS NULL
+  ORDER BY RANDOM()  -- Over at most k rows from the primary key
+  LIMIT 1;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'property_neighbors table and get_nearby_property created';
+  RAISE NOTICE 'Next: python pair_index.py (after each property import)';
+  RAISE NOTICE '================================================';
+END $$;
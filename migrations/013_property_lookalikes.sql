@@ -0,0 +1,102 @@
+-- ============================================
+-- Migration 013: Precomputed Lookalike-Property Lists
+-- Maintained by scripts/lookalike_index.py (top-k most similar listings by
+-- beds/baths/sqft/type, same pack, noticeably different price) so a
+-- "lookalike homes" comparison is one index lookup
+-- ============================================
+
+-- Step 1: k most similar properties per property, most similar first
+CREATE TABLE IF NOT EXISTS property_lookalikes (
+  property_id UUID NOT NULL REFERENCES properties(id) ON DELETE CASCADE,
+  lookalike_rank SMALLINT NOT NULL,  -- 0 = most similar
+  lookalike_id UUID NOT NULL REFERENCES properties(id) ON DELETE CASCADE,
+  distance REAL NOT NULL,  -- In standardized feature units; 0 = identical on paper
+  pack_id INTEGER NOT NULL,
+  built_at TIMESTAMP WITH TIME ZONE NOT NULL,
+  PRIMARY KEY (property_id, lookalike_rank)
+);
+
+-- Stale rows of a pack are dropped by build time after each rebuild
+CREATE INDEX IF NOT EXISTS idx_property_lookalikes_pack_built
+  ON property_lookalikes(pack_id, built_at);
+
+-- Step 2: Public read, writes only through the service role (lookalike_index.py)
+ALTER TABLE property_lookalikes ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Allow public read access" ON property_lookalikes;
+CREATE POLICY "Allow public read access" ON property_lookalikes FOR SELECT USING (true);
+
+-- Step 3: A random still-listed lookalike of a property (empty if it has none)
+CREATE OR REPLACE FUNCTION get_lookalike_property(
+  source_property_id UUID
+)
+RETURNS TABLE (
+  id UUID,
+  mls_number VARCHAR(50),
+  property_id VARCHAR(50),
+  address TEXT,
+  city VARCHAR(255),
+  state VARCHAR(50),
+  province VARCHAR(50),
+  postal_code VARCHAR(20),
+  country VARCHAR(2),
+  latitude NUMERIC,
+  longitude NUMERIC,
+  price INTEGER,
+  bedrooms INTEGER,
+  bathrooms INTEGER,
+  sqft INTEGER,
+  lot_size VARCHAR(50),
+  year_built INTEGER,
+  property_type VARCHAR(100),
+  listing_url TEXT,
+  image_url TEXT,
+  image_url_med TEXT,
+  image_url_low TEXT,
+  local_image_path TEXT,
+  pack_id INTEGER
+) AS $$
+BEGIN
+  RETURN QUERY
+  SELECT
+    p.id,
+    p.mls_number,
+    p.property_id,
+    p.address,
+    p.city,
+    p.state,
+    p.province,
+    p.postal_code,
+    p.country,
+    p.latitude,
+    p.longitude,
+    p.price,
+    p.bedrooms,
+    p.bathrooms,
+    p.sqft,
+    p.lot_size,
+    p.year_built,
+    p.property_type,
+    p.listing_url,
+    p.image_url,
+    p.image_url_med,
+    p.image_url_low,
+    p.local_image_path,
+    COALESCE(p.pack_id, 1) as pack_id
+  FROM property_lookalikes l
+  JOIN properties p ON p.id = l.lookalike_id
+  WHERE l.property_id = source_property_id
+    AND p.delisted_at IS NULL
+  ORDER BY RANDOM()  -- Over at most k rows from the primary key
+  LIMIT 1;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'property_lookalikes table and get_lookalike_property created';
+  RAISE NOTICE 'Next: python lookalike_index.py (after each property import)';
+  RAISE NOTICE '================================================';
+END $$;
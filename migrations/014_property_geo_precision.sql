@@ -0,0 +1,33 @@
+-- ============================================
+-- Migration 014: Coordinate Precision
+-- scripts/geocoder.py fills missing coordinates with the matched city's centroid.
+-- Those are only good for "which city", not distances, so each row records where
+-- its coordinates came from and scripts/pair_index.py leaves centroid rows out
+-- of nearby-property lists
+--
+-- Apply before the next import: import_pack2_to_supabase.py and
+-- import_to_supabase.py always send geo_precision, so their upserts fail
+-- against a properties table without the column
+-- ============================================
+
+-- Step 1: 'listing' = the listing's own coordinates, 'city' = a gazetteer centroid
+ALTER TABLE properties ADD COLUMN IF NOT EXISTS geo_precision VARCHAR(10);
+
+ALTER TABLE properties DROP CONSTRAINT IF EXISTS geo_precision_valid;
+ALTER TABLE properties ADD CONSTRAINT geo_precision_valid
+  CHECK (geo_precision IS NULL OR geo_precision IN ('listing', 'city'));
+
+-- Rows imported before this migration stay NULL; pair_index.py treats NULL rows
+-- sitting exactly on a gazetteer centroid as city-level. The centroids live in
+-- the gazetteer, not the database, so existing neighbour lists built from them
+-- can't be picked out here - re-running pair_index.py replaces every pack's lists
+
+-- Success!
+DO $$
+BEGIN
+  RAISE NOTICE '================================================';
+  RAISE NOTICE 'properties.geo_precision added';
+  RAISE NOTICE 'Next: re-import properties, then python pair_index.py';
+  RAISE NOTICE '(rebuilds neighbour lists without centroid rows)';
+  RAISE NOTICE '================================================';
+END $$;
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Archive old, low-ranked leaderboard rows to keep the hot table and its indexes small
+Only the top few hundred rows per pack are ever read, so everything else that is
+older than the retention window is moved - in chunked, throttled batches - to the
+leaderboard_archive table (migration 010) or to a gzip'd JSON Lines file in backups/.
+
+Legacy rows from before the pack system (pack_id NULL) are archived as a group of
+their own, after the packs.
+
+Always kept hot, per pack:
+  - the top KEEP_TOP_N rows (score DESC, created_at ASC, same order as get_top_scores)
+  - rows newer than KEEP_RECENT_DAYS
+  - each player's best entry from leaderboard_ranks (so rank_leaderboard.py --rebuild still agrees)
+
+Each chunk is written to the archive before it is deleted from leaderboard, and
+archive writes ignore ids that are already there, so an interrupted run can just be re-run.
+
+Usage:
+  python archive_leaderboard.py --dry-run          # Count what would move
+  python archive_leaderboard.py                    # Backup, then archive into leaderboard_archive
+  python archive_leaderboard.py --to-file          # Archive into backups/leaderboard_archive_*.jsonl.gz
+  python archive_leaderboard.py --pack 2 --keep-top 1000 --keep-days 60 --throttle 0.5
+
+Restore with restore_leaderboard.py --archive [pack_id] or restore_leaderboard.py <archive file>
+"""
+
+import argparse
+import gzip
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+import json_codec
+from supabase_client import get_client
+from backup_leaderboard import BACKUP_DIR, backup_leaderboard
+from instrumentation import Instrumentation
+
+KEEP_TOP_N = 500
+KEEP_RECENT_DAYS = 30
+CHUNK_SIZE = 500
+THROTTLE_SECONDS = 1.0  # Pause between chunks so the API's inserts never queue behind us
+PAGE_SIZE = 1000
+
+ARCHIVE_COLUMNS = 'id,player_name,score,correct_guesses,total_guesses,pack_id,selfie_url,selfie_thumb_url,created_at'
+
+
+class LeaderboardArchiver:
+    def __init__(self, keep_top: int = KEEP_TOP_N, keep_days: int = KEEP_RECENT_DAYS,
+                 chunk_size: int = CHUNK_SIZE, throttle: float = THROTTLE_SECONDS,
+                 archive_file=None, dry_run: bool = False):
+        self.supabase = get_client()
+        self.metrics = Instrumentation()
+        self.keep_top = keep_top
+        self.cutoff = (datetime.now(timezone.utc) - timedelta(days=keep_days)).isoformat()
+        self.chunk_size = chunk_size
+        self.throttle = throttle
+        self.archive_file = archive_file
+        self.dry_run = dry_run
+        self.archived_count = 0
+        self.kept_count = 0
+
+    def pack_ids(self) -> List[Optional[int]]:
+        """Every pack, then None for legacy rows without a pack"""
+        result = self.supabase.table('packs').select('id').order('id').execute()
+        return [row['id'] for row in result.data or []] + [None]
+
+    @staticmethod
+    def _in_pack(query, pack_id: Optional[int]):
+        return query.is_('pack_id', 'null') if pack_id is None else query.eq('pack_id', pack_id)
+
+    @staticmethod
+    def pack_label(pack_id: Optional[int]) -> str:
+        return "Legacy rows (no pack)" if pack_id is None else f"Pack {pack_id}"
+
+    def protected_ids(self, pack_id: Optional[int]) -> Set[str]:
+        """Ids that must stay hot: the pack's top N plus every player's best entry"""
+        result = (
+            self._in_pack(self.supabase.table('leaderboard').select('id'), pack_id)
+            .order('score', desc=True)
+            .order('created_at')
+            .limit(self.keep_top)
+            .execute()
+        )
+        ids = {row['id'] for row in result.data or []}
+
+        # leaderboard_ranks only covers packs; for legacy rows the top N is all there is
+        start = 0
+        while pack_id is not None:
+            # The rank table may not exist yet (migration 009) - then only the top N is protected
+            try:
+                rows = (
+                    self.supabase.table('leaderboard_ranks')
+                    .select('best_entry_id')
+                    .eq('pack_id', pack_id)
+                    .order('player_key')
+                    .range(start, start + PAGE_SIZE - 1)
+                    .execute()
+                ).data or []
+            except Exception as e:
+                print(f"  ⚠ Could not read leaderboard_ranks ({str(e)[:80]}) - protecting top {self.keep_top} only")
+                break
+            ids.update(row['best_entry_id'] for row in rows)
+            if len(rows) < PAGE_SIZE:
+                break
+            start += PAGE_SIZE
+
+        return ids
+
+    def _write_archive(self, rows: List[Dict]):
+        if self.archive_file:
+            # One gzip member per chunk, flushed before the delete; gzip readers concatenate members
+            with gzip.open(self.archive_file, 'ab') as f:
+                f.write(b''.join(json_codec.dumps(row) + b'\n' for row in rows))
+        else:
+            self.supabase.table('leaderboard_archive').upsert(
+                rows, on_conflict='id', ignore_duplicates=True
+            ).execute()
+
+    def archive_pack(self, pack_id: Optional[int]):
+        protected = self.protected_ids(pack_id)
+        print(f"\n{self.pack_label(pack_id)}: keeping top {self.keep_top}, rows since {self.cutoff[:10]} "
+              f"and {len(protected):,} protected entries")
+
+        # Keyset on created_at: archived rows disappear as we go, so offsets would skip rows.
+        # Rows sharing a timestamp across a chunk boundary are simply left for the next run.
+        cursor = None
+        pack_archived = 0
+        while True:
+            query = (
+                self._in_pack(self.supabase.table('leaderboard').select(ARCHIVE_COLUMNS), pack_id)
+                .lt('created_at', self.cutoff)
+            )
+            if cursor:
+                query = query.gt('created_at', cursor)
+            with self.metrics.stage('fetch_chunk'):
+                rows = query.order('created_at').order('id').limit(self.chunk_size).execute().data or []
+            if not rows:
+                break
+            cursor = rows[-1]['created_at']
+
+            chunk = [row for row in rows if row['id'] not in protected]
+            self.kept_count += len(rows) - len(chunk)
+            if chunk and not self.dry_run:
+                try:
+                    with self.metrics.stage('write_archive'):
+                        self._write_archive(chunk)
+                    with self.metrics.stage('delete_chunk'):
+                        (self.supabase.table('leaderboard').delete()
+                         .in_('id', [row['id'] for row in chunk]).execute())
+                except Exception as e:
+                    self.metrics.error('archive_chunk', e)
+                    print(f"  ✗ Chunk ending {cursor}: {str(e)[:150]}")
+                    raise
+
+            pack_archived += len(chunk)
+            self.archived_count += len(chunk)
+            self.metrics.count('rows_archived', len(chunk))
+            print(f"  {'Would archive' if self.dry_run else '✓ Archived'} {pack_archived:,} rows "
+                  f"(through {cursor[:19]})")
+
+            if len(rows) < self.chunk_size:
+                break
+            if self.throttle and not self.dry_run:
+                time.sleep(self.throttle)
+
+    def run(self, pack_ids: Optional[List[Optional[int]]] = None):
+        for pack_id in pack_ids or self.pack_ids():
+            with self.metrics.stage('archive_pack'):
+                self.archive_pack(pack_id)
+
+    def print_summary(self):
+        print(f"\n{'='*60}")
+        print(f"LEADERBOARD ARCHIVE SUMMARY{' (dry run)' if self.dry_run else ''}")
+        print(f"{'='*60}")
+        print(f"✓ {'Would archive' if self.dry_run else 'Archived'}: {self.archived_count:,}")
+        print(f"= Old but protected (top N / player bests): {self.kept_count:,}")
+        if self.archive_file and self.archived_count and not self.dry_run:
+            print(f"📁 Archive file: {self.archive_file}")
+        print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old, low-ranked leaderboard rows to the archive")
+    parser.add_argument('--pack', type=int, action='append', help="Only this pack (repeatable)")
+    parser.add_argument('--keep-top', type=int, default=KEEP_TOP_N, help="Rows per pack that always stay hot")
+    parser.add_argument('--keep-days', type=int, default=KEEP_RECENT_DAYS, help="Rows newer than this stay hot")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--throttle', type=float, default=THROTTLE_SECONDS, help="Seconds to pause between chunks")
+    parser.add_argument('--to-file', action='store_true', help="Archive to a gzip'd JSON Lines file instead of the table")
+    parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived")
+    parser.add_argument('--no-backup', action='store_true', help="Skip the full backup taken before archiving")
+    args = parser.parse_args()
+
+    if not args.dry_run and not args.no_backup:
+        backup_leaderboard()
+
+    archive_file = None
+    if args.to_file:
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        archive_file = BACKUP_DIR / f"leaderboard_archive_{timestamp}.jsonl.gz"
+
+    archiver = LeaderboardArchiver(
+        keep_top=args.keep_top, keep_days=args.keep_days, chunk_size=args.chunk_size,
+        throttle=args.throttle, archive_file=archive_file, dry_run=args.dry_run,
+    )
+    archiver.run(args.pack)
+    archiver.print_summary()
+    archiver.metrics.export('archive_leaderboard')
+
+
+if __name__ == "__main__":
+    main()
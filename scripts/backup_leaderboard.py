@@ -4,32 +4,42 @@ Backup leaderboard data to local JSON file
 Run this before any risky database operations
 """
 
-import os
-import json
 from datetime import datetime
 from pathlib import Path
-from dotenv import load_dotenv
-from supabase import create_client, Client
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv('SUPABASE_URL') or os.getenv('VITE_SUPABASE_URL')
-SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+import json_codec
+from supabase_client import get_client
+from selfie_mirror import SelfieMirror, referenced_objects
 
 # Backup directory
 BACKUP_DIR = Path(__file__).parent / "backups"
 BACKUP_DIR.mkdir(exist_ok=True)
 
+PAGE_SIZE = 1000  # PostgREST's default max rows per request
+
 
-def backup_leaderboard():
+def fetch_leaderboard():
+    """Every leaderboard row, a page at a time (a bare select stops at the API's row limit)"""
+    rows = []
+    while True:
+        page = (
+            get_client().table('leaderboard')
+            .select('*')
+            .order('created_at')
+            .order('id')
+            .range(len(rows), len(rows) + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+
+
+def backup_leaderboard(mirror_selfies=True, pretty=False):
     """
     Backup all leaderboard data to a timestamped JSON file
+    and mirror the selfie images the rows point to (backups/selfies/)
+    The file is compact JSON unless pretty=True
     """
     print("=" * 60)
     print("LEADERBOARD BACKUP SCRIPT")
@@ -38,13 +48,12 @@ def backup_leaderboard():
     try:
         # Fetch all leaderboard data
         print("\nFetching leaderboard data from Supabase...")
-        response = supabase.table('leaderboard').select('*').execute()
+        leaderboard_data = fetch_leaderboard()
 
-        if not response.data:
+        if not leaderboard_data:
             print("⚠️  No leaderboard data found!")
             return
 
-        leaderboard_data = response.data
         record_count = len(leaderboard_data)
 
         print(f"✓ Retrieved {record_count:,} leaderboard records")
@@ -54,6 +63,8 @@ def backup_leaderboard():
         backup_filename = f"leaderboard_backup_{timestamp}.json"
         backup_path = BACKUP_DIR / backup_filename
 
+        selfie_objects = sorted(referenced_objects(leaderboard_data))
+
         # Create backup metadata
         backup = {
             "backup_date": datetime.utcnow().isoformat(),
@@ -64,12 +75,14 @@ def backup_leaderboard():
                 "total_scores": record_count,
                 "highest_score": max((r['score'] for r in leaderboard_data), default=0),
                 "unique_players": len(set(r['player_name'] for r in leaderboard_data)),
-            }
+                "selfie_objects": len(selfie_objects),
+            },
+            "selfie_objects": selfie_objects,
         }
 
-        # Save to file
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(backup, f, indent=2, default=str)
+        # Save to file (encoded once; the same bytes become the "latest" copy below)
+        encoded = json_codec.dumps(backup, pretty=pretty)
+        json_codec.write_bytes(encoded, backup_path)
 
         print(f"\n✓ Backup saved to: {backup_path}")
         print(f"\nBackup Statistics:")
@@ -80,11 +93,13 @@ def backup_leaderboard():
 
         # Also create a "latest" backup for easy reference
         latest_path = BACKUP_DIR / "leaderboard_backup_latest.json"
-        with open(latest_path, 'w', encoding='utf-8') as f:
-            json.dump(backup, f, indent=2, default=str)
+        json_codec.write_bytes(encoded, latest_path)
 
         print(f"\n✓ Also saved as: {latest_path}")
 
+        if mirror_selfies and selfie_objects:
+            SelfieMirror().backup(selfie_objects)
+
         print("\n" + "=" * 60)
         print("BACKUP COMPLETE!")
         print("=" * 60)
@@ -113,8 +128,7 @@ def list_backups():
             continue
 
         try:
-            with open(backup_file, 'r') as f:
-                backup_data = json.load(f)
+            backup_data = json_codec.load(backup_file)
 
             print(f"\n📁 {backup_file.name}")
             print(f"   Date: {backup_data.get('backup_date', 'Unknown')}")
@@ -130,4 +144,12 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == "--list":
         list_backups()
     else:
-        backup_leaderboard()
+        # --no-selfies: rows only, skip mirroring the selfie images
+        # --pretty: indented JSON for reading by eye (compact by default)
+        backup_leaderboard(mirror_selfies="--no-selfies" not in sys.argv[1:],
+                           pretty="--pretty" in sys.argv[1:])
+
+        # --refresh-ranks: fold the new scores into the precomputed rank tables (migration 009)
+        if "--refresh-ranks" in sys.argv[1:]:
+            from rank_leaderboard import LeaderboardRanker
+            LeaderboardRanker().refresh()
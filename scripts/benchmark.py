@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the Python data pipeline
+Generates synthetic properties shaped like properties_ca_selenium.json and
+times normalization (Pack 1 and Pack 2), Pack 2 import_batch against a local
+PostgREST stub, image upload against a local Storage stub and check_data
+profiling, plus JSON file dump/load through json_codec (every installed codec
+vs. the stdlib indent=2 files it replaced) on a ~50 MB dataset. Results are
+saved as JSON and compared against a stored baseline.
+
+--standin swaps the discard stub for supabase_local.py (SQLite-backed, with
+optional latency) to measure the scripts against something closer to a real server.
+
+Usage:
+  python benchmark.py [--sizes 1000,100000,1000000] [--save-baseline] [--fail-on-regression]
+  python benchmark.py --standin --latency-ms 30
+  python benchmark.py --sizes 1000 --json-mb 200   # Bigger JSON files (0 skips them)
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SCRIPTS_DIR = Path(__file__).parent
+RESULTS_DIR = SCRIPTS_DIR / "data" / "benchmarks"
+BASELINE_FILE = SCRIPTS_DIR / "benchmark_baseline.json"
+SAMPLE_IMAGE = SCRIPTS_DIR / "images_ca_selenium" / "28983706.jpg"
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+REPEAT = 3  # Best-of-N for the in-process benchmarks
+UPLOAD_SAMPLE = 200  # Images uploaded to the storage stub (independent of dataset size)
+REGRESSION_TOLERANCE = 0.15  # Flag results more than 15% slower than the baseline
+JSON_DATASET_MB = 50  # Size of the compact JSON file for the codec benchmarks
+
+# Shape of the synthetic data (mirrors the Realtor.ca scrape)
+CITIES = [
+    ("Toronto", "Ontario", ["Bayview Village", "Annex", "Leslieville", "Willowdale East"]),
+    ("Kitchener", "Ontario", []),
+    ("Waterloo", "Ontario", []),
+    ("Ottawa", "Ontario", ["Centretown", "Westboro", "Orleans"]),
+    ("Hamilton", "Ontario", ["Stoney Creek"]),
+    ("London", "Ontario", []),
+    ("Gatineau", "Quebec", ["Gatineau", "Hull"]),
+    ("Calgary", "Alberta", []),
+]
+STREETS = ["MCMAHON DRIVE", "KING STREET W", "QUEEN STREET E", "UNIVERSITY AVENUE",
+           "WEBER STREET N", "BANK STREET", "MAIN STREET E", "RICHMOND ROAD"]
+BED_VALUES = ["1", "2", "3", "4", "1 + 1", "2 + 1", "3 + 1", "4 + 2", None]
+BATH_VALUES = ["1", "2", "3", "4", None]
+
+# Dummy JWT-shaped key - supabase-py validates the key format, the stub ignores it
+STUB_SERVICE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.benchmark"
+
+
+def generate_properties(count: int, seed: int = 42) -> List[Dict]:
+    """Synthetic scrape output with the same fields, types and gaps as properties_ca_selenium.json"""
+    rng = random.Random(seed)
+    properties = []
+
+    for n in range(count):
+        mls_number = str(20_000_000 + n)
+        city, province, neighbourhoods = rng.choice(CITIES)
+        if neighbourhoods:
+            city = f"{city} ({rng.choice(neighbourhoods)})"
+        unit = f"{rng.randint(100, 3500)} - " if rng.random() < 0.4 else ""
+        address = f"{unit}{rng.randint(1, 999)} {rng.choice(STREETS)}, {city}, {province}"
+        slug = address.lower().replace(' ', '-').replace(',', '')
+
+        # ~10% rentals priced per month, the rest sale prices
+        price = rng.randint(1800, 4500) if rng.random() < 0.1 else rng.randint(250, 2500) * 1000
+
+        properties.append({
+            'url': f"https://www.realtor.ca/real-estate/{mls_number}/{slug}",
+            'mls_number': mls_number,
+            'address': address,
+            'price': price,
+            'bedrooms': rng.choice(BED_VALUES),
+            'bathrooms': rng.choice(BATH_VALUES),
+            'sqft': rng.choice([None, rng.randint(350, 4000)]) if rng.random() < 0.2 else rng.randint(350, 4000),
+            'property_type': None,
+            'image_url': f"https://cdn.realtor.ca/listings/TS{638964098649530000 + n}/reb82/highres/0/c{n}_1.jpg",
+            'country': 'CA',
+            'city': city,
+            'province': province,
+            'local_image_path': f"scripts/images_ca_selenium/{mls_number}.jpg",
+        })
+
+    return properties
+
+
+class SupabaseStub:
+    """
+    Minimal PostgREST + Storage endpoint that accepts and discards writes
+    Measures client-side cost (serialization, HTTP, batching) without a database
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes_received = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, like a real Supabase endpoint
+
+            def _reply(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                stub.requests += 1
+                stub.bytes_received += length
+
+                path = self.path.split('?')[0]
+                if path.startswith('/rest/v1/'):
+                    self._reply(201, b'[]')
+                elif path.startswith('/storage/v1/object/'):
+                    key = path[len('/storage/v1/object/'):]
+                    self._reply(200, json.dumps({'Key': key}).encode())
+                else:
+                    self._reply(404, b'{"message": "not found"}')
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        # The shared client (supabase_client.get_client) reads these on first use
+        os.environ['SUPABASE_URL'] = self.url
+        os.environ['SUPABASE_SERVICE_ROLE_KEY'] = STUB_SERVICE_KEY
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+
+
+def _time(fn: Callable, repeat: int = 1) -> float:
+    """Best wall time of `repeat` runs, with the function's own output discarded"""
+    best = float('inf')
+    for _ in range(repeat):
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _consume(iterable):
+    """Drive a generator without keeping its results (1M normalized rows add up)"""
+    for _ in iterable:
+        pass
+
+
+def _result(name: str, rows: int, seconds: float) -> Dict:
+    result = {
+        'benchmark': name,
+        'rows': rows,
+        'seconds': round(seconds, 4),
+        'rows_per_second': round(rows / seconds, 1) if seconds else 0.0,
+    }
+    print(f"  {name:<20} {rows:>10,} rows  {seconds:>9.3f}s  {result['rows_per_second']:>12,.0f} rows/s")
+    return result
+
+
+def run_size(count: int, stub) -> List[Dict]:
+    """All dataset-size benchmarks for one synthetic dataset"""
+    # Imported here: these modules build their Supabase client from the stub's env vars
+    from import_to_supabase import PropertyImporter
+    from import_pack2_to_supabase import Pack2Importer
+    from property_record import as_record
+    import check_data
+
+    print(f"\nDataset: {count:,} rows")
+    started = time.perf_counter()
+    properties = generate_properties(count)
+    print(f"  (generated in {time.perf_counter() - started:.1f}s)")
+
+    records = [as_record(p) for p in properties]  # check_data works on parsed records
+
+    repeat = REPEAT if count <= 100_000 else 1
+    pack1 = PropertyImporter()
+    pack2 = Pack2Importer()
+    results = [
+        _result('normalize_pack1', count, _time(
+            lambda: _consume(pack1.normalize_property_data(p, 'CA') for p in properties), repeat)),
+        _result('normalize_pack2', count, _time(
+            lambda: _consume(pack2.normalize_property_data(p) for p in properties), repeat)),
+        _result('check_data_profile', count, _time(lambda: check_data.profile(records), repeat)),
+    ]
+
+    requests_before = stub.requests
+    results.append(_result('import_batch_pack2', count, _time(lambda: Pack2Importer().import_batch(properties))))
+    results[-1]['http_requests'] = stub.requests - requests_before
+
+    return results
+
+
+def run_upload(stub) -> Dict:
+    """Upload UPLOAD_SAMPLE local images through Pack2ImageUploader to the storage stub"""
+    from upload_pack2_images import Pack2ImageUploader
+
+    image_data = SAMPLE_IMAGE.read_bytes() if SAMPLE_IMAGE.exists() else os.urandom(120_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for n in range(UPLOAD_SAMPLE):
+            path = Path(tmp) / f"{20_000_000 + n}.jpg"
+            path.write_bytes(image_data)
+            paths.append(path)
+
+        uploader = Pack2ImageUploader()
+        seconds = _time(lambda: _consume(uploader.upload_local_image(path, path.stem) for path in paths))
+
+    result = _result('image_upload', UPLOAD_SAMPLE, seconds)
+    result['bytes_per_second'] = round(len(image_data) * UPLOAD_SAMPLE / seconds, 1) if seconds else 0.0
+    return result
+
+
+def run_json_codec(megabytes: float) -> List[Dict]:
+    """Dump/load a ~`megabytes` scrape JSON with each codec; stdlib indent=2 is what the scripts used to write"""
+    import json_codec
+
+    sample = generate_properties(1000)
+    count = int(megabytes * 1e6 / (len(json_codec.dumps(sample)) / len(sample)))
+    properties = generate_properties(count)
+    print(f"\nJSON codec: {count:,} rows (~{megabytes:g} MB compact), default codec {json_codec.BACKEND}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "legacy.json"
+
+        def dump_legacy():
+            with open(legacy, 'w', encoding='utf-8') as f:
+                json.dump(properties, f, indent=2)
+
+        def load_legacy():
+            with open(legacy, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        base_dump = _result('json_dump_legacy', count, _time(dump_legacy, REPEAT))
+        base_dump['megabytes'] = round(legacy.stat().st_size / 1e6, 1)
+        base_load = _result('json_load_legacy', count, _time(load_legacy, REPEAT))
+        results += [base_dump, base_load]
+
+        for backend in json_codec.available_backends():
+            path = Path(tmp) / f"{backend}.json"
+            timings = [
+                (f'json_dump_{backend}', base_dump,
+                 lambda: json_codec.dump(properties, path, backend=backend)),
+                (f'json_load_{backend}', base_load,
+                 lambda: json_codec.load(path, use_mmap=False, backend=backend)),
+            ]
+            if backend != 'stdlib':
+                timings.append((f'json_load_{backend}_mmap', base_load,
+                                lambda: json_codec.load(path, use_mmap=True, backend=backend)))
+            for name, base, fn in timings:
+                result = _result(name, count, _time(fn, REPEAT))
+                result['speedup'] = round(base['seconds'] / result['seconds'], 2) if result['seconds'] else None
+                if name.startswith('json_dump'):
+                    result['megabytes'] = round(path.stat().st_size / 1e6, 1)
+                results.append(result)
+
+    print("  Speedup vs. stdlib indent=2: " + ", ".join(
+        f"{r['benchmark'][5:]} {r['speedup']:.1f}x" for r in results if r.get('speedup')))
+    return results
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float = REGRESSION_TOLERANCE,
+            backend: str = 'stub') -> List[Dict]:
+    """Match results to the baseline by (benchmark, rows); returns the regressions"""
+    baseline_by_key = {(r['benchmark'], r['rows']): r for r in baseline.get('results', [])}
+    regressions = []
+
+    print(f"\n{'='*60}")
+    print(f"COMPARED TO BASELINE ({baseline.get('created_at', 'unknown')})")
+    print(f"{'='*60}")
+    if baseline.get('backend', 'stub') != backend:
+        print(f"  ⚠ Baseline used the {baseline.get('backend', 'stub')} backend, this run used {backend}")
+    for result in results:
+        base = baseline_by_key.get((result['benchmark'], result['rows']))
+        if not base or not base['seconds']:
+            print(f"  {result['benchmark']:<20} {result['rows']:>10,}  (no baseline)")
+            continue
+
+        change = result['seconds'] / base['seconds'] - 1
+        flag = ''
+        if change > tolerance:
+            flag = '  ✗ REGRESSION'
+            regressions.append({**result, 'baseline_seconds': base['seconds'], 'change': round(change, 4)})
+        elif change < -tolerance:
+            flag = '  ✓ faster'
+        print(f"  {result['benchmark']:<20} {result['rows']:>10,}  {base['seconds']:>9.3f}s → "
+              f"{result['seconds']:>9.3f}s  ({change:+.1%}){flag}")
+    print(f"{'='*60}\n")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the property data pipeline")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated synthetic dataset sizes")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Store these results as {BASELINE_FILE.name}")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 if any benchmark regressed")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE,
+                        help="Allowed slowdown vs. baseline before flagging (0.15 = 15%%)")
+    parser.add_argument('--standin', action='store_true', help="Use the SQLite-backed supabase_local.py server")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Per-request latency for --standin")
+    parser.add_argument('--json-mb', type=float, default=JSON_DATASET_MB,
+                        help="Size of the JSON codec benchmark file (0 to skip)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+
+    if args.standin:
+        from supabase_local import LocalSupabase
+        standin_dir = tempfile.TemporaryDirectory()
+        server = LocalSupabase(Path(standin_dir.name), latency_ms=args.latency_ms)
+        server.storage.create_bucket('property-images')
+        backend = f"standin ({args.latency_ms:.0f} ms)"
+    else:
+        server = SupabaseStub()
+        backend = 'stub'
+
+    results = []
+    with server as stub:
+        for count in sizes:
+            results.extend(run_size(count, stub))
+        print()
+        results.append(run_upload(stub))
+    if args.json_mb > 0:
+        results.extend(run_json_codec(args.json_mb))
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'backend': backend,
+        'results': results,
+    }
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    results_file = RESULTS_DIR / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved to {results_file}")
+
+    regressions = []
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance, backend)
+    else:
+        print(f"No baseline yet - run with --save-baseline to create {BASELINE_FILE.name}")
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {BASELINE_FILE}")
+
+    if regressions and args.fail_on_regression:
+        print(f"✗ {len(regressions)} benchmark(s) regressed more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,32 @@
 #!/usr/bin/env python3
-import json
+import sys
 from pathlib import Path
+from typing import List
 
-# Check for scraped data files
-data_dir = Path(__file__).parent / 'data'
-files = list(data_dir.glob('properties_ca_selenium*.json'))
+from property_record import PropertyRecord, as_record, load_records
+from staging_store import StagingStore, STAGING_DB
 
-if not files:
-    print('No data files found!')
-else:
-    # Use the latest file
-    latest_file = max(files, key=lambda f: f.stat().st_mtime)
-    print(f'Reading: {latest_file.name}\n')
-
-    with open(latest_file) as f:
-        data = json.load(f)
 
+def profile(data: List[PropertyRecord]):
+    """Print city distribution, field coverage and a sample property"""
     print(f'Total properties: {len(data)}')
     print(f'\n=== City Distribution ===')
 
     cities = {}
     for prop in data:
-        city = prop.get('city', 'Unknown')
+        city = prop.city or 'Unknown'
         cities[city] = cities.get(city, 0) + 1
 
     for city, count in sorted(cities.items(), key=lambda x: -x[1])[:15]:
         print(f'{city}: {count}')
 
     print(f'\n=== Data Quality Check ===')
-    has_price = sum(1 for p in data if p.get('price'))
-    has_address = sum(1 for p in data if p.get('address'))
-    has_image = sum(1 for p in data if p.get('image_url'))
-    has_beds = sum(1 for p in data if p.get('bedrooms'))
-    has_baths = sum(1 for p in data if p.get('bathrooms'))
-    has_sqft = sum(1 for p in data if p.get('sqft'))
+    has_price = sum(1 for p in data if p.price)
+    has_address = sum(1 for p in data if p.address)
+    has_image = sum(1 for p in data if p.image_url)
+    has_beds = sum(1 for p in data if p.bedrooms)
+    has_baths = sum(1 for p in data if p.bathrooms)
+    has_sqft = sum(1 for p in data if p.sqft)
 
     print(f'Has price: {has_price}/{len(data)} ({has_price*100//len(data)}%)')
     print(f'Has address: {has_address}/{len(data)} ({has_address*100//len(data)}%)')
@@ -45,9 +38,39 @@ else:
     print(f'\n=== Sample Property ===')
     if data:
         sample = data[0]
-        print(f'Address: {sample.get("address", "N/A")}')
-        print(f'City: {sample.get("city", "N/A")}')
-        print(f'Price: ${sample.get("price", 0):,}')
-        print(f'Beds: {sample.get("bedrooms", "N/A")}')
-        print(f'Baths: {sample.get("bathrooms", "N/A")}')
-        print(f'Sqft: {sample.get("sqft", "N/A")}')
+        print(f'Address: {sample.address or "N/A"}')
+        print(f'City: {sample.city or "N/A"}')
+        print(f'Price: ${sample.price or 0:,}')
+        print(f'Beds: {sample.bedrooms if sample.bedrooms is not None else "N/A"}')
+        print(f'Baths: {sample.bathrooms if sample.bathrooms is not None else "N/A"}')
+        print(f'Sqft: {sample.sqft if sample.sqft is not None else "N/A"}')
+
+
+def main():
+    # Check for scraped data files
+    data_dir = Path(__file__).parent / 'data'
+    files = list(data_dir.glob('properties_ca_selenium*.json'))
+    use_staging = '--staging' in sys.argv[1:]
+
+    if use_staging and not STAGING_DB.exists():
+        print(f'No staging store found at {STAGING_DB}')
+        return
+    if not use_staging and not files:
+        print('No data files found!')
+        return
+
+    if use_staging:
+        print(f'Reading: {STAGING_DB.name}\n')
+        data = [as_record(prop) for prop in StagingStore().load_properties()]
+    else:
+        # Use the latest file
+        latest_file = max(files, key=lambda f: f.stat().st_mtime)
+        print(f'Reading: {latest_file.name}\n')
+
+        data = load_records(latest_file)
+
+    profile(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Fixed-size, gzip'd page shards of scrape/upload JSON outputs
+Next to data/<name>.json this writes data/<name>.shards/:
+  - page-00000.json.gz, page-00001.json.gz, ... (PAGE_SIZE rows each, compact JSON)
+  - manifest.json: row counts, each shard's offset, row count, min/max price and cities
+api/data-files.js serves ?file=<name>.json&page=N straight from one shard, so the
+DevPage viewer never makes the function parse (or the browser download) a whole scrape.
+The manifest records the source file's size and mtime; a stale or missing manifest
+makes the API fall back to reading the full file.
+
+Usage:
+  python data_shards.py data/properties_ca_selenium.json   # (Re)shard an existing file
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import json_codec
+
+PAGE_SIZE = 100
+MANIFEST_FILE = "manifest.json"
+SHARD_NAME = "page-{:05d}.json.gz"
+
+
+def shard_dir(source: Path) -> Path:
+    """data/<name>.json -> data/<name>.shards"""
+    source = Path(source)
+    return source.with_name(f"{source.stem}.shards")
+
+
+def _price(value) -> Optional[int]:
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r'[^\d.]', '', str(value or ''))
+    try:
+        return int(float(digits)) if digits else None
+    except ValueError:
+        return None
+
+
+def write_shards(properties: List[Dict], source: Path, page_size: int = PAGE_SIZE) -> Path:
+    """Shard `properties` (the contents just written to `source`); returns the shard directory"""
+    source = Path(source)
+    target = shard_dir(source)
+    staging = target.with_name(target.name + '.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    shards = []
+    for index, offset in enumerate(range(0, len(properties), page_size)):
+        rows = properties[offset:offset + page_size]
+        name = SHARD_NAME.format(index)
+        # mtime=0 keeps identical pages byte-identical across runs
+        with gzip.GzipFile(staging / name, 'wb', mtime=0) as f:
+            f.write(json_codec.dumps(rows))
+        prices = [price for price in (_price(row.get('price')) for row in rows) if price is not None]
+        shards.append({
+            'file': name,
+            'offset': offset,
+            'rows': len(rows),
+            'min_price': min(prices) if prices else None,
+            'max_price': max(prices) if prices else None,
+            'cities': sorted({str(row['city']).strip() for row in rows if row.get('city')}),
+        })
+
+    stat = source.stat() if source.exists() else None
+    manifest = {
+        'source': source.name,
+        'source_bytes': stat.st_size if stat else None,
+        # A string: nanosecond timestamps don't survive a JS number
+        'source_mtime_ns': str(stat.st_mtime_ns) if stat else None,
+        'total_rows': len(properties),
+        'page_size': page_size,
+        'pages': len(shards),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'shards': shards,
+    }
+    json_codec.dump(manifest, staging / MANIFEST_FILE, pretty=True)  # Small, and read by people
+
+    # Swap the whole directory so readers never see a half-written set of pages
+    if target.exists():
+        retired = target.with_name(target.name + '.old')
+        shutil.rmtree(retired, ignore_errors=True)
+        os.replace(target, retired)
+        os.replace(staging, target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    return target
+
+
+def read_manifest(source: Path) -> Optional[Dict]:
+    """The manifest for `source`, or None if there is none or it no longer matches the file"""
+    source = Path(source)
+    path = shard_dir(source) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    manifest = json_codec.load(path)
+    if source.exists():
+        # Same-size rewrites (a price edit) are caught by the mtime
+        stat = source.stat()
+        if (manifest.get('source_bytes') != stat.st_size
+                or manifest.get('source_mtime_ns') != str(stat.st_mtime_ns)):
+            return None
+    return manifest
+
+
+def read_page(source: Path, page: int) -> List[Dict]:
+    """One page of rows, from its shard"""
+    manifest = read_manifest(source)
+    if manifest is None:
+        raise FileNotFoundError(f"No current shards for {source}")
+    with gzip.open(shard_dir(source) / manifest['shards'][page]['file'], 'rb') as f:
+        return json_codec.loads(f.read())
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python data_shards.py <file.json> [page_size]")
+        sys.exit(1)
+
+    source = Path(sys.argv[1])
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else PAGE_SIZE
+    properties = json_codec.load(source)
+    if not isinstance(properties, list):
+        print(f"✗ {source} is not a JSON array of properties")
+        sys.exit(1)
+
+    target = write_shards(properties, source, page_size)
+    manifest = read_manifest(source)
+    size = sum(path.stat().st_size for path in target.glob('*.json.gz'))
+    print(f"✓ {manifest['total_rows']:,} rows -> {manifest['pages']:,} pages of {page_size} in {target}")
+    print(f"  {source.stat().st_size / 1024:,.0f} KB JSON -> {size / 1024:,.0f} KB of shards")
+
+
+if __name__ == "__main__":
+    main()
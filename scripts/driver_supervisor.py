@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Browser session supervisor for the Selenium scraper
+Health-checks the driver, restarts it after a crash/hang and recycles it
+every N pages so Chrome's memory doesn't grow for the whole run
+"""
+
+from typing import Callable, Optional
+
+RECYCLE_AFTER_PAGES = 50
+
+
+class BrowserCrashed(Exception):
+    """The browser session died mid-search and needs a restart"""
+
+
+class DriverSupervisor:
+    def __init__(self, factory: Callable, recycle_after_pages: int = RECYCLE_AFTER_PAGES):
+        """
+        Args:
+            factory: Zero-argument callable that launches and returns a new WebDriver
+            recycle_after_pages: Relaunch the browser after this many pages (0 disables)
+        """
+        self.factory = factory
+        self.recycle_after_pages = recycle_after_pages
+        self.driver = None
+        self.pages_since_start = 0
+        self.restart_count = 0
+        self.recycle_count = 0
+
+    def start(self):
+        """Launch a fresh browser"""
+        self.driver = self.factory()
+        self.pages_since_start = 0
+        return self.driver
+
+    def quit(self):
+        """Close the browser, ignoring errors from an already-dead session"""
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+
+    def is_alive(self) -> bool:
+        """Cheap round-trip to the browser - fails if Chrome crashed or the session is gone"""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def restart(self, reason: Optional[str] = None):
+        """Replace a dead or hung browser"""
+        print(f"  ↻ Restarting browser{f' ({reason})' if reason else ''}...")
+        self.quit()
+        self.restart_count += 1
+        return self.start()
+
+    def page_done(self):
+        self.pages_since_start += 1
+
+    def maybe_recycle(self) -> bool:
+        """Relaunch the browser if it has served enough pages - call between cities"""
+        if not self.recycle_after_pages or self.pages_since_start < self.recycle_after_pages:
+            return False
+        print(f"  ↻ Recycling browser after {self.pages_since_start} pages...")
+        self.quit()
+        self.recycle_count += 1
+        self.start()
+        return True
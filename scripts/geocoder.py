@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Offline geocoder for Canadian listings
+Fills latitude/longitude and a canonical city/province from the bundled
+gazetteer (gazetteer_ca.csv) with no network calls:
+  - a trie over normalized place names/aliases matches the longest known place
+    at the start of the locality ("London East (East H)" -> London)
+  - a trie over FSA prefixes (first 1-3 postal code characters) resolves postal codes
+  - a KD-tree over place coordinates answers reverse lookups for rows that only have coordinates
+Lookups are memoized, so a 100k-row batch is mostly dictionary hits.
+
+Coordinates filled from a place centroid are only city-level, so every row
+gets geo_precision ('listing' for its own coordinates, 'city' for a centroid;
+migration 014) and distance-based features can leave centroid rows out.
+
+A bigger gazetteer in the same CSV format (name,province,latitude,longitude,fsa,aliases)
+can be swapped in with GAZETTEER_FILE=/path/to/file.csv.
+"""
+
+import csv
+import math
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+GAZETTEER_FILE = Path(os.getenv('GAZETTEER_FILE', Path(__file__).parent / "gazetteer_ca.csv"))
+
+# Province/territory codes -> the names stored in properties.province
+PROVINCES = {
+    'AB': 'Alberta', 'BC': 'British Columbia', 'MB': 'Manitoba', 'NB': 'New Brunswick',
+    'NL': 'Newfoundland and Labrador', 'NS': 'Nova Scotia', 'NT': 'Northwest Territories',
+    'NU': 'Nunavut', 'ON': 'Ontario', 'PE': 'Prince Edward Island', 'QC': 'Quebec',
+    'SK': 'Saskatchewan', 'YT': 'Yukon',
+}
+PROVINCE_ALIASES = {
+    'nfld': 'NL', 'newfoundland': 'NL', 'labrador': 'NL', 'pei': 'PE', 'pq': 'QC', 'que': 'QC',
+    'yukon territory': 'YT', 'nwt': 'NT', 'ont': 'ON', 'alta': 'AB', 'sask': 'SK', 'man': 'MB',
+}
+
+# First postal code letter -> province (X is split between NT and NU, so it's left out)
+FSA_PROVINCES = {
+    'A': 'NL', 'B': 'NS', 'C': 'PE', 'E': 'NB', 'G': 'QC', 'H': 'QC', 'J': 'QC',
+    'K': 'ON', 'L': 'ON', 'M': 'ON', 'N': 'ON', 'P': 'ON', 'R': 'MB', 'S': 'SK',
+    'T': 'AB', 'V': 'BC', 'Y': 'YT',
+}
+
+POSTAL_CODE_RE = re.compile(r'\b([A-Z]\d[A-Z])\s?(\d[A-Z]\d)\b')
+PARENTHETICAL_RE = re.compile(r'\([^)]*\)?')
+
+REVERSE_MAX_KM = 15.0  # Coordinates further than this from every known place stay unnamed
+EARTH_RADIUS_KM = 6371.0
+
+# properties.geo_precision values
+PRECISION_LISTING = 'listing'  # The listing's own coordinates
+PRECISION_CITY = 'city'  # A gazetteer place centroid
+
+
+class Place(NamedTuple):
+    name: str
+    province: str  # Two-letter code
+    latitude: float
+    longitude: float
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, accents stripped, punctuation collapsed to single spaces"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+@lru_cache(maxsize=1024)
+def province_code(text: Optional[str]) -> Optional[str]:
+    """'Ontario' / 'ON' / 'Québec' -> two-letter code"""
+    key = normalize_name(text)
+    if not key:
+        return None
+    if key.upper() in PROVINCES:
+        return key.upper()
+    for code, name in PROVINCES.items():
+        if normalize_name(name) == key:
+            return code
+    return PROVINCE_ALIASES.get(key)
+
+
+@lru_cache(maxsize=65536)
+def format_postal_code(text: Optional[str]) -> Optional[str]:
+    """'m5r1a1' / 'M5R 1A1' -> 'M5R 1A1' (None if it isn't a Canadian postal code)"""
+    match = POSTAL_CODE_RE.search((text or '').upper())
+    return f"{match.group(1)} {match.group(2)}" if match else None
+
+
+class Trie:
+    """Prefix tree mapping keys to lists of values, answering longest-prefix queries"""
+
+    _VALUES = ''  # Child keys are single characters, so '' can't collide
+
+    def __init__(self):
+        self.root: Dict = {}
+
+    def insert(self, key: str, value):
+        node = self.root
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault(self._VALUES, []).append(value)
+
+    def longest_prefix(self, text: str, word_boundary: bool = False) -> List:
+        """
+        Values of the longest key that is a prefix of `text`
+        With word_boundary, a key only counts if it ends at a space or the end of `text`
+        """
+        node = self.root
+        found: List = []
+        for i, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            values = node.get(self._VALUES)
+            if values and (not word_boundary or i + 1 == len(text) or text[i + 1] == ' '):
+                found = values
+        return found
+
+
+class KDTree:
+    """2-d tree over (x, y) points for nearest-neighbour queries"""
+
+    def __init__(self, points: List[Tuple[float, float, object]]):
+        self.root = self._build(list(points), 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+        axis = depth % 2
+        points.sort(key=lambda p: p[axis])
+        middle = len(points) // 2
+        return (points[middle], axis,
+                self._build(points[:middle], depth + 1),
+                self._build(points[middle + 1:], depth + 1))
+
+    def nearest(self, x: float, y: float) -> Tuple[float, object]:
+        """(squared distance, payload) of the closest point"""
+        best = [float('inf'), None]
+
+        def search(node):
+            if node is None:
+                return
+            point, axis, left, right = node
+            distance = (point[0] - x) ** 2 + (point[1] - y) ** 2
+            if distance < best[0]:
+                best[0], best[1] = distance, point[2]
+            delta = (x, y)[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            search(near)
+            if delta * delta < best[0]:
+                search(far)
+
+        search(self.root)
+        return best[0], best[1]
+
+
+def project(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Equirectangular projection in km - accurate enough at city scale"""
+    return (math.radians(longitude) * math.cos(math.radians(latitude)) * EARTH_RADIUS_KM,
+            math.radians(latitude) * EARTH_RADIUS_KM)
+
+
+class Geocoder:
+    def __init__(self, places: Iterable[Tuple[Place, List[str], List[str]]]):
+        """`places`: (place, aliases, FSA prefixes), larger places first (ties resolve to them)"""
+        self.names = Trie()
+        self.fsas = Trie()
+        points = []
+        self.centroids = set()
+        for place, aliases, fsas in places:
+            for name in [place.name, *aliases]:
+                self.names.insert(normalize_name(name), place)
+            for fsa in fsas:
+                self.fsas.insert(fsa.upper(), place)
+            points.append((*project(place.latitude, place.longitude), place))
+            self.centroids.add((place.latitude, place.longitude))
+        self.tree = KDTree(points)
+        self.place_count = len(points)
+
+    @classmethod
+    def load(cls, path: Path = GAZETTEER_FILE) -> 'Geocoder':
+        entries = []
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                place = Place(row['name'], row['province'], float(row['latitude']), float(row['longitude']))
+                aliases = [a for a in (row.get('aliases') or '').split(';') if a.strip()]
+                entries.append((place, aliases, (row.get('fsa') or '').split()))
+        return cls(entries)
+
+    @lru_cache(maxsize=65536)
+    def place_for_name(self, locality: str, province: Optional[str] = None) -> Optional[Place]:
+        """Longest gazetteer name at the start of the locality, in the given province if known"""
+        key = normalize_name(PARENTHETICAL_RE.sub(' ', locality or ''))
+        candidates = self.names.longest_prefix(key, word_boundary=True)
+        if province:
+            candidates = [place for place in candidates if place.province == province]
+        return candidates[0] if candidates else None
+
+    @lru_cache(maxsize=65536)
+    def place_for_postal_code(self, postal_code: str) -> Optional[Place]:
+        """Place owning the longest FSA prefix of the postal code (None when ambiguous)"""
+        candidates = self.fsas.longest_prefix(postal_code.replace(' ', '')[:3])
+        return candidates[0] if len(candidates) == 1 else None
+
+    def nearest_place(self, latitude: float, longitude: float,
+                      max_km: float = REVERSE_MAX_KM) -> Optional[Place]:
+        distance, place = self.tree.nearest(*project(latitude, longitude))
+        return place if distance <= max_km * max_km else None
+
+    def is_centroid(self, latitude: float, longitude: float) -> bool:
+        """Whether coordinates are exactly a gazetteer place's (rows geocoded before geo_precision)"""
+        return (float(latitude), float(longitude)) in self.centroids
+
+    @staticmethod
+    def locality(prop: Dict) -> str:
+        """The city-ish part of a listing: its city field, or the address part before the province"""
+        if prop.get('city'):
+            return str(prop['city'])
+        parts = [part.strip() for part in str(prop.get('address') or '').split(',')]
+        return parts[-2] if len(parts) >= 3 else ''
+
+    def geocode(self, prop: Dict) -> Dict:
+        """
+        Fields to fill/canonicalize for one listing: city, province, postal_code,
+        latitude, longitude, geo_precision. Existing coordinates are kept; missing
+        ones get the matched place's centroid, flagged as city-level.
+        """
+        postal_code = format_postal_code(prop.get('postal_code')) or format_postal_code(prop.get('address'))
+        province = province_code(prop.get('province'))
+        if not province and postal_code:
+            province = FSA_PROVINCES.get(postal_code[0])
+
+        try:
+            latitude = float(prop['latitude']) if prop.get('latitude') is not None else None
+            longitude = float(prop['longitude']) if prop.get('longitude') is not None else None
+        except (TypeError, ValueError):
+            latitude = longitude = None
+        has_coordinates = latitude is not None and longitude is not None
+
+        locality = self.locality(prop)
+        place = self.place_for_name(locality, province)
+        if place is None and postal_code:
+            place = self.place_for_postal_code(postal_code)
+        if place is None and has_coordinates:
+            place = self.nearest_place(latitude, longitude)
+
+        result: Dict = {}
+        if has_coordinates:
+            result['geo_precision'] = PRECISION_LISTING
+        if place:
+            result['city'] = place.name
+            province = province or place.province
+            if not has_coordinates:
+                result['latitude'] = place.latitude
+                result['longitude'] = place.longitude
+                result['geo_precision'] = PRECISION_CITY
+        elif locality:
+            # Unknown place: at least drop the neighbourhood so it groups with its city
+            cleaned = ' '.join(PARENTHETICAL_RE.sub(' ', locality).split())
+            if cleaned:
+                result['city'] = cleaned
+
+        if province:
+            result['province'] = PROVINCES[province]
+        if postal_code:
+            result['postal_code'] = postal_code
+        return result
+
+
+@lru_cache(maxsize=1)
+def get_geocoder() -> Geocoder:
+    """Process-wide geocoder, loaded from the bundled gazetteer on first use"""
+    return Geocoder.load()
+
+
+def main():
+    import sys
+    import time
+
+    import json_codec
+
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "data" / "properties_ca_selenium.json"
+    properties = json_codec.load(path)
+
+    started = time.perf_counter()
+    geocoder = get_geocoder()
+    loaded = time.perf_counter()
+    results = [geocoder.geocode(prop) for prop in properties]
+    finished = time.perf_counter()
+
+    before = {prop.get('city') for prop in properties if prop.get('city')}
+    after = {result.get('city') for result in results if result.get('city')}
+    print(f"Gazetteer: {geocoder.place_count} places loaded in {(loaded - started) * 1000:.1f}ms")
+    print(f"Geocoded {len(properties):,} listings in {(finished - loaded) * 1000:.1f}ms")
+    print(f"Distinct cities: {len(before):,} -> {len(after):,}")
+    listing = sum(1 for r in results if r.get('geo_precision') == PRECISION_LISTING)
+    centroid = sum(1 for r in results if r.get('geo_precision') == PRECISION_CITY)
+    print(f"With coordinates: {listing + centroid:,} ({listing:,} listing, {centroid:,} city centroid)")
+
+
+if __name__ == "__main__":
+    main()
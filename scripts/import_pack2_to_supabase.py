@@ -4,25 +4,18 @@ Import Pack 2 properties to Supabase with pack_id = 2
 This script prepares and uploads the new extended property pack
 """
 
-import os
-import json
+import sys
+import hashlib
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Dict, Optional
-from dotenv import load_dotenv
-from supabase import create_client, Client
+from typing import List, Dict, Optional, Union
 
-# Load environment variables
-load_dotenv()
-
-# Supabase configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY environment variables")
-
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+import json_codec
+from supabase_client import get_client
+from geocoder import get_geocoder
+from property_record import PropertyRecord, as_record, load_records
+from staging_store import StagingStore
+from instrumentation import Instrumentation
 
 # Data paths
 DATA_DIR = Path(__file__).parent / "data"
@@ -30,108 +23,50 @@ IMAGES_DIR = Path(__file__).parent / "images_ca_selenium"
 
 PACK_ID = 2  # This is Pack 2
 
+# Diff import: compact snapshot columns pulled from the database
+SNAPSHOT_COLUMNS = 'mls_number,price,image_hash,delisted_at'
+SNAPSHOT_PAGE_SIZE = 1000
+# A scrape missing more than this share of the live pack is treated as partial
+# (a crashed run, one city) and its removals are refused without --allow-mass-delist
+MAX_DELIST_FRACTION = 0.2
+
 
 class Pack2Importer:
     def __init__(self):
-        self.supabase = supabase
+        self.supabase = get_client()
         self.imported_count = 0
+        self.updated_count = 0
+        self.delisted_count = 0
+        self.unchanged_count = 0
         self.failed_count = 0
         self.skipped_count = 0
+        self.cross_pack_count = 0
+        self.imported_mls_numbers = []
+        self.metrics = Instrumentation()
 
-    def normalize_property_data(self, prop: Dict) -> Optional[Dict]:
+    def normalize_property_data(self, prop: Union[PropertyRecord, Dict]) -> Optional[Dict]:
         """
         Normalize property data for Pack 2 (Canadian properties)
         Adds pack_id = 2 to all properties
         """
         try:
-            normalized = {
-                'country': 'CA',
-                'pack_id': PACK_ID,  # Always Pack 2
-            }
+            record = as_record(prop)
 
             # MLS Number - REQUIRED for uniqueness
-            if 'mls_number' in prop and prop['mls_number']:
-                normalized['mls_number'] = str(prop['mls_number'])
-            else:
+            if not record.mls_number:
                 print(f"  Skipping property without MLS number")
                 return None
 
-            # Address - REQUIRED
-            if 'address' in prop and prop['address']:
-                normalized['address'] = str(prop['address']).strip()
-            else:
+            # Address and a positive price are REQUIRED
+            if not record.address or not record.price or record.price <= 0:
                 return None
 
-            # Location details
-            if 'city' in prop and prop['city']:
-                normalized['city'] = str(prop['city']).strip()
-
-            if 'province' in prop and prop['province']:
-                normalized['province'] = str(prop['province']).strip()
+            normalized = record.to_row()
+            normalized['country'] = 'CA'
+            normalized['pack_id'] = PACK_ID  # Always Pack 2
 
-            # Price - REQUIRED
-            if 'price' in prop and prop['price']:
-                try:
-                    # Handle both integer and string prices
-                    if isinstance(prop['price'], (int, float)):
-                        normalized['price'] = int(prop['price'])
-                    else:
-                        price_str = str(prop['price']).replace('$', '').replace(',', '').strip()
-                        normalized['price'] = int(float(price_str))
-
-                    if normalized['price'] <= 0:
-                        return None  # Skip invalid prices
-                except (ValueError, TypeError):
-                    return None
-            else:
-                return None
-
-            # Property details
-            if 'bedrooms' in prop and prop['bedrooms'] is not None:
-                try:
-                    # Handle "1 + 1" format common in Canadian listings
-                    bedrooms_str = str(prop['bedrooms']).strip()
-                    if '+' in bedrooms_str:
-                        # Sum up the numbers (e.g., "1 + 1" = 2)
-                        parts = bedrooms_str.split('+')
-                        normalized['bedrooms'] = sum(int(p.strip()) for p in parts)
-                    else:
-                        normalized['bedrooms'] = int(float(bedrooms_str))
-                except (ValueError, TypeError):
-                    normalized['bedrooms'] = None
-
-            if 'bathrooms' in prop and prop['bathrooms'] is not None:
-                try:
-                    normalized['bathrooms'] = int(float(prop['bathrooms']))
-                except (ValueError, TypeError):
-                    normalized['bathrooms'] = None
-
-            if 'sqft' in prop and prop['sqft']:
-                try:
-                    normalized['sqft'] = int(prop['sqft'])
-                except (ValueError, TypeError):
-                    normalized['sqft'] = None
-
-            if 'property_type' in prop and prop['property_type']:
-                normalized['property_type'] = str(prop['property_type']).strip()
-
-            # URLs
-            if 'url' in prop and prop['url']:
-                normalized['listing_url'] = str(prop['url']).strip()
-
-            # Image URLs - prefer Supabase URL if available
-            if 'supabase_image_url' in prop and prop['supabase_image_url']:
-                normalized['image_url'] = str(prop['supabase_image_url']).strip()
-            elif 'image_url' in prop and prop['image_url']:
-                normalized['image_url'] = str(prop['image_url']).strip()
-
-            # Store original image URL as backup
-            if 'image_url' in prop and prop['image_url']:
-                normalized['image_url_med'] = str(prop['image_url']).strip()
-
-            # Local image path reference
-            if 'local_image_path' in prop and prop['local_image_path']:
-                normalized['local_image_path'] = str(prop['local_image_path']).strip()
+            # Canonical city/province/postal code, centroid coordinates when missing (offline)
+            normalized.update(get_geocoder().geocode(normalized))
 
             return normalized
 
@@ -150,27 +85,34 @@ class Pack2Importer:
 
             # Normalize batch
             normalized_batch = []
-            for prop in batch:
-                normalized = self.normalize_property_data(prop)
-                if normalized:
-                    normalized_batch.append(normalized)
-                else:
-                    self.skipped_count += 1
+            with self.metrics.stage('normalize_batch'):
+                for prop in batch:
+                    normalized = self.normalize_property_data(prop)
+                    if normalized:
+                        normalized_batch.append(normalized)
+                    else:
+                        self.skipped_count += 1
+                        self.metrics.count('rows_skipped')
 
             if not normalized_batch:
                 continue
 
             try:
                 # Insert batch into Supabase
-                result = self.supabase.table('properties').insert(normalized_batch).execute()
+                with self.metrics.stage('insert_batch'):
+                    result = self.supabase.table('properties').insert(normalized_batch).execute()
 
                 imported = len(normalized_batch)
                 self.imported_count += imported
+                self.metrics.count('rows_imported', imported)
+                self.metrics.count('bytes_sent', len(json_codec.dumps(normalized_batch)))
+                self.imported_mls_numbers.extend(p['mls_number'] for p in normalized_batch if p.get('mls_number'))
 
                 print(f"  ✓ Batch {i//batch_size + 1}: Imported {imported} properties")
 
             except Exception as e:
                 error_msg = str(e)
+                self.metrics.error('insert_batch', e)
 
                 # Check for duplicate MLS number errors
                 if 'duplicate key' in error_msg.lower():
@@ -178,26 +120,222 @@ class Pack2Importer:
 
                     # Try importing one by one to skip duplicates
                     for prop in normalized_batch:
+                        self.metrics.count('row_retries')
                         try:
-                            self.supabase.table('properties').insert(prop).execute()
+                            with self.metrics.stage('insert_row'):
+                                self.supabase.table('properties').insert(prop).execute()
                             self.imported_count += 1
+                            self.metrics.count('rows_imported')
+                            if prop.get('mls_number'):
+                                self.imported_mls_numbers.append(prop['mls_number'])
                         except Exception as single_error:
+                            self.metrics.error('insert_row', single_error)
                             if 'duplicate key' in str(single_error).lower():
                                 self.skipped_count += 1
+                                self.metrics.count('rows_skipped')
                             else:
                                 self.failed_count += 1
+                                self.metrics.count('rows_failed')
                                 print(f"    ✗ Failed to import MLS {prop.get('mls_number', 'unknown')}: {str(single_error)[:100]}")
                 else:
                     self.failed_count += len(normalized_batch)
+                    self.metrics.count('rows_failed', len(normalized_batch))
                     print(f"  ✗ Batch {i//batch_size + 1}: Error - {error_msg[:150]}")
 
+    @staticmethod
+    def image_hash(image_url: Optional[str]) -> str:
+        """Hash an image URL the same way the image_hash column does (md5 of URL or '')"""
+        return hashlib.md5((image_url or '').encode('utf-8')).hexdigest()
+
+    def fetch_snapshot(self, page_size: int = SNAPSHOT_PAGE_SIZE) -> Dict[str, Dict]:
+        """
+        Pull a compact (mls_number, price, image_hash, delisted_at) snapshot of Pack 2
+        Uses keyset pagination on mls_number so each page is an index range scan
+        """
+        snapshot = {}
+        last_mls = ''
+
+        while True:
+            with self.metrics.stage('snapshot_page'):
+                result = (
+                    self.supabase.table('properties')
+                    .select(SNAPSHOT_COLUMNS)
+                    .eq('pack_id', PACK_ID)
+                    .gt('mls_number', last_mls)
+                    .order('mls_number')
+                    .limit(page_size)
+                    .execute()
+                )
+            rows = result.data or []
+
+            for row in rows:
+                snapshot[row['mls_number']] = row
+
+            if len(rows) < page_size:
+                break
+            last_mls = rows[-1]['mls_number']
+
+        print(f"  ✓ Snapshot: {len(snapshot):,} existing Pack 2 properties")
+        return snapshot
+
+    def compute_diff(self, properties: List[Dict], snapshot: Dict[str, Dict]) -> Dict[str, List]:
+        """
+        Compare a fresh scrape against the database snapshot
+        Returns normalized rows to add/update and MLS numbers to mark delisted
+        """
+        incoming = {}
+        for prop in properties:
+            normalized = self.normalize_property_data(prop)
+            if normalized:
+                # Later duplicates in the scrape win, same as a re-import would
+                incoming[normalized['mls_number']] = normalized
+            else:
+                self.skipped_count += 1
+                self.metrics.count('rows_skipped')
+
+        adds = []
+        updates = []
+        for mls_number, row in incoming.items():
+            existing = snapshot.get(mls_number)
+            if existing is None:
+                adds.append(row)
+            elif (existing.get('price') != row['price']
+                  or existing.get('image_hash') != self.image_hash(row.get('image_url'))
+                  or existing.get('delisted_at')):
+                updates.append(row)
+            else:
+                self.unchanged_count += 1
+                self.metrics.count('rows_unchanged')
+
+        removals = [
+            mls_number for mls_number, existing in snapshot.items()
+            if mls_number not in incoming and not existing.get('delisted_at')
+        ]
+
+        return {'adds': adds, 'updates': updates, 'removals': removals}
+
+    def exclude_cross_pack(self, diff: Dict[str, List], batch_size: int = 500):
+        """
+        Drop adds whose MLS number already belongs to another pack
+        The snapshot only covers Pack 2, but mls_number is unique across all packs
+        (migration 008), so upserting these would move another pack's row into Pack 2
+        """
+        mls_numbers = [row['mls_number'] for row in diff['adds']]
+        other_packs = {}
+        for i in range(0, len(mls_numbers), batch_size):
+            with self.metrics.stage('cross_pack_check'):
+                rows = (
+                    self.supabase.table('properties')
+                    .select('mls_number,pack_id')
+                    .in_('mls_number', mls_numbers[i:i + batch_size])
+                    .execute()
+                ).data or []
+            for row in rows:
+                if row.get('pack_id') != PACK_ID:
+                    other_packs[row['mls_number']] = row.get('pack_id') or 1  # NULL pack_id is Pack 1
+
+        if other_packs:
+            diff['adds'] = [row for row in diff['adds'] if row['mls_number'] not in other_packs]
+            self.cross_pack_count += len(other_packs)
+            self.metrics.count('rows_cross_pack', len(other_packs))
+            sample = ', '.join(f"{mls} (Pack {pack})" for mls, pack in sorted(other_packs.items())[:5])
+            print(f"  ⚠ {len(other_packs):,} MLS numbers already belong to another pack, not imported: {sample}"
+                  f"{' ...' if len(other_packs) > 5 else ''}")
+
+    def apply_diff(self, diff: Dict[str, List], batch_size: int = 500):
+        """Send only the deltas: bulk upsert adds/updates, bulk mark removals as delisted"""
+        for key in ('adds', 'updates'):
+            rows = diff[key]
+            for i in range(0, len(rows), batch_size):
+                # Relisted properties come back into the game
+                batch = [{**row, 'delisted_at': None} for row in rows[i:i + batch_size]]
+                try:
+                    with self.metrics.stage('upsert_batch'):
+                        self.supabase.table('properties').upsert(batch, on_conflict='mls_number').execute()
+                    self.imported_mls_numbers.extend(row['mls_number'] for row in batch)
+                    if key == 'adds':
+                        self.imported_count += len(batch)
+                        self.metrics.count('rows_imported', len(batch))
+                    else:
+                        self.updated_count += len(batch)
+                        self.metrics.count('rows_updated', len(batch))
+                    self.metrics.count('bytes_sent', len(json_codec.dumps(batch)))
+                    print(f"  ✓ {key.capitalize()} batch {i//batch_size + 1}: {len(batch)} properties")
+                except Exception as e:
+                    self.failed_count += len(batch)
+                    self.metrics.count('rows_failed', len(batch))
+                    self.metrics.error('upsert_batch', e)
+                    print(f"  ✗ {key.capitalize()} batch {i//batch_size + 1}: Error - {str(e)[:150]}")
+
+        removals = diff['removals']
+        delisted_at = datetime.now(timezone.utc).isoformat()
+        for i in range(0, len(removals), batch_size):
+            chunk = removals[i:i + batch_size]
+            try:
+                with self.metrics.stage('delist_batch'):
+                    (
+                        self.supabase.table('properties')
+                        .update({'delisted_at': delisted_at})
+                        .eq('pack_id', PACK_ID)
+                        .in_('mls_number', chunk)
+                        .execute()
+                    )
+                self.delisted_count += len(chunk)
+                self.metrics.count('rows_delisted', len(chunk))
+                print(f"  ✓ Delisted batch {i//batch_size + 1}: {len(chunk)} properties")
+            except Exception as e:
+                self.failed_count += len(chunk)
+                self.metrics.count('rows_failed', len(chunk))
+                self.metrics.error('delist_batch', e)
+                print(f"  ✗ Delisted batch {i//batch_size + 1}: Error - {str(e)[:150]}")
+
+    def guard_mass_delist(self, diff: Dict[str, List], snapshot: Dict[str, Dict],
+                          allow_mass_delist: bool = False):
+        """
+        Drop the removals when they would delist more than MAX_DELIST_FRACTION of the
+        live pack - a partial input file would otherwise take most of Pack 2 offline
+        """
+        live = sum(1 for existing in snapshot.values() if not existing.get('delisted_at'))
+        removals = len(diff['removals'])
+        if allow_mass_delist or not live or removals <= live * MAX_DELIST_FRACTION:
+            return
+
+        print(f"  ✗ Refusing to delist {removals:,} of {live:,} live properties "
+              f"(over {MAX_DELIST_FRACTION:.0%}) - is the scrape complete?")
+        print("    Adds/updates still apply; re-run with --allow-mass-delist if the removals are real")
+        self.metrics.count('delists_refused', removals)
+        diff['removals'] = []
+
+    def diff_import(self, properties: List[Dict], allow_mass_delist: bool = False):
+        """
+        Change-data-capture import: only write listings that were added, changed or removed
+        Requires migration 008 (delisted_at, image_hash)
+        """
+        print(f"\nDiff-importing {len(properties)} Pack 2 properties...")
+
+        snapshot = self.fetch_snapshot()
+        diff = self.compute_diff(properties, snapshot)
+        self.exclude_cross_pack(diff)
+        self.guard_mass_delist(diff, snapshot, allow_mass_delist)
+
+        print(f"  Adds: {len(diff['adds']):,}  Updates: {len(diff['updates']):,}  "
+              f"Removals: {len(diff['removals']):,}  Unchanged: {self.unchanged_count:,}")
+
+        self.apply_diff(diff)
+
     def update_pack_count(self):
         """Update the property_count for Pack 2 in the packs table"""
         try:
             print("\nUpdating Pack 2 property count...")
 
-            # Get count of Pack 2 properties
-            result = self.supabase.table('properties').select('id', count='exact').eq('pack_id', PACK_ID).execute()
+            # Get count of playable Pack 2 properties - delisted ones are out of the game (migration 008)
+            result = (
+                self.supabase.table('properties')
+                .select('id', count='exact')
+                .eq('pack_id', PACK_ID)
+                .is_('delisted_at', 'null')
+                .execute()
+            )
             count = result.count if hasattr(result, 'count') else len(result.data)
 
             # Update packs table
@@ -207,7 +345,7 @@ class Pack2Importer:
         except Exception as e:
             print(f"⚠ Could not update pack count: {str(e)}")
 
-    def import_from_json(self, filepath: Path):
+    def import_from_json(self, filepath: Path, diff: bool = False, allow_mass_delist: bool = False):
         """Import Pack 2 properties from JSON file"""
         print(f"\n{'='*60}")
         print(f"PACK 2 IMPORT - Loading properties from {filepath.name}")
@@ -218,22 +356,47 @@ class Pack2Importer:
             return
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                properties = json.load(f)
+            properties = load_records(filepath)
 
             print(f"Loaded {len(properties)} properties from JSON")
-            self.import_batch(properties)
+            if diff:
+                self.diff_import(properties, allow_mass_delist)
+            else:
+                self.import_batch(properties)
 
         except Exception as e:
             print(f"Error loading JSON file: {str(e)}")
 
+    def import_from_store(self, store: StagingStore, diff: bool = False, allow_mass_delist: bool = False):
+        """Import Pack 2 properties from the local staging store"""
+        print(f"\n{'='*60}")
+        print(f"PACK 2 IMPORT - Loading properties from {store.path.name}")
+        print(f"{'='*60}")
+
+        properties = store.load_properties(country='CA')
+        print(f"Loaded {len(properties)} properties from staging store")
+
+        if diff:
+            self.diff_import(properties, allow_mass_delist)
+        else:
+            self.import_batch(properties)
+
+        store.mark_imported(self.imported_mls_numbers, PACK_ID)
+        print(f"✓ Marked {len(self.imported_mls_numbers)} staged properties as imported into Pack {PACK_ID}")
+
     def print_summary(self):
         """Print import summary"""
         print(f"\n{'='*60}")
         print(f"PACK 2 IMPORT SUMMARY")
         print(f"{'='*60}")
         print(f"✓ Successfully imported: {self.imported_count}")
+        if self.updated_count or self.delisted_count or self.unchanged_count:
+            print(f"↻ Updated (price/image changed): {self.updated_count}")
+            print(f"⊘ Marked delisted: {self.delisted_count}")
+            print(f"= Unchanged (no write): {self.unchanged_count}")
         print(f"⚠ Skipped (duplicates/invalid): {self.skipped_count}")
+        if self.cross_pack_count:
+            print(f"⇄ Skipped (MLS number in another pack): {self.cross_pack_count}")
         print(f"✗ Failed: {self.failed_count}")
         print(f"{'='*60}\n")
 
@@ -246,6 +409,16 @@ def main():
 ╚════════════════════════════════════════════════════════════╝
     """)
 
+    # --diff: only write added/changed listings and mark removed ones delisted
+    diff_mode = '--diff' in sys.argv[1:]
+    if diff_mode:
+        print("Diff mode: only changed listings will be written (requires migration 008)")
+    # --allow-mass-delist: apply removals even when they exceed MAX_DELIST_FRACTION of the pack
+    allow_mass_delist = '--allow-mass-delist' in sys.argv[1:]
+
+    # --staging: read from the local staging store instead of the JSON files
+    use_staging = '--staging' in sys.argv[1:]
+
     # Check if images directory exists
     if not IMAGES_DIR.exists():
         print(f"⚠ Warning: Images directory not found at {IMAGES_DIR}")
@@ -261,15 +434,18 @@ def main():
     json_with_urls = DATA_DIR / "properties_ca_selenium_with_supabase_urls.json"
     json_regular = DATA_DIR / "properties_ca_selenium.json"
 
-    if json_with_urls.exists():
+    if use_staging:
+        print(f"\n✓ Using staging store")
+        importer.import_from_store(StagingStore(), diff=diff_mode, allow_mass_delist=allow_mass_delist)
+    elif json_with_urls.exists():
         print(f"\n✓ Found JSON with Supabase image URLs")
-        importer.import_from_json(json_with_urls)
+        importer.import_from_json(json_with_urls, diff=diff_mode, allow_mass_delist=allow_mass_delist)
     elif json_regular.exists():
         print(f"\n⚠ Using JSON without Supabase URLs - images may not display correctly")
         print(f"  Consider running upload_images_to_supabase.py first")
         response = input("\nContinue with original JSON? (y/n): ")
         if response.lower() == 'y':
-            importer.import_from_json(json_regular)
+            importer.import_from_json(json_regular, diff=diff_mode, allow_mass_delist=allow_mass_delist)
         else:
             print("Import cancelled.")
             return
@@ -281,12 +457,14 @@ def main():
         return
 
     importer.print_summary()
+    importer.metrics.print_summary()
+    importer.metrics.export('import_pack2')
     importer.update_pack_count()
 
     # Query and display Pack 2 statistics
     try:
         print("\nQuerying Pack 2 statistics...")
-        result = supabase.table('properties').select('price').eq('pack_id', PACK_ID).execute()
+        result = get_client().table('properties').select('price').eq('pack_id', PACK_ID).execute()
 
         if result.data:
             prices = [p['price'] for p in result.data if p.get('price')]
@@ -4,26 +4,17 @@ Import scraped property data into Supabase
 Supports both US and Canadian properties
 """
 
-import os
-import json
+import sys
 import csv
 from pathlib import Path
-from typing import List, Dict, Optional
-from dotenv import load_dotenv
-from supabase import create_client, Client
+from typing import List, Dict, Optional, Union
 
-# Load environment variables
-load_dotenv()
-
-# Supabase configuration
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY environment variables")
-
-# Initialize Supabase client with service role key (for write access)
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+import json_codec
+from supabase_client import get_client
+from geocoder import get_geocoder
+from property_record import PropertyRecord, as_record, load_records
+from staging_store import StagingStore
+from instrumentation import Instrumentation
 
 # Data paths
 DATA_DIR = Path(__file__).parent / "data"
@@ -31,134 +22,35 @@ DATA_DIR = Path(__file__).parent / "data"
 
 class PropertyImporter:
     def __init__(self):
-        self.supabase = supabase
+        self.supabase = get_client()
         self.imported_count = 0
         self.failed_count = 0
         self.skipped_count = 0
+        self.imported_mls_numbers = []
+        self.metrics = Instrumentation()
 
-    def normalize_property_data(self, prop: Dict, country: str) -> Optional[Dict]:
+    def normalize_property_data(self, prop: Union[PropertyRecord, Dict], country: str) -> Optional[Dict]:
         """
         Normalize property data to match database schema
         Handles both US (Redfin) and CA (Realtor.ca) data formats
         """
         try:
-            normalized = {
-                'country': country,
-            }
-
-            # MLS/Property ID
-            if 'mls_number' in prop:
-                normalized['mls_number'] = str(prop['mls_number']) if prop['mls_number'] else None
-            if 'property_id' in prop:
-                normalized['property_id'] = str(prop['property_id']) if prop['property_id'] else None
-
-            # Address - REQUIRED
-            if 'address' in prop and prop['address']:
-                normalized['address'] = str(prop['address']).strip()
-            else:
-                return None  # Skip properties without address
-
-            # Location details
-            if 'city' in prop and prop['city']:
-                normalized['city'] = str(prop['city']).strip()
-
-            if country == 'US':
-                if 'state' in prop and prop['state']:
-                    normalized['state'] = str(prop['state']).strip()
-            elif country == 'CA':
-                if 'province' in prop and prop['province']:
-                    normalized['province'] = str(prop['province']).strip()
-
-            if 'postal_code' in prop and prop['postal_code']:
-                normalized['postal_code'] = str(prop['postal_code']).strip()
-
-            # Coordinates
-            if 'latitude' in prop and prop['latitude']:
-                try:
-                    normalized['latitude'] = float(prop['latitude'])
-                except (ValueError, TypeError):
-                    normalized['latitude'] = None
-
-            if 'longitude' in prop and prop['longitude']:
-                try:
-                    normalized['longitude'] = float(prop['longitude'])
-                except (ValueError, TypeError):
-                    normalized['longitude'] = None
-
-            # Price - REQUIRED
-            if 'price' in prop and prop['price']:
-                try:
-                    # Handle both integer and string prices
-                    price_str = str(prop['price']).replace('$', '').replace(',', '').strip()
-                    normalized['price'] = int(float(price_str))
-
-                    if normalized['price'] <= 0:
-                        return None  # Skip invalid prices
-                except (ValueError, TypeError):
-                    return None
-            else:
+            record = as_record(prop)
+
+            # Address and a positive price are REQUIRED
+            if not record.address or not record.price or record.price <= 0:
                 return None
 
-            # Property details
-            if 'bedrooms' in prop and prop['bedrooms'] is not None:
-                try:
-                    normalized['bedrooms'] = int(prop['bedrooms'])
-                except (ValueError, TypeError):
-                    normalized['bedrooms'] = None
-
-            if 'bathrooms' in prop and prop['bathrooms'] is not None:
-                try:
-                    normalized['bathrooms'] = int(prop['bathrooms'])
-                except (ValueError, TypeError):
-                    normalized['bathrooms'] = None
-
-            if 'sqft' in prop and prop['sqft']:
-                try:
-                    # Handle numeric sqft
-                    if isinstance(prop['sqft'], (int, float)):
-                        normalized['sqft'] = int(prop['sqft'])
-                    # Handle string sqft (e.g., "1500-2000 sqft")
-                    else:
-                        sqft_str = str(prop['sqft']).replace(',', '').replace('sqft', '').strip()
-                        # Try to extract first number
-                        import re
-                        match = re.search(r'(\d+)', sqft_str)
-                        if match:
-                            normalized['sqft'] = int(match.group(1))
-                except (ValueError, TypeError):
-                    normalized['sqft'] = None
-
-            if 'lot_size' in prop and prop['lot_size']:
-                normalized['lot_size'] = str(prop['lot_size']).strip()
-
-            if 'year_built' in prop and prop['year_built']:
-                try:
-                    normalized['year_built'] = int(prop['year_built'])
-                except (ValueError, TypeError):
-                    normalized['year_built'] = None
-
-            if 'property_type' in prop and prop['property_type']:
-                normalized['property_type'] = str(prop['property_type']).strip()
-
-            # URLs
-            if 'url' in prop and prop['url']:
-                normalized['listing_url'] = str(prop['url']).strip()
-            elif 'public_url' in prop and prop['public_url']:
-                normalized['listing_url'] = str(prop['public_url']).strip()
-            elif 'listing_url' in prop and prop['listing_url']:
-                normalized['listing_url'] = str(prop['listing_url']).strip()
-
-            if 'image_url' in prop and prop['image_url']:
-                normalized['image_url'] = str(prop['image_url']).strip()
-
-            if 'image_url_med' in prop and prop['image_url_med']:
-                normalized['image_url_med'] = str(prop['image_url_med']).strip()
-
-            if 'image_url_low' in prop and prop['image_url_low']:
-                normalized['image_url_low'] = str(prop['image_url_low']).strip()
-
-            if 'local_image_path' in prop and prop['local_image_path']:
-                normalized['local_image_path'] = str(prop['local_image_path']).strip()
+            normalized = record.to_row()
+            normalized['country'] = country
+            normalized.pop('pack_id', None)  # Pack 1 rows keep the column default
+
+            # US listings have a state, CA listings a province
+            normalized.pop('province' if country == 'US' else 'state', None)
+
+            if country == 'CA':
+                # Canonical city/province/postal code, centroid coordinates when missing (offline)
+                normalized.update(get_geocoder().geocode(normalized))
 
             return normalized
 
@@ -177,27 +69,34 @@ class PropertyImporter:
 
             # Normalize batch
             normalized_batch = []
-            for prop in batch:
-                normalized = self.normalize_property_data(prop, country)
-                if normalized:
-                    normalized_batch.append(normalized)
-                else:
-                    self.skipped_count += 1
+            with self.metrics.stage('normalize_batch'):
+                for prop in batch:
+                    normalized = self.normalize_property_data(prop, country)
+                    if normalized:
+                        normalized_batch.append(normalized)
+                    else:
+                        self.skipped_count += 1
+                        self.metrics.count('rows_skipped')
 
             if not normalized_batch:
                 continue
 
             try:
                 # Insert batch into Supabase
-                result = self.supabase.table('properties').insert(normalized_batch).execute()
+                with self.metrics.stage('insert_batch'):
+                    result = self.supabase.table('properties').insert(normalized_batch).execute()
 
                 imported = len(normalized_batch)
                 self.imported_count += imported
+                self.metrics.count('rows_imported', imported)
+                self.metrics.count('bytes_sent', len(json_codec.dumps(normalized_batch)))
+                self.imported_mls_numbers.extend(p['mls_number'] for p in normalized_batch if p.get('mls_number'))
 
                 print(f"  ✓ Batch {i//batch_size + 1}: Imported {imported} properties")
 
             except Exception as e:
                 error_msg = str(e)
+                self.metrics.error('insert_batch', e)
 
                 # Check for duplicate MLS number errors
                 if 'duplicate key' in error_msg.lower():
@@ -205,17 +104,26 @@ class PropertyImporter:
 
                     # Try importing one by one to skip duplicates
                     for prop in normalized_batch:
+                        self.metrics.count('row_retries')
                         try:
-                            self.supabase.table('properties').insert(prop).execute()
+                            with self.metrics.stage('insert_row'):
+                                self.supabase.table('properties').insert(prop).execute()
                             self.imported_count += 1
+                            self.metrics.count('rows_imported')
+                            if prop.get('mls_number'):
+                                self.imported_mls_numbers.append(prop['mls_number'])
                         except Exception as single_error:
+                            self.metrics.error('insert_row', single_error)
                             if 'duplicate key' in str(single_error).lower():
                                 self.skipped_count += 1
+                                self.metrics.count('rows_skipped')
                             else:
                                 self.failed_count += 1
+                                self.metrics.count('rows_failed')
                                 print(f"    ✗ Failed to import: {str(single_error)[:100]}")
                 else:
                     self.failed_count += len(normalized_batch)
+                    self.metrics.count('rows_failed', len(normalized_batch))
                     print(f"  ✗ Batch {i//batch_size + 1}: Error - {error_msg[:150]}")
 
     def import_from_json(self, filepath: Path, country: str):
@@ -229,8 +137,7 @@ class PropertyImporter:
             return
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                properties = json.load(f)
+            properties = load_records(filepath)
 
             print(f"Loaded {len(properties)} properties from JSON")
             self.import_batch(properties, country)
@@ -261,6 +168,19 @@ class PropertyImporter:
         except Exception as e:
             print(f"Error loading CSV file: {str(e)}")
 
+    def import_from_store(self, store: StagingStore, country: str):
+        """Import properties from the local staging store"""
+        print(f"\n{'='*60}")
+        print(f"Loading {country} properties from {store.path.name}")
+        print(f"{'='*60}")
+
+        properties = store.load_properties(country=country)
+        print(f"Loaded {len(properties)} properties from staging store")
+        self.import_batch(properties, country)
+
+        # Properties imported without an explicit pack land in Pack 1 (column default)
+        store.mark_imported(self.imported_mls_numbers, 1)
+
     def print_summary(self):
         """Print import summary"""
         print(f"\n{'='*60}")
@@ -277,7 +197,9 @@ def main():
 
     # Import Canadian properties
     ca_json = DATA_DIR / "properties_ca_selenium.json"
-    if ca_json.exists():
+    if '--staging' in sys.argv[1:]:
+        importer.import_from_store(StagingStore(), 'CA')
+    elif ca_json.exists():
         importer.import_from_json(ca_json, 'CA')
     else:
         print(f"Canadian data not found at {ca_json}")
@@ -295,11 +217,13 @@ def main():
     #     importer.import_from_csv(ca_csv, 'CA')
 
     importer.print_summary()
+    importer.metrics.print_summary()
+    importer.metrics.export('import_properties')
 
     # Query and display some statistics
     try:
         print("\nQuerying database statistics...")
-        result = supabase.table('property_stats').select('*').execute()
+        result = get_client().table('property_stats').select('*').execute()
 
         if result.data:
             print("\nProperty Statistics:")
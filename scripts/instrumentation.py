@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Lightweight timing/counter instrumentation for the data scripts
+Stages are timed with a context manager; the run report gives per-stage
+p50/p95 and throughput, and the same spans can be written as Chrome
+trace events (open in chrome://tracing or https://ui.perfetto.dev)
+or exported as a Prometheus textfile (node_exporter textfile collector)
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Where export() writes <job>.prom / <job>.json (point node_exporter's textfile collector here)
+METRICS_DIR = Path(os.getenv('METRICS_TEXTFILE_DIR', Path(__file__).parent / "data" / "metrics"))
+
+# Histogram bucket upper bounds in seconds for the Prometheus export
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def error_class(error: Exception) -> str:
+    """Stable label for an exception: type name plus the PostgREST/HTTP code when there is one"""
+    code = getattr(error, 'code', None)
+    if code is None:
+        response = getattr(error, 'response', None)
+        code = getattr(response, 'status_code', None)
+    name = type(error).__name__
+    return f"{name}:{code}" if code is not None else name
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+class Instrumentation:
+    def __init__(self):
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._t0 = time.perf_counter()
+        self.durations: Dict[str, List[float]] = {}
+        self.counters: Dict[str, int] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
+        self.trace_events: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one span of stage `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.durations.setdefault(name, []).append(finished - started)
+                self.trace_events.append({
+                    'name': name,
+                    'ph': 'X',
+                    'ts': round((started - self._t0) * 1e6),
+                    'dur': round((finished - started) * 1e6),
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                })
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def error(self, stage: str, error: Exception):
+        """Count a failure of `stage` by error class"""
+        label = error_class(error)
+        with self._lock:
+            by_class = self.errors.setdefault(stage, {})
+            by_class[label] = by_class.get(label, 0) + 1
+
+    def report(self) -> Dict:
+        wall_seconds = time.perf_counter() - self._t0
+        with self._lock:
+            stages = {
+                name: {
+                    'calls': len(values),
+                    'total_seconds': round(sum(values), 4),
+                    'p50_ms': round(percentile(values, 50) * 1000, 2),
+                    'p95_ms': round(percentile(values, 95) * 1000, 2),
+                    'max_ms': round(max(values) * 1000, 2),
+                }
+                for name, values in self.durations.items()
+            }
+            counters = dict(self.counters)
+            errors = {stage: dict(by_class) for stage, by_class in self.errors.items()}
+
+        return {
+            'started_at': self.started_at,
+            'wall_seconds': round(wall_seconds, 2),
+            'stages': stages,
+            'counters': counters,
+            'errors': errors,
+            'rates_per_second': {
+                name: round(value / wall_seconds, 2) if wall_seconds else 0.0
+                for name, value in counters.items()
+            },
+        }
+
+    def save_report(self, filepath: Path) -> Dict:
+        report = self.report()
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Run report saved to {filepath}")
+        return report
+
+    def to_prometheus(self, job: str) -> str:
+        """Prometheus text exposition: stage latency histograms, counters and error counts"""
+        prefix = _metric_name(job)
+        wall_seconds = time.perf_counter() - self._t0
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per call of each stage",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        with self._lock:
+            for stage, values in sorted(self.durations.items()):
+                ordered = sorted(values)
+                below = 0
+                for bound in HISTOGRAM_BUCKETS:
+                    while below < len(ordered) and ordered[below] <= bound:
+                        below += 1
+                    lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {below}')
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {len(ordered)}')
+                lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {sum(ordered):.6f}')
+                lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {len(ordered)}')
+
+            for name, value in sorted(self.counters.items()):
+                metric = f"{prefix}_{_metric_name(name)}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for stage, by_class in sorted(self.errors.items()):
+                for label, value in sorted(by_class.items()):
+                    lines.append(f'{prefix}_errors_total{{stage="{stage}",class="{label}"}} {value}')
+
+        lines.append(f"# TYPE {prefix}_wall_seconds gauge")
+        lines.append(f"{prefix}_wall_seconds {wall_seconds:.3f}")
+        lines.append(f"# TYPE {prefix}_last_run_timestamp_seconds gauge")
+        lines.append(f"{prefix}_last_run_timestamp_seconds {time.time():.0f}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, job: str, directory: Optional[Path] = None):
+        """Write <job>.prom (atomically, as the textfile collector expects) and <job>.json"""
+        directory = Path(directory or METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        prom_file = directory / f"{job}.prom"
+        tmp_file = prom_file.with_suffix('.prom.tmp')
+        tmp_file.write_text(self.to_prometheus(job), encoding='utf-8')
+        os.replace(tmp_file, prom_file)
+
+        with open(directory / f"{job}.json", 'w', encoding='utf-8') as f:
+            json.dump({'job': job, **self.report()}, f, indent=2)
+        print(f"✓ Metrics exported to {directory}/{job}.prom and {job}.json")
+
+    def save_trace(self, filepath: Path):
+        """Chrome trace-event JSON for flamegraph-style viewing"""
+        with self._lock:
+            events = list(self.trace_events)
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        print(f"✓ Trace ({len(events)} spans) saved to {filepath}")
+
+    def print_summary(self):
+        report = self.report()
+        print(f"\n{'='*60}")
+        print(f"STAGE TIMING ({report['wall_seconds']:.1f}s wall)")
+        print(f"{'='*60}")
+        for name, s in sorted(report['stages'].items(), key=lambda item: -item[1]['total_seconds']):
+            print(f"  {name:<16} {s['calls']:>6} calls  {s['total_seconds']:>9.1f}s total  "
+                  f"p50 {s['p50_ms']:>8.1f}ms  p95 {s['p95_ms']:>8.1f}ms")
+        for name, value in report['counters'].items():
+            print(f"  {name:<16} {value:>10,}  ({report['rates_per_second'][name]:,.1f}/s)")
+        for stage, by_class in report['errors'].items():
+            for label, value in by_class.items():
+                print(f"  ✗ {stage}: {label} x{value}")
+        print(f"{'='*60}\n")
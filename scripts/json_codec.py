@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Shared JSON encoding/decoding for the scripts' data files
+Uses the fastest codec installed - orjson, then msgspec - and falls back to the
+standard library, so nothing here is required. Set JSON_CODEC=orjson|msgspec|stdlib
+to force one (benchmarks, or ruling the codec out when debugging a file).
+  - dumps() / dump(): compact UTF-8 by default; pretty=True for 2-space indents
+  - loads() / load(): inputs over MMAP_THRESHOLD are parsed straight from a
+    read-only memory map instead of being copied into a bytes object first
+Values the codec can't encode natively (datetimes, Decimals, UUIDs) are written
+with str(), like the json.dump(..., default=str) calls this replaces. msgspec
+encodes datetimes itself (ISO 8601 with a "T"), so they are converted with str()
+before it sees them and every backend writes the same "2024-01-01 12:00:00".
+
+Usage:
+  python json_codec.py                                  # Show the codec in use
+  python json_codec.py data/properties_ca_selenium.json # Rewrite a file compact
+  python json_codec.py data/properties_ca_selenium.json --pretty
+"""
+
+import json
+import mmap
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Union
+
+MMAP_THRESHOLD = 4 * 1024 * 1024  # Smaller files are faster to just read()
+
+BACKENDS = ('orjson', 'msgspec', 'stdlib')
+
+
+def _require_orjson():
+    try:
+        import orjson
+    except ImportError:
+        raise ImportError("The orjson codec requires orjson: pip install orjson")
+    return orjson
+
+
+def _require_msgspec():
+    try:
+        import msgspec.json
+    except ImportError:
+        raise ImportError("The msgspec codec requires msgspec: pip install msgspec")
+    return msgspec.json
+
+
+def available_backends() -> list:
+    """Codecs that can be used in this environment, fastest first"""
+    names = []
+    for name, require in (('orjson', _require_orjson), ('msgspec', _require_msgspec)):
+        try:
+            require()
+            names.append(name)
+        except ImportError:
+            continue
+    return names + ['stdlib']
+
+
+def _select_backend() -> str:
+    forced = os.getenv('JSON_CODEC', '').strip().lower()
+    if not forced:
+        return available_backends()[0]
+    if forced not in BACKENDS:
+        raise ValueError(f"JSON_CODEC must be one of {', '.join(BACKENDS)}, not {forced!r}")
+    return forced
+
+
+BACKEND = _select_backend()
+
+
+def _str_datetimes(obj: Any) -> Any:
+    """Copy of obj with datetimes as str() (containers without any are returned as is)"""
+    if isinstance(obj, datetime):
+        return str(obj)
+    if isinstance(obj, dict):
+        converted = None
+        for key, value in obj.items():
+            new = _str_datetimes(value)
+            if new is not value:
+                if converted is None:
+                    converted = dict(obj)
+                converted[key] = new
+        return obj if converted is None else converted
+    if isinstance(obj, (list, tuple)):
+        items = [_str_datetimes(value) for value in obj]
+        return items if any(new is not old for new, old in zip(items, obj)) else obj
+    return obj
+
+
+def dumps(obj: Any, pretty: bool = False, sort_keys: bool = False, backend: str = None) -> bytes:
+    """Encode to UTF-8 JSON bytes (compact unless pretty)"""
+    backend = backend or BACKEND
+    if backend == 'orjson':
+        orjson = _require_orjson()
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME  # datetimes via str() too
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option)
+    if backend == 'msgspec':
+        codec = _require_msgspec()
+        data = codec.encode(_str_datetimes(obj), enc_hook=str, order='sorted' if sort_keys else None)
+        return codec.format(data, indent=2) if pretty else data
+    if pretty:
+        text = json.dumps(obj, indent=2, default=str, ensure_ascii=False, sort_keys=sort_keys)
+    else:
+        text = json.dumps(obj, separators=(',', ':'), default=str, ensure_ascii=False, sort_keys=sort_keys)
+    return text.encode('utf-8')
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str], backend: str = None) -> Any:
+    """Decode JSON from bytes, a buffer (e.g. a memory map) or str"""
+    backend = backend or BACKEND
+    if backend == 'orjson':
+        return _require_orjson().loads(data)
+    if backend == 'msgspec':
+        return _require_msgspec().decode(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dump(obj: Any, filepath: Path, pretty: bool = False, sort_keys: bool = False, backend: str = None) -> int:
+    """Write obj to filepath; returns the bytes written"""
+    data = dumps(obj, pretty=pretty, sort_keys=sort_keys, backend=backend)
+    write_bytes(data, filepath)
+    return len(data)
+
+
+def write_bytes(data: bytes, filepath: Path):
+    """Write already-encoded JSON (one encode can feed several files)"""
+    with open(filepath, 'wb') as f:
+        f.write(data)
+
+
+def load(filepath: Path, use_mmap: bool = None, backend: str = None) -> Any:
+    """
+    Read and decode a JSON file
+    use_mmap=None maps files of MMAP_THRESHOLD bytes or more; the stdlib codec
+    can't parse from a buffer, so it always reads.
+    """
+    backend = backend or BACKEND
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if use_mmap is None:
+            use_mmap = size >= MMAP_THRESHOLD
+        if not use_mmap or size == 0 or backend == 'stdlib':
+            return loads(f.read(), backend=backend)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # The view must be released before the map can close
+            with memoryview(mapped) as view:
+                return loads(view, backend=backend)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    pretty = '--pretty' in sys.argv
+
+    print(f"JSON codec: {BACKEND} (available: {', '.join(available_backends())})")
+    if not args:
+        return
+
+    source = Path(args[0])
+    before = source.stat().st_size
+    after = dump(load(source), source, pretty=pretty)
+    print(f"✓ Rewrote {source} {'pretty' if pretty else 'compact'}: "
+          f"{before / 1024:,.0f} KB -> {after / 1024:,.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
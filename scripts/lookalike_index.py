@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Build the lookalike-property lookup table (migration 013) for "lookalike homes" pairs
+The hardest comparisons are homes that match on paper - beds, baths, sqft,
+property type - but not on price. Each pack's listed properties become rows of
+a standardized, weighted float32 feature matrix, and an inverted-file index
+(k-means coarse lists) finds every property's k most similar listings whose
+price differs by at least MIN_PRICE_GAP:
+  - every list is searched against its NPROBE nearest lists at once, as blocked
+    matrix products, so the whole pack is a few hundred vectorized steps
+  - packs up to EXACT_LIMIT properties skip the coarse lists and are searched exactly
+Results go to property_lookalikes; get_lookalike_property(id) serves one.
+
+Requires NumPy: pip install numpy
+
+Usage:
+  python lookalike_index.py                  # Rebuild every pack
+  python lookalike_index.py --pack 2 -k 20   # One pack, 20 lookalikes per property
+  python lookalike_index.py --nprobe 16      # Higher recall, slower
+  python lookalike_index.py --dry-run        # Only report coverage/recall
+"""
+
+import argparse
+import math
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from supabase_client import get_client
+from instrumentation import Instrumentation
+
+LOOKALIKES_PER_PROPERTY = 10
+MIN_PRICE_GAP = 0.10  # Lookalikes must differ in price by at least 10% - a near-tie isn't a question
+
+# Feature weights, applied after standardizing each column (larger = must match more closely)
+WEIGHTS = {
+    'bedrooms': 1.0,
+    'bathrooms': 1.0,
+    'log_sqft': 1.5,
+    'property_type': 2.0,  # A type mismatch costs this much distance
+}
+TOP_PROPERTY_TYPES = 12  # Rarer types share one "other" column
+
+EXACT_LIMIT = 5000  # Packs this small are searched exhaustively
+NPROBE = 8  # Coarse lists searched per list
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE = 20000
+BLOCK_ELEMENTS = 4_000_000  # Distance-matrix entries per block (float32, ~16 MB)
+RECALL_SAMPLE = 500
+
+PAGE_SIZE = 1000
+WRITE_BATCH_SIZE = 500
+
+PROPERTY_COLUMNS = 'id,price,bedrooms,bathrooms,sqft,property_type,pack_id'
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Lookalike index requires NumPy: pip install numpy")
+    return numpy
+
+
+def _number(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def feature_matrix(properties: List[Dict]):
+    """
+    Standardized, weighted features (float32, one row per property)
+    Missing numbers are imputed with the pack median, so they neither attract nor repel
+    """
+    np = _require_numpy()
+    n = len(properties)
+
+    numeric = np.full((n, 3), np.nan, dtype=np.float64)
+    for i, prop in enumerate(properties):
+        bedrooms, bathrooms, sqft = (_number(prop.get(field)) for field in ('bedrooms', 'bathrooms', 'sqft'))
+        numeric[i] = (np.nan if bedrooms is None else bedrooms,
+                      np.nan if bathrooms is None else bathrooms,
+                      math.log(sqft) if sqft and sqft > 0 else np.nan)
+
+    columns = []
+    for j, name in enumerate(('bedrooms', 'bathrooms', 'log_sqft')):
+        column = numeric[:, j]
+        known = ~np.isnan(column)
+        if not known.any():
+            continue  # Nobody in this pack has it - contributes nothing
+        column = np.where(known, column, np.median(column[known]))
+        spread = column.std() or 1.0
+        columns.append((column - column.mean()) / spread * WEIGHTS[name])
+
+    types = [(prop.get('property_type') or '').strip().lower() for prop in properties]
+    common = [name for name, _ in Counter(types).most_common(TOP_PROPERTY_TYPES)]
+    if len(set(types)) > 1:
+        slot = {name: position for position, name in enumerate(common)}
+        one_hot = np.zeros((n, len(common) + 1))
+        one_hot[np.arange(n), [slot.get(name, len(common)) for name in types]] = 1.0
+        # Two differing one-hot rows are sqrt(2) apart; scale so a mismatch costs the weight
+        columns.extend((one_hot * WEIGHTS['property_type'] / math.sqrt(2)).T)
+
+    if not columns:
+        return np.zeros((n, 1), dtype=np.float32)
+    return np.ascontiguousarray(np.column_stack(columns), dtype=np.float32)
+
+
+def kmeans(features, lists: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0):
+    """Coarse centroids from a sample of the rows (Lloyd's algorithm)"""
+    np = _require_numpy()
+    rng = np.random.default_rng(seed)
+    sample = features[rng.choice(len(features), min(len(features), KMEANS_SAMPLE), replace=False)]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = assign(sample, centroids)
+        for c in range(lists):
+            members = sample[assignment == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+    return centroids
+
+
+def assign(features, centroids):
+    """Index of the nearest centroid per row, in blocks"""
+    np = _require_numpy()
+    block = max(1, BLOCK_ELEMENTS // len(centroids))
+    centroid_norms = (centroids * centroids).sum(axis=1)
+    out = np.empty(len(features), dtype=np.int64)
+    for start in range(0, len(features), block):
+        chunk = features[start:start + block]
+        distances = centroid_norms[None, :] - 2.0 * chunk @ centroids.T
+        out[start:start + block] = distances.argmin(axis=1)
+    return out
+
+
+def search(features, log_prices, queries, candidates, k: int, min_log_gap: float):
+    """
+    k nearest `candidates` rows for each of `queries` rows (index arrays), excluding
+    the row itself and anything priced within min_log_gap. Returns (indices, squared
+    distances), both (len(queries), k); missing slots are -1 / inf.
+    """
+    np = _require_numpy()
+    k_found = min(k, len(candidates))
+    out_index = np.full((len(queries), k), -1, dtype=np.int64)
+    out_distance = np.full((len(queries), k), np.inf, dtype=np.float32)
+    if k_found == 0:
+        return out_index, out_distance
+
+    candidate_features = features[candidates]
+    candidate_norms = (candidate_features * candidate_features).sum(axis=1)
+    candidate_prices = log_prices[candidates]
+    block = max(1, BLOCK_ELEMENTS // len(candidates))
+
+    for start in range(0, len(queries), block):
+        rows = queries[start:start + block]
+        query_features = features[rows]
+        distances = ((query_features * query_features).sum(axis=1)[:, None]
+                     + candidate_norms[None, :] - 2.0 * query_features @ candidate_features.T)
+        np.maximum(distances, 0.0, out=distances)
+        distances[rows[:, None] == candidates[None, :]] = np.inf
+        distances[np.abs(log_prices[rows][:, None] - candidate_prices[None, :]) < min_log_gap] = np.inf
+
+        if k_found < len(candidates):
+            nearest = np.argpartition(distances, k_found - 1, axis=1)[:, :k_found]
+        else:
+            nearest = np.broadcast_to(np.arange(len(candidates)), distances.shape)
+        nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+        order = np.argsort(nearest_distances, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        nearest_distances = np.take_along_axis(nearest_distances, order, axis=1)
+
+        found = np.isfinite(nearest_distances)
+        out_index[start:start + block, :k_found] = np.where(found, candidates[nearest], -1)
+        out_distance[start:start + block, :k_found] = nearest_distances
+    return out_index, out_distance
+
+
+def lookalikes(features, log_prices, k: int, min_log_gap: float, nprobe: int = NPROBE,
+               exact_limit: int = EXACT_LIMIT):
+    """(indices, squared distances) of every row's k lookalikes - exact for small packs, IVF otherwise"""
+    np = _require_numpy()
+    n = len(features)
+    everyone = np.arange(n)
+    if n <= exact_limit:
+        return search(features, log_prices, everyone, everyone, k, min_log_gap)
+
+    lists = int(math.sqrt(n))
+    centroids = kmeans(features, lists)
+    assignment = assign(features, centroids)
+    members = [np.flatnonzero(assignment == c) for c in range(lists)]
+
+    # Probe lists nearest to each list's centroid (the list itself is always first)
+    centroid_norms = (centroids * centroids).sum(axis=1)
+    centroid_distances = centroid_norms[:, None] + centroid_norms[None, :] - 2.0 * centroids @ centroids.T
+    probes = np.argsort(centroid_distances, axis=1)[:, :min(nprobe, lists)]
+
+    out_index = np.full((n, k), -1, dtype=np.int64)
+    out_distance = np.full((n, k), np.inf, dtype=np.float32)
+    for c in range(lists):
+        if not len(members[c]):
+            continue
+        candidates = np.concatenate([members[p] for p in probes[c]])
+        out_index[members[c]], out_distance[members[c]] = search(
+            features, log_prices, members[c], candidates, k, min_log_gap)
+    return out_index, out_distance
+
+
+def recall(features, log_prices, indices, k: int, min_log_gap: float, sample: int = RECALL_SAMPLE) -> float:
+    """Share of the exact top-k found by the index, on a sample of rows"""
+    np = _require_numpy()
+    rng = np.random.default_rng(1)
+    rows = rng.choice(len(features), min(len(features), sample), replace=False)
+    exact_index, exact_distance = search(features, log_prices, rows, np.arange(len(features)), k, min_log_gap)
+    found = approximate_found = 0
+    for row, exact, distances in zip(rows, exact_index, exact_distance):
+        # Equal-distance ties may resolve to different rows, so compare distances, not ids
+        approximate = np.sort(((features[indices[row][indices[row] >= 0]] - features[row]) ** 2).sum(axis=1))
+        expected = distances[exact >= 0]
+        found += len(expected)
+        approximate_found += int(np.sum(approximate[:len(expected)] <= expected + 1e-4))
+    return approximate_found / found if found else 1.0
+
+
+class LookalikeIndexBuilder:
+    def __init__(self, k: int = LOOKALIKES_PER_PROPERTY, min_price_gap: float = MIN_PRICE_GAP,
+                 nprobe: int = NPROBE, dry_run: bool = False):
+        self.supabase = get_client()
+        self.metrics = Instrumentation()
+        self.k = k
+        self.min_log_gap = math.log1p(min_price_gap)
+        self.min_price_gap = min_price_gap
+        self.nprobe = nprobe
+        self.dry_run = dry_run
+        self.summary: Dict[int, Dict] = {}
+
+    def fetch_properties(self) -> Dict[int, List[Dict]]:
+        """Listed, priced properties grouped by pack (NULL pack_id is Pack 1)"""
+        packs: Dict[int, List[Dict]] = defaultdict(list)
+        cursor = None
+        while True:
+            query = (
+                self.supabase.table('properties')
+                .select(PROPERTY_COLUMNS)
+                .is_('delisted_at', 'null')
+                .gt('price', 0)
+            )
+            if cursor:
+                query = query.gt('id', cursor)
+            with self.metrics.stage('fetch_page'):
+                rows = query.order('id').limit(PAGE_SIZE).execute().data or []
+            for row in rows:
+                # Nothing to compare on paper without any of beds/baths/sqft
+                if any(row.get(field) for field in ('bedrooms', 'bathrooms', 'sqft')):
+                    packs[row.get('pack_id') or 1].append(row)
+            if len(rows) < PAGE_SIZE:
+                return packs
+            cursor = rows[-1]['id']
+
+    def build_pack(self, properties: List[Dict], pack_id: int, built_at: str) -> Tuple[List[Dict], float]:
+        """Lookalike rows for one pack, plus the measured recall against an exact search"""
+        np = _require_numpy()
+        with self.metrics.stage('features'):
+            features = feature_matrix(properties)
+            log_prices = np.log(np.array([float(p['price']) for p in properties]))
+        with self.metrics.stage('search'):
+            indices, distances = lookalikes(features, log_prices, self.k, self.min_log_gap, self.nprobe)
+        measured = 1.0
+        if len(properties) > EXACT_LIMIT:
+            with self.metrics.stage('recall'):
+                measured = recall(features, log_prices, indices, self.k, self.min_log_gap)
+
+        rows = []
+        for i, prop in enumerate(properties):
+            for rank, (j, distance) in enumerate(zip(indices[i], distances[i])):
+                if j < 0:
+                    break
+                rows.append({
+                    'property_id': str(prop['id']),
+                    'lookalike_rank': rank,
+                    'lookalike_id': str(properties[j]['id']),
+                    'distance': round(math.sqrt(float(distance)), 4),
+                    'pack_id': pack_id,
+                    'built_at': built_at,
+                })
+        return rows, measured
+
+    def _write(self, pack_id: int, rows: List[Dict], built_at: str):
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            with self.metrics.stage('upsert_lookalikes'):
+                self.supabase.table('property_lookalikes').upsert(
+                    rows[i:i + WRITE_BATCH_SIZE], on_conflict='property_id,lookalike_rank'
+                ).execute()
+        # Lists that shrank (or properties that dropped out) still have rows from older builds
+        with self.metrics.stage('delete_stale'):
+            (self.supabase.table('property_lookalikes').delete()
+             .eq('pack_id', pack_id).lt('built_at', built_at).execute())
+
+    def run(self, pack_ids: Optional[List[int]] = None):
+        _require_numpy()
+        packs = self.fetch_properties()
+        for pack_id in sorted(packs):
+            if pack_ids and pack_id not in pack_ids:
+                continue
+            properties = packs[pack_id]
+            built_at = datetime.now(timezone.utc).isoformat()
+            with self.metrics.stage('build_pack'):
+                rows, measured = self.build_pack(properties, pack_id, built_at)
+            if not self.dry_run:
+                self._write(pack_id, rows, built_at)
+
+            covered = len({row['property_id'] for row in rows})
+            self.summary[pack_id] = {
+                'properties': len(properties),
+                'covered': covered,
+                'rows': len(rows),
+                'recall': measured,
+            }
+            self.metrics.count('lookalike_rows', len(rows))
+            print(f"  Pack {pack_id}: {covered:,} / {len(properties):,} properties have lookalikes "
+                  f"({len(rows):,} rows, recall {measured:.1%})")
+
+    def print_summary(self):
+        print(f"\n{'='*60}")
+        print(f"LOOKALIKE INDEX SUMMARY{' (dry run)' if self.dry_run else ''}")
+        print(f"{'='*60}")
+        print(f"k = {self.k}, min price gap {self.min_price_gap:.0%}, nprobe {self.nprobe}")
+        for pack_id, stats in sorted(self.summary.items()):
+            print(f"  Pack {pack_id}: {stats['covered']:,} / {stats['properties']:,} covered, "
+                  f"{stats['rows']:,} rows, recall {stats['recall']:.1%}")
+        print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute lookalike-property lists per pack")
+    parser.add_argument('--pack', type=int, action='append', help="Only this pack (repeatable)")
+    parser.add_argument('-k', type=int, default=LOOKALIKES_PER_PROPERTY, help="Lookalikes kept per property")
+    parser.add_argument('--min-price-gap', type=float, default=MIN_PRICE_GAP,
+                        help="Minimum relative price difference (0.1 = 10%%)")
+    parser.add_argument('--nprobe', type=int, default=NPROBE, help="Coarse lists searched per list")
+    parser.add_argument('--dry-run', action='store_true', help="Build and report without writing")
+    args = parser.parse_args()
+
+    builder = LookalikeIndexBuilder(k=args.k, min_price_gap=args.min_price_gap,
+                                    nprobe=args.nprobe, dry_run=args.dry_run)
+    builder.run(args.pack)
+    builder.print_summary()
+    builder.metrics.export('lookalike_index')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Build the nearby-property lookup table (migration 012) for "same neighbourhood" pairs
+Each pack's listed properties are bucketed into a uniform grid over projected
+coordinates; a property's k nearest neighbours are found by scanning rings of
+cells outwards from its own cell until no unscanned cell can hold anything closer.
+The lists are written to property_neighbors, so serving a nearby opponent is
+get_nearby_property(id): one primary-key read of at most k rows.
+
+Rows whose coordinates are only a city centroid (geo_precision = 'city', or
+pre-migration-014 rows sitting exactly on a gazetteer centroid) are left out:
+every listing in the city would be "0 m" from every other.
+Listings that share a point (a condo building) are tie-broken by a stable hash
+of their ids, so each property gets a different, repeatable sample of them.
+
+Usage:
+  python pair_index.py                      # Rebuild every pack
+  python pair_index.py --pack 2 -k 20       # One pack, 20 neighbours per property
+  python pair_index.py --max-km 1.5         # Tighter neighbourhoods
+  python pair_index.py --dry-run            # Only report coverage/distances
+"""
+
+import argparse
+import bisect
+import heapq
+import math
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from supabase_client import get_client
+from geocoder import EARTH_RADIUS_KM, PRECISION_CITY, get_geocoder, project
+from instrumentation import Instrumentation
+
+NEIGHBORS_PER_PROPERTY = 10
+MAX_DISTANCE_KM = 3.0  # Further than this isn't "the same neighbourhood"
+CELL_KM = 0.25
+
+PAGE_SIZE = 1000
+WRITE_BATCH_SIZE = 500
+
+PROPERTY_COLUMNS = 'id,address,latitude,longitude,geo_precision,pack_id'
+
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * 1000 * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """
+    Uniform grid over projected (km) points for k-nearest-neighbour queries
+    Points at identical coordinates share one site, so a pile of listings at a
+    single spot costs one distance check. Ties are ordered by (key[j] - key[i])
+    mod 2**32: per site that is a rotation of the members sorted by key, so the
+    first few of a pile are found by bisection instead of scanning it.
+    """
+
+    def __init__(self, points: List[Tuple[float, float]], keys: List[int], cell_km: float = CELL_KM):
+        self.points = points
+        self.keys = keys
+        self.cell_km = cell_km
+        site_of: Dict[Tuple[float, float], int] = {}
+        self.sites: List[Tuple[float, float]] = []
+        self.members: List[List[int]] = []
+        self.site_of_point: List[int] = []
+        for index, point in enumerate(points):
+            site = site_of.get(point)
+            if site is None:
+                site = site_of[point] = len(self.sites)
+                self.sites.append(point)
+                self.members.append([])
+            self.members[site].append(index)
+            self.site_of_point.append(site)
+        for members in self.members:
+            members.sort(key=keys.__getitem__)
+        self.member_keys = [[keys[index] for index in members] for members in self.members]
+
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for site, (x, y) in enumerate(self.sites):
+            self.cells[self._cell(x, y)].append(site)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_km), math.floor(y / self.cell_km)
+
+    @staticmethod
+    def _ring(cx: int, cy: int, ring: int) -> Iterator[Tuple[int, int]]:
+        """Cells exactly `ring` steps (Chebyshev) from (cx, cy)"""
+        if ring == 0:
+            yield cx, cy
+            return
+        for dx in range(-ring, ring + 1):
+            yield cx + dx, cy - ring
+            yield cx + dx, cy + ring
+        for dy in range(-ring + 1, ring):
+            yield cx - ring, cy + dy
+            yield cx + ring, cy + dy
+
+    def _take(self, site: int, index: int, limit: int,
+              accept: Optional[Callable[[int, int], bool]]) -> List[int]:
+        """First `limit` members of a site in tie order for point `index`"""
+        members = self.members[site]
+        start = bisect.bisect_left(self.member_keys[site], self.keys[index])
+        taken = []
+        for step in range(len(members)):
+            other = members[(start + step) % len(members)]
+            if other != index and (accept is None or accept(index, other)):
+                taken.append(other)
+                if len(taken) == limit:
+                    break
+        return taken
+
+    def nearest(self, index: int, k: int, max_km: float,
+                accept: Optional[Callable[[int, int], bool]] = None) -> List[Tuple[float, int]]:
+        """Up to k (squared km, point index) within max_km of point `index`, nearest first"""
+        x, y = self.points[index]
+        key = self.keys[index]
+        cx, cy = self._cell(x, y)
+        limit_d2 = max_km * max_km  # Tightens to the k-th best once k are found
+        max_ring = math.ceil(max_km / self.cell_km)
+        found: List[Tuple[float, int, int]] = []
+
+        for ring in range(max_ring + 1):
+            for cell in self._ring(cx, cy, ring):
+                for site in self.cells.get(cell, ()):
+                    sx, sy = self.sites[site]
+                    d2 = (sx - x) ** 2 + (sy - y) ** 2
+                    if d2 > limit_d2:
+                        continue
+                    members = self.members[site]
+                    if len(members) == 1:
+                        other = members[0]
+                        if other != index and (accept is None or accept(index, other)):
+                            found.append((d2, (self.keys[other] - key) & 0xFFFFFFFF, other))
+                    else:
+                        for other in self._take(site, index, k, accept):
+                            found.append((d2, (self.keys[other] - key) & 0xFFFFFFFF, other))
+            if len(found) >= k:
+                found = heapq.nsmallest(k, found)
+                limit_d2 = found[-1][0]
+                # Anything in ring + 1 or beyond is at least ring cells away
+                if limit_d2 <= (ring * self.cell_km) ** 2:
+                    break
+
+        return [(d2, other) for d2, _, other in sorted(found)[:k]]
+
+
+class PairIndexBuilder:
+    def __init__(self, k: int = NEIGHBORS_PER_PROPERTY, max_km: float = MAX_DISTANCE_KM,
+                 cell_km: float = CELL_KM, dry_run: bool = False):
+        self.supabase = get_client()
+        self.metrics = Instrumentation()
+        self.k = k
+        self.max_km = max_km
+        self.cell_km = cell_km
+        self.dry_run = dry_run
+        self.summary: Dict[int, Dict] = {}
+        self.approximate: Dict[int, int] = defaultdict(int)
+
+    @staticmethod
+    def is_approximate(row: Dict) -> bool:
+        """Coordinates that are only a city centroid"""
+        if row.get('geo_precision'):
+            return row['geo_precision'] == PRECISION_CITY
+        return get_geocoder().is_centroid(row['latitude'], row['longitude'])
+
+    def fetch_properties(self) -> Dict[int, List[Dict]]:
+        """Listed properties with listing-level coordinates, grouped by pack (NULL pack_id is Pack 1)"""
+        packs: Dict[int, List[Dict]] = defaultdict(list)
+        cursor = None
+        while True:
+            query = (
+                self.supabase.table('properties')
+                .select(PROPERTY_COLUMNS)
+                .is_('delisted_at', 'null')
+                .not_.is_('latitude', 'null')
+                .not_.is_('longitude', 'null')
+            )
+            if cursor:
+                query = query.gt('id', cursor)
+            with self.metrics.stage('fetch_page'):
+                rows = query.order('id').limit(PAGE_SIZE).execute().data or []
+            for row in rows:
+                pack_id = row.get('pack_id') or 1
+                if self.is_approximate(row):
+                    self.approximate[pack_id] += 1
+                else:
+                    packs[pack_id].append(row)
+            if len(rows) < PAGE_SIZE:
+                return packs
+            cursor = rows[-1]['id']
+
+    def build_pack(self, properties: List[Dict], pack_id: int, built_at: str) -> List[Dict]:
+        """Neighbour rows for one pack"""
+        coordinates = [(float(p['latitude']), float(p['longitude'])) for p in properties]
+        ids = [str(p['id']) for p in properties]
+        addresses = [(p.get('address') or '').strip().lower() for p in properties]
+        keys = [zlib.crc32(property_id.encode()) for property_id in ids]
+        grid = GridIndex([project(lat, lng) for lat, lng in coordinates], keys, self.cell_km)
+
+        def accept(i: int, j: int) -> bool:
+            # The same home listed twice isn't a comparison
+            return addresses[i] != addresses[j]
+
+        rows = []
+        for i in range(len(properties)):
+            for rank, (_, j) in enumerate(grid.nearest(i, self.k, self.max_km, accept)):
+                rows.append({
+                    'property_id': ids[i],
+                    'neighbor_rank': rank,
+                    'neighbor_id': ids[j],
+                    'distance_m': round(haversine_m(*coordinates[i], *coordinates[j])),
+                    'pack_id': pack_id,
+                    'built_at': built_at,
+                })
+        return rows
+
+    def _write(self, pack_id: int, rows: List[Dict], built_at: str):
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            with self.metrics.stage('upsert_neighbors'):
+                self.supabase.table('property_neighbors').upsert(
+                    rows[i:i + WRITE_BATCH_SIZE], on_conflict='property_id,neighbor_rank'
+                ).execute()
+        # Lists that shrank (or properties that dropped out) still have rows from older builds
+        with self.metrics.stage('delete_stale'):
+            (self.supabase.table('property_neighbors').delete()
+             .eq('pack_id', pack_id).lt('built_at', built_at).execute())
+
+    def run(self, pack_ids: Optional[List[int]] = None):
+        packs = self.fetch_properties()
+        for pack_id in sorted(set(packs) | set(self.approximate)):
+            if pack_ids and pack_id not in pack_ids:
+                continue
+            properties = packs.get(pack_id, [])
+            built_at = datetime.now(timezone.utc).isoformat()
+            with self.metrics.stage('build_pack'):
+                rows = self.build_pack(properties, pack_id, built_at)
+            if not self.dry_run:
+                self._write(pack_id, rows, built_at)
+
+            distances = sorted(row['distance_m'] for row in rows)
+            covered = len({row['property_id'] for row in rows})
+            self.summary[pack_id] = {
+                'properties': len(properties),
+                'covered': covered,
+                'rows': len(rows),
+                'median_m': distances[len(distances) // 2] if distances else None,
+            }
+            self.metrics.count('neighbor_rows', len(rows))
+            print(f"  Pack {pack_id}: {covered:,} / {len(properties):,} properties have neighbours "
+                  f"within {self.max_km:g} km ({len(rows):,} rows, "
+                  f"{self.approximate[pack_id]:,} city-centroid rows left out)")
+
+    def print_summary(self):
+        print(f"\n{'='*60}")
+        print(f"PAIR INDEX SUMMARY{' (dry run)' if self.dry_run else ''}")
+        print(f"{'='*60}")
+        print(f"k = {self.k}, max distance {self.max_km:g} km, {self.cell_km:g} km grid cells")
+        for pack_id, stats in sorted(self.summary.items()):
+            median = f"{stats['median_m']:,} m" if stats['median_m'] is not None else "-"
+            print(f"  Pack {pack_id}: {stats['covered']:,} / {stats['properties']:,} covered, "
+                  f"{stats['rows']:,} rows, median neighbour distance {median}, "
+                  f"{self.approximate[pack_id]:,} city-centroid rows left out")
+        print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute nearby-property lists per pack")
+    parser.add_argument('--pack', type=int, action='append', help="Only this pack (repeatable)")
+    parser.add_argument('-k', type=int, default=NEIGHBORS_PER_PROPERTY, help="Neighbours kept per property")
+    parser.add_argument('--max-km', type=float, default=MAX_DISTANCE_KM, help="Furthest neighbour distance")
+    parser.add_argument('--cell-km', type=float, default=CELL_KM, help="Grid cell size")
+    parser.add_argument('--dry-run', action='store_true', help="Build and report without writing")
+    args = parser.parse_args()
+
+    builder = PairIndexBuilder(k=args.k, max_km=args.max_km, cell_km=args.cell_km, dry_run=args.dry_run)
+    builder.run(args.pack)
+    builder.print_summary()
+    builder.metrics.export('pair_index')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Columnar Parquet snapshots of scraped/imported properties
+Typed schema (price, sqft, beds/baths, coordinates) with column projection
+and predicate pushdown on read, so consumers only decode what they need
+
+Requires pyarrow: pip install pyarrow
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import json_codec
+from property_record import PropertyRecord, as_record
+
+# Data paths
+DATA_DIR = Path(__file__).parent / "data"
+SNAPSHOT_FILE = DATA_DIR / "properties_ca_selenium.parquet"
+
+# Sorting by price keeps each row group's min/max tight so price filters skip whole groups
+ROW_GROUP_SIZE = 10_000
+
+# (column, arrow type name) - kept as plain names so importing this module doesn't need pyarrow
+SCHEMA_FIELDS = [
+    ('mls_number', 'string'),
+    ('address', 'string'),
+    ('city', 'string'),
+    ('province', 'string'),
+    ('postal_code', 'string'),
+    ('country', 'string'),
+    ('price', 'int64'),
+    ('bedrooms', 'int16'),
+    ('bathrooms', 'int16'),
+    ('sqft', 'int32'),
+    ('latitude', 'float64'),
+    ('longitude', 'float64'),
+    ('property_type', 'string'),
+    ('listing_url', 'string'),
+    ('image_url', 'string'),
+    ('supabase_image_url', 'string'),
+    ('local_image_path', 'string'),
+    ('pack_id', 'int16'),
+]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet snapshots require pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def arrow_schema():
+    pa, _ = _require_pyarrow()
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in SCHEMA_FIELDS])
+
+
+def coerce_row(prop: Union[PropertyRecord, Dict]) -> Dict:
+    """Map a property record (or loosely-typed dict) onto the snapshot schema"""
+    record = as_record(prop)
+    return {name: getattr(record, name) for name, _ in SCHEMA_FIELDS}
+
+
+def write_snapshot(properties: Iterable[Union[PropertyRecord, Dict]], filepath: Path = SNAPSHOT_FILE) -> int:
+    """Write properties to a zstd-compressed Parquet file, sorted by price"""
+    pa, pq = _require_pyarrow()
+
+    rows = sorted(
+        (coerce_row(p) for p in properties),
+        key=lambda r: (r['price'] is None, r['price'] or 0),
+    )
+    schema = arrow_schema()
+    columns = {name: [r[name] for r in rows] for name, _ in SCHEMA_FIELDS}
+    table = pa.Table.from_pydict(columns, schema=schema)
+
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, filepath, compression='zstd', row_group_size=ROW_GROUP_SIZE)
+
+    print(f"Saved {len(rows)} properties to {filepath}")
+    return len(rows)
+
+
+def read_snapshot(filepath: Path = SNAPSHOT_FILE, columns: Optional[List[str]] = None,
+                  filters: Optional[List] = None):
+    """
+    Read a snapshot as a pyarrow Table
+
+    Args:
+        columns: Only decode these columns (e.g. ['mls_number', 'price'])
+        filters: pyarrow DNF filters pushed down to row groups,
+                 e.g. [('price', '>=', 500000), ('city', '=', 'Toronto')]
+    """
+    _, pq = _require_pyarrow()
+    return pq.read_table(filepath, columns=columns, filters=filters)
+
+
+def read_snapshot_rows(filepath: Path = SNAPSHOT_FILE, columns: Optional[List[str]] = None,
+                       filters: Optional[List] = None) -> List[Dict]:
+    """Same as read_snapshot, returned as a list of dicts"""
+    return read_snapshot(filepath, columns=columns, filters=filters).to_pylist()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage:")
+        print("  python parquet_snapshot.py --from-json <file.json> [out.parquet]")
+        print("  python parquet_snapshot.py --from-staging [out.parquet]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "--from-json" and len(sys.argv) > 2:
+        source = Path(sys.argv[2])
+        output = Path(sys.argv[3]) if len(sys.argv) > 3 else source.with_suffix('.parquet')
+        properties = json_codec.load(source)
+    elif command == "--from-staging":
+        from staging_store import StagingStore
+        output = Path(sys.argv[2]) if len(sys.argv) > 2 else SNAPSHOT_FILE
+        properties = StagingStore().load_properties()
+    else:
+        print(f"Unknown command: {' '.join(sys.argv[1:])}")
+        sys.exit(1)
+
+    write_snapshot(properties, output)
+
+
+if __name__ == "__main__":
+    main()
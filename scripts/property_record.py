@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+One typed property record shared by the scraper, uploaders, importers, data checker
+and snapshot tools
+Scraped values arrive loosely typed ("$850,000", "3 + 1" bedrooms, "1,500 sqft")
+and under a few different keys (url / public_url / listing_url). from_dict()
+parses them once into a slots-based record; everything downstream works with
+typed attributes instead of re-parsing dicts:
+  - to_dict(): canonical keys, empty fields dropped (what the JSON/CSV/staging files hold)
+  - to_row(): a row for the Supabase properties table
+  - load_records() / save_records(): JSON files of records (json_codec, compact by default)
+Keys the record doesn't know are kept in `extra` so a round trip loses nothing.
+"""
+
+import math
+import re
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import json_codec
+
+NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def parse_str(value) -> Optional[str]:
+    text = str(value).strip()
+    return text or None
+
+
+def parse_int(value) -> Optional[int]:
+    """1200, "1,200", "$850,000", "-100", "1500-2000 sqft" (first number) -> int"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if math.isfinite(value) else None
+    match = NUMBER_RE.search(str(value).replace(',', ''))
+    return int(float(match.group())) if match else None
+
+
+def parse_count(value) -> Optional[int]:
+    """Room counts: like parse_int, but "3 + 1" (above + below grade) is summed"""
+    if isinstance(value, str) and '+' in value:
+        parts = NUMBER_RE.findall(value.replace(',', ''))
+        return int(sum(float(part) for part in parts)) if parts else None
+    return parse_int(value)
+
+
+def parse_float(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+@dataclass(slots=True)
+class PropertyRecord:
+    mls_number: Optional[str] = None
+    property_id: Optional[str] = None
+    address: Optional[str] = None
+    city: Optional[str] = None
+    state: Optional[str] = None
+    province: Optional[str] = None
+    postal_code: Optional[str] = None
+    country: Optional[str] = None
+    price: Optional[int] = None
+    bedrooms: Optional[int] = None
+    bathrooms: Optional[int] = None
+    sqft: Optional[int] = None
+    lot_size: Optional[str] = None
+    year_built: Optional[int] = None
+    property_type: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    listing_url: Optional[str] = None
+    image_url: Optional[str] = None
+    image_url_med: Optional[str] = None
+    image_url_low: Optional[str] = None
+    local_image_path: Optional[str] = None
+    supabase_image_url: Optional[str] = None
+    pack_id: Optional[int] = None
+    extra: Optional[Dict] = None  # Unrecognized keys, passed through untouched
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PropertyRecord':
+        """Parse a scraped/stored dict; unparseable values become None rather than raising"""
+        values = {}
+        extra = None
+        for key, value in data.items():
+            field = ALIASES.get(key, key)
+            parser = PARSERS.get(field)
+            if parser is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            if value is None or value == '':
+                continue
+            # The canonical key wins over its aliases, whichever comes first
+            if field != key and values.get(field) is not None:
+                continue
+            parsed = parser(value)
+            if parsed is not None:
+                values[field] = parsed
+        record = cls(**values)
+        record.extra = extra
+        return record
+
+    def to_dict(self) -> Dict:
+        """Canonical keys with values set, plus any passed-through extras"""
+        out = {}
+        for name in FIELD_NAMES:
+            value = getattr(self, name)
+            if value is not None:
+                out[name] = value
+        if self.extra:
+            for key, value in self.extra.items():
+                out.setdefault(key, value)
+        return out
+
+    def to_row(self) -> Dict:
+        """
+        A Supabase properties row
+        The uploaded copy of the image is preferred for image_url; image_url_med falls
+        back to the original URL whether or not the image was uploaded
+        """
+        row = {}
+        for name in ROW_FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                row[name] = value
+        if self.image_url and not self.image_url_med:
+            row['image_url_med'] = self.image_url
+        if self.supabase_image_url:
+            row['image_url'] = self.supabase_image_url
+        return row
+
+
+FIELD_NAMES = tuple(f.name for f in fields(PropertyRecord) if f.name != 'extra')
+
+# Columns of the properties table (supabase_image_url is folded into image_url by to_row)
+ROW_FIELDS = tuple(name for name in FIELD_NAMES if name != 'supabase_image_url')
+
+PARSERS: Dict[str, Callable] = {
+    'mls_number': parse_str,
+    'property_id': parse_str,
+    'address': parse_str,
+    'city': parse_str,
+    'state': parse_str,
+    'province': parse_str,
+    'postal_code': parse_str,
+    'country': parse_str,
+    'price': parse_int,
+    'bedrooms': parse_count,
+    'bathrooms': parse_count,
+    'sqft': parse_int,
+    'lot_size': parse_str,
+    'year_built': parse_int,
+    'property_type': parse_str,
+    'latitude': parse_float,
+    'longitude': parse_float,
+    'listing_url': parse_str,
+    'image_url': parse_str,
+    'image_url_med': parse_str,
+    'image_url_low': parse_str,
+    'local_image_path': parse_str,
+    'supabase_image_url': parse_str,
+    'pack_id': parse_int,
+}
+
+# Other names the same fields arrive under
+ALIASES = {
+    'url': 'listing_url',
+    'public_url': 'listing_url',
+}
+
+
+def as_record(prop: Union[PropertyRecord, Dict]) -> PropertyRecord:
+    return prop if isinstance(prop, PropertyRecord) else PropertyRecord.from_dict(prop)
+
+
+def load_records(filepath: Path) -> List[PropertyRecord]:
+    """Records from a JSON array of property dicts"""
+    return [PropertyRecord.from_dict(prop) for prop in json_codec.load(filepath)]
+
+
+def save_records(records: Iterable[Union[PropertyRecord, Dict]], filepath: Path, pretty: bool = False) -> List[Dict]:
+    """Write records as a JSON array of canonical dicts; returns the dicts written"""
+    rows = [as_record(record).to_dict() for record in records]
+    json_codec.dump(rows, filepath, pretty=pretty)
+    return rows
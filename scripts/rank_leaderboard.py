@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Maintain the precomputed per-pack leaderboard rank tables (migration 009)
+Only leaderboard rows newer than each pack's high-water mark are read. They are
+folded into the compact best-score-per-player table, dense ranks and
+score-percentile buckets are recomputed from that table (one row per player,
+not per game) and only rows whose rank actually changed are written back.
+
+Run on a schedule, or after backups: python backup_leaderboard.py --refresh-ranks
+
+Usage:
+  python rank_leaderboard.py              # Incremental refresh of every pack
+  python rank_leaderboard.py --pack 2     # Just one pack
+  python rank_leaderboard.py --rebuild    # Recompute from the full leaderboard (after deletes/restores)
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from supabase_client import get_client
+from instrumentation import Instrumentation
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per request
+WRITE_BATCH_SIZE = 500
+
+# Re-read this far behind the high-water mark: scores committed late with an
+# earlier created_at are still picked up, and folding a row in twice is a no-op
+HIGH_WATER_OVERLAP = timedelta(minutes=5)
+
+ENTRY_COLUMNS = 'id,player_name,score,correct_guesses,total_guesses,selfie_url,selfie_thumb_url,created_at'
+
+
+def player_key(player_name: str) -> str:
+    """Players are matched case-insensitively, ignoring surrounding whitespace"""
+    return (player_name or '').strip().lower()
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def is_better(entry: Dict, current: Optional[Dict]) -> bool:
+    """Higher score wins; ties go to the earlier entry (same order as get_top_scores)"""
+    if current is None:
+        return True
+    if entry['best_score'] != current['best_score']:
+        return entry['best_score'] > current['best_score']
+    return parse_timestamp(entry['achieved_at']) < parse_timestamp(current['achieved_at'])
+
+
+def percent_of(part: int, total: int) -> int:
+    """Integer percentage rounded half up, matching Postgres ROUND()"""
+    return (part * 200 + total) // (2 * total) if total else 100
+
+
+def compute_ranks(players: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Dense-rank best scores and build one bucket per distinct score
+    Returns (players with dense_rank/percentile set, buckets)
+    """
+    total = len(players)
+    at_score: Dict[int, int] = {}
+    for player in players:
+        at_score[player['best_score']] = at_score.get(player['best_score'], 0) + 1
+
+    buckets = {}
+    below = total
+    for rank, score in enumerate(sorted(at_score, reverse=True), start=1):
+        below -= at_score[score]
+        buckets[score] = {
+            'score': score,
+            'dense_rank': rank,
+            'players_at_score': at_score[score],
+            'players_below': below,
+            'percentile': percent_of(below, total),
+        }
+
+    for player in players:
+        bucket = buckets[player['best_score']]
+        player['dense_rank'] = bucket['dense_rank']
+        player['percentile'] = bucket['percentile']
+
+    return players, list(buckets.values())
+
+
+class LeaderboardRanker:
+    def __init__(self):
+        self.supabase = get_client()
+        self.metrics = Instrumentation()
+
+    def _pages(self, query_factory) -> Iterator[List[Dict]]:
+        """Offset-paginate a query (rebuilt per page, since postgrest builders are single-use)"""
+        start = 0
+        while True:
+            with self.metrics.stage('fetch_page'):
+                rows = query_factory().range(start, start + PAGE_SIZE - 1).execute().data or []
+            if rows:
+                yield rows
+            if len(rows) < PAGE_SIZE:
+                return
+            start += PAGE_SIZE
+
+    def pack_ids(self) -> List[int]:
+        result = self.supabase.table('packs').select('id').order('id').execute()
+        return [row['id'] for row in result.data or []]
+
+    def fetch_state(self) -> Dict[int, Dict]:
+        result = self.supabase.table('leaderboard_rank_state').select('*').execute()
+        return {row['pack_id']: row for row in result.data or []}
+
+    def fetch_entries(self, pack_id: int, since: Optional[str]) -> Iterator[Dict]:
+        """Leaderboard rows of a pack created at/after `since` (all of them when None)"""
+        def query():
+            q = self.supabase.table('leaderboard').select(ENTRY_COLUMNS).eq('pack_id', pack_id)
+            if since:
+                q = q.gte('created_at', since)
+            return q.order('created_at').order('id')
+
+        for rows in self._pages(query):
+            yield from rows
+
+    def fetch_ranks(self, pack_id: int, keys: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """A pack's rank rows by player key (only those players when `keys` is given)"""
+        def query(chunk=None):
+            q = self.supabase.table('leaderboard_ranks').select('*').eq('pack_id', pack_id)
+            if chunk is not None:
+                q = q.in_('player_key', chunk)
+            return q.order('player_key')
+
+        if keys is None:
+            return {row['player_key']: row for rows in self._pages(query) for row in rows}
+
+        ranks = {}
+        for i in range(0, len(keys), WRITE_BATCH_SIZE):
+            chunk = keys[i:i + WRITE_BATCH_SIZE]
+            for rows in self._pages(lambda: query(chunk)):
+                ranks.update((row['player_key'], row) for row in rows)
+        return ranks
+
+    def _write(self, table: str, rows: List[Dict], on_conflict: str):
+        for i in range(0, len(rows), WRITE_BATCH_SIZE):
+            with self.metrics.stage(f'upsert_{table}'):
+                self.supabase.table(table).upsert(rows[i:i + WRITE_BATCH_SIZE], on_conflict=on_conflict).execute()
+
+    def _save_state(self, pack_id: int, high_water_mark: Optional[str], player_count: int, refreshed_at: str):
+        self.supabase.table('leaderboard_rank_state').upsert({
+            'pack_id': pack_id,
+            'high_water_mark': high_water_mark,
+            'player_count': player_count,
+            'refreshed_at': refreshed_at,
+        }, on_conflict='pack_id').execute()
+
+    def refresh_pack(self, pack_id: int, state: Optional[Dict], rebuild: bool = False) -> Dict:
+        """Fold new entries into the pack's rank table; returns counts for the summary"""
+        since = None
+        if state and state.get('high_water_mark') and not rebuild:
+            since = (parse_timestamp(state['high_water_mark']) - HIGH_WATER_OVERLAP).isoformat()
+
+        if rebuild:
+            new_entries = self.fetch_entries(pack_id, since)  # Streamed: this is the whole leaderboard
+            existing = self.fetch_ranks(pack_id)
+            players = {}
+        else:
+            new_entries = list(self.fetch_entries(pack_id, since))
+            if not new_entries:
+                # Nothing new since the mark - no need to read the rank table at all
+                return {'entries': 0, 'players': (state or {}).get('player_count') or 0, 'written': 0}
+            # Only the players who just played can improve; the full table is read
+            # further down, and only if one of them did
+            keys = sorted({key for key in (player_key(e['player_name']) for e in new_entries) if key})
+            players = {key: dict(row) for key, row in self.fetch_ranks(pack_id, keys).items()}
+        high_water_mark = None if rebuild else (state or {}).get('high_water_mark')
+
+        entries = 0
+        improved = set()
+        for entry in new_entries:
+            entries += 1
+            key = player_key(entry['player_name'])
+            if not key:
+                continue
+            candidate = {
+                'pack_id': pack_id,
+                'player_key': key,
+                'player_name': entry['player_name'].strip(),
+                'best_entry_id': entry['id'],
+                'best_score': entry['score'],
+                'correct_guesses': entry.get('correct_guesses') or 0,
+                'total_guesses': entry.get('total_guesses') or 0,
+                'selfie_url': entry.get('selfie_url'),
+                'selfie_thumb_url': entry.get('selfie_thumb_url'),
+                'achieved_at': entry['created_at'],
+            }
+            if is_better(candidate, players.get(key)):
+                players[key] = candidate
+                improved.add(key)
+            if high_water_mark is None or parse_timestamp(entry['created_at']) > parse_timestamp(high_water_mark):
+                high_water_mark = entry['created_at']
+        self.metrics.count('entries_read', entries)
+
+        now = datetime.now(timezone.utc).isoformat()
+        if not improved and not rebuild:
+            # Nobody beat their best - just move the mark so these rows aren't read again
+            player_count = (state or {}).get('player_count') or 0
+            if state:
+                self._save_state(pack_id, high_water_mark, player_count, now)
+            return {'entries': entries, 'players': player_count, 'written': 0}
+
+        if not rebuild:
+            # Someone moved up, so everyone's dense rank/percentile can shift: rank the whole pack
+            best = {key: players[key] for key in improved}
+            existing = self.fetch_ranks(pack_id)
+            players = {key: dict(row) for key, row in existing.items()}
+            players.update(best)
+
+        with self.metrics.stage('compute_ranks'):
+            ranked, buckets = compute_ranks(list(players.values()))
+
+        changed = []
+        for player in ranked:
+            before = existing.get(player['player_key'])
+            if (player['player_key'] in improved or before is None
+                    or before['dense_rank'] != player['dense_rank']
+                    or before['percentile'] != player['percentile']):
+                row = {column: player[column] for column in (
+                    'pack_id', 'player_key', 'player_name', 'best_entry_id', 'best_score',
+                    'correct_guesses', 'total_guesses', 'selfie_url', 'selfie_thumb_url', 'achieved_at',
+                    'dense_rank', 'percentile')}
+                row['updated_at'] = now
+                changed.append(row)
+
+        self._write('leaderboard_ranks', changed, 'pack_id,player_key')
+        self._write('leaderboard_score_buckets', [{'pack_id': pack_id, **b} for b in buckets], 'pack_id,score')
+        self.metrics.count('ranks_written', len(changed))
+
+        # Scores nobody holds any more (a player improved, or rows were deleted before a rebuild)
+        stale_buckets = self.supabase.table('leaderboard_score_buckets').delete().eq('pack_id', pack_id)
+        if buckets:
+            stale_buckets = stale_buckets.not_.in_('score', [b['score'] for b in buckets])
+        stale_buckets.execute()
+
+        stale_players = [key for key in existing if key not in players]
+        for i in range(0, len(stale_players), WRITE_BATCH_SIZE):
+            (self.supabase.table('leaderboard_ranks').delete().eq('pack_id', pack_id)
+             .in_('player_key', stale_players[i:i + WRITE_BATCH_SIZE]).execute())
+
+        # State last: a run that dies part-way re-reads the same window next time
+        self._save_state(pack_id, high_water_mark, len(players), now)
+
+        return {'entries': entries, 'players': len(players), 'written': len(changed)}
+
+    def refresh(self, pack_ids: Optional[List[int]] = None, rebuild: bool = False):
+        print(f"\n{'='*60}")
+        print(f"LEADERBOARD RANKS - {'full rebuild' if rebuild else 'incremental refresh'}")
+        print(f"{'='*60}")
+
+        state = self.fetch_state()
+        for pack_id in pack_ids or self.pack_ids():
+            with self.metrics.stage('refresh_pack'):
+                result = self.refresh_pack(pack_id, state.get(pack_id), rebuild=rebuild)
+            print(f"  Pack {pack_id}: {result['entries']:,} new entries, "
+                  f"{result['players']:,} players, {result['written']:,} rank rows written")
+
+
+def main():
+    args = sys.argv[1:]
+    rebuild = '--rebuild' in args
+    pack_ids = None
+    if '--pack' in args:
+        pack_ids = [int(args[args.index('--pack') + 1])]
+
+    ranker = LeaderboardRanker()
+    ranker.refresh(pack_ids, rebuild=rebuild)
+    ranker.metrics.print_summary()
+    ranker.metrics.export('rank_leaderboard')
+
+
+if __name__ == "__main__":
+    main()
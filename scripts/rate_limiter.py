@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-host rate limiter for the scrapers
+One token bucket per host whose rate follows AIMD: it creeps up while
+responses are healthy and halves (plus a cooldown pause) when the site
+answers with a captcha, HTTP 429/403, or an empty result page that doesn't
+show the site's "no results" message (a genuinely empty search is healthy).
+Thread-safe, so parallel browsers and image workers can share one limiter.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# Requests per second per host: (start, min, max)
+HOST_RATES = {
+    "www.realtor.ca": (0.3, 0.05, 1.0),   # Result pages / Next clicks
+    "cdn.realtor.ca": (5.0, 0.5, 20.0),   # Listing photos
+}
+DEFAULT_RATE = (2.0, 0.2, 10.0)
+BURST = 2  # Tokens a host can bank while idle
+
+ADDITIVE_INCREASE = 0.05  # req/s added per healthy response
+MULTIPLICATIVE_DECREASE = 0.5
+BAN_COOLDOWN = 30.0  # seconds to pause a host after a ban signal (doubles on repeats)
+MAX_COOLDOWN = 600.0
+
+BAN_STATUS_CODES = {403, 429}
+CAPTCHA_MARKERS = [
+    "captcha", "incapsula incident", "request unsuccessful",
+    "are you a robot", "unusual traffic", "access denied",
+]
+
+# realtor.ca's empty-search state: zero results alongside one of these is a real answer, not a block
+NO_RESULTS_MARKERS = [
+    "noresultscon", "no results found", "no results were found",
+    "no listings found", "we couldn't find any",
+]
+
+
+def shows_no_results(page_source: Optional[str]) -> bool:
+    """Whether a page is the site's own "nothing matches this search" state"""
+    if not page_source:
+        return False
+    lowered = page_source.lower()
+    return any(marker in lowered for marker in NO_RESULTS_MARKERS)
+
+
+def detect_ban(status_code: Optional[int] = None, page_source: Optional[str] = None,
+               result_count: Optional[int] = None) -> Optional[str]:
+    """
+    Classify a response as a ban/throttle signal
+    result_count=0 is only suspicious when the page lacks a no-results marker;
+    pass result_count=None when zero results are expected (e.g. past the first page)
+
+    Returns the reason ('http 429', 'captcha', 'empty page') or None if the response looks healthy
+    """
+    if status_code in BAN_STATUS_CODES:
+        return f"http {status_code}"
+    if result_count:
+        return None  # Real results - don't trip on recaptcha scripts embedded in normal pages
+    if page_source:
+        lowered = page_source.lower()
+        for marker in CAPTCHA_MARKERS:
+            if marker in lowered:
+                return "captcha"
+    if result_count == 0 and not shows_no_results(page_source):
+        return "empty page"
+    return None
+
+
+class _HostBucket:
+    def __init__(self, rate: float, min_rate: float, max_rate: float):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.cooldown = BAN_COOLDOWN
+        self.requests = 0
+        self.bans = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(BURST, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, host_rates: Dict[str, tuple] = HOST_RATES):
+        self.host_rates = host_rates
+        self.buckets: Dict[str, _HostBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url_or_host: str) -> str:
+        return urlparse(url_or_host).netloc or url_or_host
+
+    def _bucket(self, host: str) -> _HostBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = _HostBucket(*self.host_rates.get(host, DEFAULT_RATE))
+        return bucket
+
+    def acquire(self, url_or_host: str):
+        """Block until the host's bucket has a token (and any ban cooldown has passed)"""
+        host = self.host(url_or_host)
+        while True:
+            with self._lock:
+                bucket = self._bucket(host)
+                now = time.monotonic()
+                if now >= bucket.paused_until:
+                    bucket._refill(now)
+                    if bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        bucket.requests += 1
+                        return
+                    wait = (1 - bucket.tokens) / bucket.rate
+                else:
+                    wait = bucket.paused_until - now
+            time.sleep(wait)
+
+    def success(self, url_or_host: str):
+        """Healthy response: additive increase"""
+        with self._lock:
+            bucket = self._bucket(self.host(url_or_host))
+            bucket.rate = min(bucket.max_rate, bucket.rate + ADDITIVE_INCREASE)
+            bucket.cooldown = BAN_COOLDOWN
+
+    def backoff(self, url_or_host: str, reason: str):
+        """Ban/throttle signal: multiplicative decrease and pause the host"""
+        host = self.host(url_or_host)
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.rate = max(bucket.min_rate, bucket.rate * MULTIPLICATIVE_DECREASE)
+            bucket.tokens = 0.0
+            bucket.paused_until = bucket.updated = time.monotonic() + bucket.cooldown
+            bucket.bans += 1
+            cooldown = bucket.cooldown
+            bucket.cooldown = min(MAX_COOLDOWN, bucket.cooldown * 2)
+            rate = bucket.rate
+        print(f"  ⚠ {host}: {reason} - pausing {cooldown:.0f}s, rate now {rate:.2f} req/s")
+
+    def report(self, url_or_host: str, status_code: Optional[int] = None,
+               page_source: Optional[str] = None, result_count: Optional[int] = None) -> Optional[str]:
+        """Feed a response into the controller; returns the ban reason if one was detected"""
+        reason = detect_ban(status_code, page_source, result_count)
+        if reason:
+            self.backoff(url_or_host, reason)
+        else:
+            self.success(url_or_host)
+        return reason
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                host: {'rate': round(b.rate, 3), 'requests': b.requests, 'bans': b.bans}
+                for host, b in self.buckets.items()
+            }
+
+
+# Shared by every scraper/uploader in the process so parallel workers throttle together
+rate_limiter = AdaptiveRateLimiter()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Record/replay harness for benchmarking the Realtor.ca scraper offline
+
+record: scrape live list pages and save each rendered page (scripts stripped)
+        plus the properties extracted from it as fixtures
+replay: serve the fixtures from a local HTTP server, run card extraction
+        (or search_city) against them in an offline headless Chrome and report
+        cards/sec and extraction correctness against the recorded results.
+        In --search-city mode cards/sec counts only the scraper's extraction
+        stages; the flow's fixed settle sleeps are reported as flow_seconds
+
+Usage:
+  python replay_harness.py record --city "Toronto, ON" --pages 2
+  python replay_harness.py replay [--search-city] [--fast-profile] [--report report.json]
+"""
+
+import argparse
+import functools
+import json
+import re
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+from scrape_realtor_selenium import RealtorSeleniumScraper, BASE_URL
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "realtor_list"
+MANIFEST_FILE = FIXTURES_DIR / "manifest.json"
+
+# Fields compared between the recorded and replayed extraction
+# (url is skipped: its host depends on where the page was served from)
+COMPARED_FIELDS = ['mls_number', 'address', 'price', 'bedrooms', 'bathrooms', 'sqft', 'image_url']
+
+# Scraper instrumentation stages that make up extraction in --search-city mode
+EXTRACT_STAGES = ['extract_card', 'api_harvest']
+
+
+def _slug(city: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', city.lower()).strip('-')
+
+
+def sanitize_page(html: str) -> str:
+    """
+    Make a rendered page static: drop scripts, resolve relative links against realtor.ca
+    The <base> only keeps extracted URLs identical to the live ones - replay runs
+    Chrome offline, so nothing it points at is actually fetched
+    """
+    html = re.sub(r'<script\b[^>]*>.*?</script>', '', html, flags=re.S | re.I)
+    return re.sub(r'(<head\b[^>]*>)', rf'\1<base href="{BASE_URL}/">', html, count=1, flags=re.I)
+
+
+def _load_manifest() -> List[Dict]:
+    if not MANIFEST_FILE.exists():
+        return []
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def record(cities: List[str], pages: int, headless: bool):
+    """Scrape live pages and save them as fixtures"""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    manifest = [m for m in _load_manifest() if m['city'] not in cities]
+
+    def save_page(city, page_num, page_source, page_properties):
+        name = f"{_slug(city)}_p{page_num}"
+        (FIXTURES_DIR / f"{name}.html").write_text(sanitize_page(page_source), encoding='utf-8')
+        with open(FIXTURES_DIR / f"{name}.expected.json", 'w', encoding='utf-8') as f:
+            json.dump(page_properties, f, indent=2)
+        manifest.append({'city': city, 'page': page_num, 'fixture': f"{name}.html",
+                         'expected': f"{name}.expected.json", 'cards': len(page_properties)})
+        print(f"  ✓ Recorded {name} ({len(page_properties)} properties)")
+
+    scraper = RealtorSeleniumScraper(headless=headless)
+    scraper.page_hook = save_page
+    scraper._setup_driver()
+    try:
+        for city in cities:
+            print(f"\nRecording {city}...")
+            scraper.search_city(city, max_properties=10_000, max_pages=pages)
+    finally:
+        scraper.supervisor.quit()
+
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"\n✓ {len(manifest)} fixtures in {FIXTURES_DIR}")
+
+
+class FixtureServer:
+    """Serve the fixtures directory; /map returns a chosen fixture for search_city replays"""
+
+    def __init__(self):
+        self.map_fixture = None
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('#')[0].split('?')[0] == '/map' and server.map_fixture:
+                    self.path = f"/{server.map_fixture}"
+                super().do_GET()
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        self.httpd = ThreadingHTTPServer(
+            ('127.0.0.1', 0), functools.partial(Handler, directory=str(FIXTURES_DIR))
+        )
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+
+
+def _compare(expected: List[Dict], actual: List[Dict]) -> Dict:
+    """Field-level match counts, keyed by MLS number"""
+    actual_by_mls = {p.get('mls_number'): p for p in actual}
+    fields_total = 0
+    fields_matched = 0
+    missing = 0
+
+    for exp in expected:
+        act = actual_by_mls.get(exp.get('mls_number'))
+        if act is None:
+            missing += 1
+            continue
+        for field in COMPARED_FIELDS:
+            fields_total += 1
+            if act.get(field) == exp.get(field):
+                fields_matched += 1
+
+    return {
+        'expected': len(expected),
+        'extracted': len(actual),
+        'missing': missing,
+        'field_accuracy': fields_matched / fields_total if fields_total else 0.0,
+    }
+
+
+def _stage_seconds(metrics, names) -> float:
+    """Total time recorded so far for the given instrumentation stages"""
+    return sum(sum(metrics.durations.get(name, [])) for name in names)
+
+
+def replay(search_city: bool = False, fast_profile: bool = False) -> Dict:
+    """Run extraction against every fixture and return a benchmark report"""
+    from selenium.webdriver.common.by import By
+
+    manifest = _load_manifest()
+    if not manifest:
+        raise SystemExit("No fixtures found - run: python replay_harness.py record --city ...")
+
+    results = []
+    with FixtureServer() as server:
+        scraper = RealtorSeleniumScraper(headless=True, base_url=server.url, fast_profile=fast_profile,
+                                         offline=True)
+        scraper._setup_driver()
+        try:
+            for entry in manifest:
+                with open(FIXTURES_DIR / entry['expected'], 'r', encoding='utf-8') as f:
+                    expected = json.load(f)
+
+                if search_city:
+                    # Full search_city flow (page 1 only - pagination is JS-driven)
+                    if entry['page'] != 1:
+                        continue
+                    # The flow sleeps a fixed few seconds to let the page settle, so only
+                    # the extraction stages count towards cards/sec
+                    server.map_fixture = entry['fixture']
+                    extract_before = _stage_seconds(scraper.metrics, EXTRACT_STAGES)
+                    started = time.perf_counter()
+                    actual = scraper.search_city(entry['city'], max_properties=10_000, max_pages=1)
+                    flow_seconds = time.perf_counter() - started
+                    elapsed = _stage_seconds(scraper.metrics, EXTRACT_STAGES) - extract_before
+                    load_seconds = None
+                    cards = len(actual)
+                else:
+                    load_started = time.perf_counter()
+                    scraper.driver.get(f"{server.url}/{entry['fixture']}")
+                    load_seconds = time.perf_counter() - load_started
+                    started = time.perf_counter()
+                    card_elems = scraper.driver.find_elements(By.CLASS_NAME, "listingCard")
+                    actual = [p for p in (scraper._extract_property_from_card(c) for c in card_elems) if p]
+                    elapsed = time.perf_counter() - started
+                    flow_seconds = None
+                    cards = len(card_elems)
+
+                result = {
+                    'fixture': entry['fixture'],
+                    'cards': cards,
+                    'seconds': round(elapsed, 4),
+                    'load_seconds': round(load_seconds, 4) if load_seconds is not None else None,
+                    'flow_seconds': round(flow_seconds, 4) if flow_seconds is not None else None,
+                    'cards_per_second': round(cards / elapsed, 2) if elapsed else 0.0,
+                    **_compare(expected, actual),
+                }
+                results.append(result)
+                print(f"  {entry['fixture']:<40} {cards:>4} cards  {result['cards_per_second']:>8.1f} cards/s  "
+                      f"accuracy {result['field_accuracy']:.1%}")
+        finally:
+            scraper.supervisor.quit()
+
+    total_cards = sum(r['cards'] for r in results)
+    total_seconds = sum(r['seconds'] for r in results)
+    load_times = [r['load_seconds'] for r in results if r['load_seconds'] is not None]
+    flow_times = [r['flow_seconds'] for r in results if r['flow_seconds'] is not None]
+    report = {
+        'mode': 'search_city' if search_city else 'extract',
+        'fast_profile': fast_profile,
+        'fixtures': len(results),
+        'cards': total_cards,
+        'seconds': round(total_seconds, 4),
+        'avg_load_seconds': round(sum(load_times) / len(load_times), 4) if load_times else None,
+        'flow_seconds': round(sum(flow_times), 4) if flow_times else None,
+        'cards_per_second': round(total_cards / total_seconds, 2) if total_seconds else 0.0,
+        'field_accuracy': (sum(r['field_accuracy'] for r in results) / len(results)) if results else 0.0,
+        'pages': results,
+    }
+
+    print(f"\n{'='*60}")
+    print(f"REPLAY SUMMARY ({report['mode']})")
+    print(f"{'='*60}")
+    print(f"Fixtures: {report['fixtures']}")
+    print(f"Cards: {report['cards']:,} in {report['seconds']:.2f}s ({report['cards_per_second']:.1f} cards/s)")
+    if report['avg_load_seconds'] is not None:
+        print(f"Avg page load: {report['avg_load_seconds'] * 1000:.0f} ms")
+    if report['flow_seconds'] is not None:
+        print(f"search_city wall time: {report['flow_seconds']:.2f}s (includes fixed settle sleeps)")
+    print(f"Field accuracy: {report['field_accuracy']:.1%}")
+    print(f"{'='*60}\n")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay Realtor.ca list pages for offline scraper benchmarks")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help="Save live list pages as fixtures")
+    rec.add_argument('--city', action='append', required=True, help='City to record, e.g. "Toronto, ON" (repeatable)')
+    rec.add_argument('--pages', type=int, default=2, help="Result pages to record per city")
+    rec.add_argument('--show-browser', action='store_true', help="Run Chrome with a visible window")
+
+    rep = sub.add_parser('replay', help="Benchmark extraction against saved fixtures")
+    rep.add_argument('--search-city', action='store_true', help="Replay the full search_city flow instead of card extraction only")
+    rep.add_argument('--fast-profile', action='store_true', help="Use the resource-blocking driver profile")
+    rep.add_argument('--report', type=Path, help="Write the JSON report to this file")
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.city, args.pages, headless=not args.show_browser)
+    else:
+        report = replay(search_city=args.search_city, fast_profile=args.fast_profile)
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
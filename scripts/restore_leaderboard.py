@@ -1,41 +1,75 @@
 #!/usr/bin/env python3
 """
-Restore leaderboard data from a backup file
+Restore leaderboard data from a backup file, or bring archived scores back
+(archive_leaderboard.py) from the leaderboard_archive table or an archive file
 """
 
-import os
-import json
+import gzip
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from supabase import create_client, Client
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv('SUPABASE_URL') or os.getenv('VITE_SUPABASE_URL')
-SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+import json_codec
+from supabase_client import get_client
+from selfie_mirror import MIRROR_DIR, SelfieMirror, referenced_objects
 
 # Backup directory
 BACKUP_DIR = Path(__file__).parent / "backups"
 
+ARCHIVE_CHUNK_SIZE = 500
+
+
+def load_backup(backup_path: Path) -> dict:
+    """Read a backup (.json / .json.gz) or an archive file (.jsonl.gz, one record per line)"""
+    if backup_path.name.endswith('.jsonl.gz'):
+        with gzip.open(backup_path, 'rb') as f:
+            data = [json_codec.loads(line) for line in f if line.strip()]
+        return {
+            'backup_date': backup_path.name.split('_', 2)[-1].split('.')[0],
+            'backup_reason': 'Archived by archive_leaderboard.py',
+            'record_count': len(data),
+            'data': data,
+        }
+
+    if backup_path.suffix == '.gz':
+        with gzip.open(backup_path, 'rb') as f:
+            return json_codec.loads(f.read())
+    return json_codec.load(backup_path)
+
+
+def clean_record(record: dict) -> dict:
+    """Only the leaderboard's own columns (drops archived_at, backup metadata, ...)"""
+    clean = {
+        'id': record['id'],
+        'player_name': record['player_name'],
+        'score': record['score'],
+        'correct_guesses': record.get('correct_guesses', 0),
+        'total_guesses': record.get('total_guesses', 0),
+        'created_at': record['created_at']
+    }
+    # Add pack_id / selfie columns if they exist in the backup
+    for column in ('pack_id', 'selfie_url', 'selfie_thumb_url'):
+        if column in record:
+            clean[column] = record[column]
+    return clean
+
 
 def restore_leaderboard(backup_filename):
     """
     Restore leaderboard data from a backup file
 
     WARNING: This will DELETE all current leaderboard data!
+    (Archive files are added back alongside the current data instead.)
     """
+    archive = backup_filename.startswith('leaderboard_archive_')
+
     print("=" * 60)
     print("LEADERBOARD RESTORE SCRIPT")
     print("=" * 60)
-    print("\n⚠️  WARNING: This will DELETE all current leaderboard data!")
-    print("⚠️  Make sure you have a current backup before proceeding!\n")
+    if archive:
+        print("\nArchive file: records are added back, current data is kept\n")
+    else:
+        print("\n⚠️  WARNING: This will DELETE all current leaderboard data!")
+        print("⚠️  Make sure you have a current backup before proceeding!\n")
 
     # Find backup file
     backup_path = BACKUP_DIR / backup_filename
@@ -46,8 +80,7 @@ def restore_leaderboard(backup_filename):
     try:
         # Load backup data
         print(f"Loading backup from: {backup_path}")
-        with open(backup_path, 'r', encoding='utf-8') as f:
-            backup = json.load(f)
+        backup = load_backup(backup_path)
 
         leaderboard_data = backup.get('data', [])
         record_count = len(leaderboard_data)
@@ -58,15 +91,17 @@ def restore_leaderboard(backup_filename):
         print(f"  Reason: {backup.get('backup_reason', 'N/A')}")
 
         # Confirm with user
-        confirmation = input(f"\nRestore {record_count:,} records? This will DELETE current data! (yes/no): ")
+        warning = "" if archive else " This will DELETE current data!"
+        confirmation = input(f"\nRestore {record_count:,} records?{warning} (yes/no): ")
         if confirmation.lower() != 'yes':
             print("\n✗ Restore cancelled")
             return False
 
-        # Delete current leaderboard data
-        print("\n🗑️  Deleting current leaderboard data...")
-        response = supabase.table('leaderboard').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
-        print(f"✓ Current data deleted")
+        if not archive:
+            # Delete current leaderboard data
+            print("\n🗑️  Deleting current leaderboard data...")
+            response = get_client().table('leaderboard').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
+            print(f"✓ Current data deleted")
 
         # Restore data in batches
         batch_size = 100
@@ -77,25 +112,13 @@ def restore_leaderboard(backup_filename):
         for i in range(0, record_count, batch_size):
             batch = leaderboard_data[i:i + batch_size]
 
-            # Remove any fields that might cause issues
-            clean_batch = []
-            for record in batch:
-                clean_record = {
-                    'id': record['id'],
-                    'player_name': record['player_name'],
-                    'score': record['score'],
-                    'correct_guesses': record.get('correct_guesses', 0),
-                    'total_guesses': record.get('total_guesses', 0),
-                    'created_at': record['created_at']
-                }
-                # Add pack_id if it exists in the backup
-                if 'pack_id' in record:
-                    clean_record['pack_id'] = record['pack_id']
-
-                clean_batch.append(clean_record)
-
-            # Insert batch
-            supabase.table('leaderboard').insert(clean_batch).execute()
+            clean_batch = [clean_record(record) for record in batch]
+
+            # Insert batch (archived rows already back in the table are skipped)
+            if archive:
+                get_client().table('leaderboard').upsert(clean_batch, on_conflict='id', ignore_duplicates=True).execute()
+            else:
+                get_client().table('leaderboard').insert(clean_batch).execute()
             restored_count += len(batch)
 
             print(f"  ✓ Restored {restored_count:,} / {record_count:,} records")
@@ -105,6 +128,14 @@ def restore_leaderboard(backup_filename):
         print("=" * 60)
         print(f"\n✓ Successfully restored {restored_count:,} leaderboard records")
 
+        # Bring back the selfie images mirrored by backup_leaderboard.py
+        if MIRROR_DIR.exists():
+            selfie_objects = backup.get('selfie_objects') or referenced_objects(leaderboard_data)
+            if selfie_objects:
+                SelfieMirror().restore(selfie_objects)
+        print("\nRebuild the precomputed ranks for the restored data:")
+        print("  python rank_leaderboard.py --rebuild")
+
         return True
 
     except Exception as e:
@@ -112,16 +143,54 @@ def restore_leaderboard(backup_filename):
         raise
 
 
+def restore_archive(pack_id=None):
+    """
+    Move rows from the leaderboard_archive table (migration 010) back into leaderboard
+    Each chunk is re-inserted before it is removed from the archive, so this can be re-run
+    """
+    print("=" * 60)
+    print("LEADERBOARD ARCHIVE RESTORE")
+    print("=" * 60)
+
+    restored_count = 0
+    while True:
+        query = get_client().table('leaderboard_archive').select('*')
+        if pack_id is not None:
+            query = query.eq('pack_id', pack_id)
+        rows = query.order('created_at').limit(ARCHIVE_CHUNK_SIZE).execute().data or []
+        if not rows:
+            break
+
+        get_client().table('leaderboard').upsert(
+            [clean_record(row) for row in rows], on_conflict='id', ignore_duplicates=True
+        ).execute()
+        get_client().table('leaderboard_archive').delete().in_('id', [row['id'] for row in rows]).execute()
+        restored_count += len(rows)
+        print(f"  ✓ Restored {restored_count:,} archived records")
+
+    print(f"\n✓ Moved {restored_count:,} records from leaderboard_archive back into leaderboard")
+    if restored_count:
+        print("\nRebuild the precomputed ranks for the restored data:")
+        print("  python rank_leaderboard.py --rebuild")
+    return restored_count
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--archive":
+        restore_archive(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        sys.exit(0)
+
     if len(sys.argv) < 2:
         print("Usage: python restore_leaderboard.py <backup_filename>")
+        print("       python restore_leaderboard.py --archive [pack_id]")
         print("\nExample:")
         print("  python restore_leaderboard.py leaderboard_backup_20250118_120000.json")
         print("  python restore_leaderboard.py leaderboard_backup_latest.json")
+        print("  python restore_leaderboard.py leaderboard_archive_20250118_120000.jsonl.gz")
         print("\nAvailable backups:")
 
         # List available backups
-        backups = sorted(BACKUP_DIR.glob("leaderboard_backup_*.json"), reverse=True)
+        backups = sorted(BACKUP_DIR.glob("leaderboard_*_*.json*"), reverse=True)
         if backups:
             for backup_file in backups[:5]:  # Show last 5
                 print(f"  - {backup_file.name}")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Pipelined scrape → images → import orchestrator for Pack 2
+Streams properties through bounded queues so images upload as soon as they
+are downloaded and rows import as soon as their image URL exists
+
+Replaces running scrape_realtor_selenium.py, upload_pack2_images.py,
+import_pack2_to_supabase.py and check_data.py one after another
+"""
+
+import argparse
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from scrape_realtor_selenium import RealtorSeleniumScraper, SEARCH_CITIES, TARGET_PROPERTIES
+from upload_pack2_images import Pack2ImageUploader
+from import_pack2_to_supabase import Pack2Importer, PACK_ID
+from property_record import as_record
+from check_data import profile
+
+# Local image paths from the scraper are relative to the repo root
+REPO_ROOT = Path(__file__).parent.parent
+
+# Bounded queues: a full queue blocks the upstream stage (backpressure)
+QUEUE_SIZE = 200
+IMAGE_WORKERS = 4
+IMPORT_BATCH_SIZE = 100
+IMPORT_FLUSH_INTERVAL = 5.0  # seconds - flush a partial batch if the queue goes quiet
+
+_DONE = object()  # End-of-stream marker
+
+
+class Pipeline:
+    def __init__(self, target_count: int = TARGET_PROPERTIES, headless: bool = True,
+                 image_workers: int = IMAGE_WORKERS, import_batch_size: int = IMPORT_BATCH_SIZE,
+                 queue_size: int = QUEUE_SIZE):
+        self.target_count = target_count
+        self.image_workers = image_workers
+        self.import_batch_size = import_batch_size
+
+        self.scraper = RealtorSeleniumScraper(headless=headless)
+        self.uploader = Pack2ImageUploader()
+        self.importer = Pack2Importer()
+
+        self.image_queue = queue.Queue(maxsize=queue_size)
+        self.import_queue = queue.Queue(maxsize=queue_size)
+
+        self.properties: List[Dict] = []
+        self.stage_times: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _mark(self, stage: str, event: str):
+        """Record stage start/finish wall-clock times for the summary"""
+        with self._lock:
+            self.stage_times.setdefault(stage, [0.0, 0.0])
+            self.stage_times[stage][0 if event == 'start' else 1] = time.monotonic()
+
+    def scrape_stage(self):
+        """Single browser: search cities and stream each property downstream"""
+        self._mark('scrape', 'start')
+        collected = 0
+
+        def queue_page(city, page_num, page_source, page_properties):
+            # Called after each results page, so images start before the city is done
+            nonlocal collected
+            for prop in page_properties:
+                self.scraper.parse_location(prop, city)
+                self.image_queue.put(prop)  # Blocks when image workers fall behind
+                collected += 1
+
+        self.scraper.page_hook = queue_page
+        self.scraper._setup_driver()
+
+        try:
+            for city in SEARCH_CITIES:
+                if collected >= self.target_count:
+                    break
+
+                print(f"\n[scrape] Searching {city}...")
+                self.scraper.search_city(city, max_properties=min(500, self.target_count - collected))
+                print(f"[scrape] {collected}/{self.target_count} properties queued")
+        finally:
+            if self.scraper.driver:
+                self.scraper.supervisor.quit()
+            for _ in range(self.image_workers):
+                self.image_queue.put(_DONE)
+            self._mark('scrape', 'finish')
+
+    def image_stage(self):
+        """Download the listing image and upload it to Supabase Storage right away"""
+        while True:
+            prop = self.image_queue.get()
+            if prop is _DONE:
+                break
+
+            mls_number = prop.get('mls_number')
+            try:
+                if mls_number and prop.get('image_url'):
+                    local_path = self.scraper.download_image(prop['image_url'], mls_number)
+                    if local_path:
+                        prop['local_image_path'] = local_path
+                        public_url = self.uploader.upload_local_image(REPO_ROOT / local_path, mls_number)
+                        if public_url:
+                            prop['supabase_image_url'] = public_url
+            except Exception as e:
+                # A dead worker would leave the scraper blocked on a full queue
+                print(f"[images] ✗ {mls_number}: {str(e)[:60]} (importing without an image)")
+                self.uploader.metrics.error('pipeline_image', e)
+
+            self.import_queue.put(prop)  # With or without an image, the row still imports
+
+    def import_stage(self):
+        """Import rows in batches as soon as they arrive (partial batches flush when idle)"""
+        self._mark('import', 'start')
+        batch = []
+
+        while True:
+            try:
+                prop = self.import_queue.get(timeout=IMPORT_FLUSH_INTERVAL)
+            except queue.Empty:
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                continue
+
+            if prop is _DONE:
+                break
+
+            batch.append(prop)
+            if len(batch) >= self.import_batch_size:
+                self._flush(batch)
+                batch = []
+
+        if batch:
+            self._flush(batch)
+        self._mark('import', 'finish')
+
+    def _flush(self, batch: List[Dict]):
+        self.importer.import_batch(batch, batch_size=len(batch))
+        self.properties.extend(batch)
+
+    def run(self):
+        started = time.monotonic()
+
+        scrape_thread = threading.Thread(target=self.scrape_stage, name='scrape')
+        image_threads = [
+            threading.Thread(target=self.image_stage, name=f'images-{n}')
+            for n in range(self.image_workers)
+        ]
+        import_thread = threading.Thread(target=self.import_stage, name='import')
+
+        self._mark('images', 'start')
+        for thread in [scrape_thread, *image_threads, import_thread]:
+            thread.start()
+
+        scrape_thread.join()
+        for thread in image_threads:
+            thread.join()
+        self._mark('images', 'finish')
+
+        # All images are done, so nothing else can reach the import queue
+        self.import_queue.put(_DONE)
+        import_thread.join()
+
+        self.uploader.print_summary()
+        self.importer.print_summary()
+        self.importer.update_pack_count()
+        self.uploader.metrics.export('pipeline_upload_images')
+        self.importer.metrics.export('pipeline_import_pack2')
+
+        print(f"\n{'='*60}")
+        print(f"PIPELINE TIMING")
+        print(f"{'='*60}")
+        for stage, (start, finish) in self.stage_times.items():
+            print(f"  {stage:<8} {start - started:7.1f}s → {finish - started:7.1f}s")
+        print(f"  Total: {time.monotonic() - started:.1f}s for {len(self.properties)} properties")
+        print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape, upload images and import Pack 2 in one streaming run")
+    parser.add_argument('--target', type=int, default=TARGET_PROPERTIES, help="Number of properties to scrape")
+    parser.add_argument('--image-workers', type=int, default=IMAGE_WORKERS, help="Concurrent image download/upload workers")
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Rows per import batch")
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE, help="Max properties buffered between stages")
+    parser.add_argument('--show-browser', action='store_true', help="Run Chrome with a visible window")
+    args = parser.parse_args()
+
+    pipeline = Pipeline(
+        target_count=args.target,
+        headless=not args.show_browser,
+        image_workers=args.image_workers,
+        import_batch_size=args.batch_size,
+        queue_size=args.queue_size,
+    )
+    pipeline.run()
+
+    # Keep the usual outputs and staging store in sync with what was imported (same record shape as the scraper)
+    records = [as_record(prop) for prop in pipeline.properties]
+    pipeline.scraper.properties = records
+    pipeline.scraper.save_to_json()
+    pipeline.scraper.store.upsert_properties(record.to_dict() for record in records)
+    pipeline.scraper.store.mark_imported(pipeline.importer.imported_mls_numbers, PACK_ID)
+
+    # Same report check_data.py prints for a scrape output file
+    if records:
+        print(f"\n{'='*60}")
+        print("DATA CHECK")
+        print(f"{'='*60}")
+        profile(records)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,27 +4,76 @@ Realtor.ca Selenium Scraper
 Uses Selenium to render JavaScript and scrape actual loaded property data
 """
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import time
-import random
 import json
 import requests
 from pathlib import Path
 from typing import List, Dict, Optional
 import csv
+import re
+import sys
+
+from staging_store import StagingStore
+from driver_supervisor import DriverSupervisor, BrowserCrashed, RECYCLE_AFTER_PAGES
+from rate_limiter import rate_limiter, shows_no_results
+from instrumentation import Instrumentation
+from data_shards import write_shards
+from property_record import PropertyRecord, save_records
 
 # Configuration
 OUTPUT_DIR = Path(__file__).parent / "data"
 IMAGES_DIR = Path(__file__).parent / "images_ca_selenium"
+BASE_URL = "https://www.realtor.ca"
 TARGET_PROPERTIES = 5000
-RATE_LIMIT_DELAY = (3, 5)
 MAX_RETRIES = 3
+MAX_DRIVER_RESTARTS = 3  # Per city
+PAGE_LOAD_TIMEOUT = 60  # seconds - turns a hung page load into an exception
+
+# Fast driver profile: reused warm profile dir + resources we never read
+CHROME_PROFILE_DIR = Path(__file__).parent / ".chrome_profile"
+BLOCKED_URL_PATTERNS = [
+    # Images (we only read the <img> src attribute) and fonts
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    # Map tiles
+    "*maps.googleapis.com/maps/vt*", "*maps.gstatic.com*", "*tile.openstreetmap.org*",
+    # Analytics / trackers / ads
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*adsrvr.org*", "*bing.com/bat*",
+]
+
+# Selenium is imported on first driver launch so the planner, replay harness and
+# pipeline can import this module (for its constants/parsers) without paying for it
+webdriver = Service = Options = By = WebDriverWait = EC = None
+
+
+def _import_selenium():
+    global webdriver, Service, Options, By, WebDriverWait, EC
+    if webdriver is None:
+        from selenium import webdriver as _webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        webdriver = _webdriver
+
+
+# ChromeDriver binary resolved once per process (ChromeDriverManager hits the network/cache each call)
+_chromedriver_path = None
+
+
+def chromedriver_path() -> str:
+    global _chromedriver_path
+    if _chromedriver_path is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+        _chromedriver_path = ChromeDriverManager().install()
+    return _chromedriver_path
+
+
+# Listing search XHR the map page uses to fill the result cards
+LISTING_API_PATTERN = "/Listing.svc/PropertySearch_Post"
+POSTAL_CODE_RE = re.compile(r'\s*([A-Z]\d[A-Z])\s?(\d[A-Z]\d)$')
 
 # Ontario cities - prioritized for university students
 SEARCH_CITIES = [
@@ -59,24 +108,66 @@ SEARCH_CITIES = [
 
 
 class RealtorSeleniumScraper:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, base_url: str = BASE_URL, harvest_api: bool = False,
+                 fast_profile: bool = False, profile_dir: Path = CHROME_PROFILE_DIR,
+                 recycle_after_pages: int = RECYCLE_AFTER_PAGES, offline: bool = False):
         """
         Initialize Selenium scraper
 
         Args:
             headless: Run browser in headless mode (no visible window)
+            base_url: Site root to load the map from (replay_harness.py points this at local fixtures)
+            harvest_api: Parse listings from the page's JSON API responses instead of the DOM cards
+            fast_profile: Block images/fonts/map tiles/trackers, use eager page loads and a reused
+                          profile directory (one profile_dir per concurrent browser)
+            recycle_after_pages: Relaunch Chrome after this many result pages (0 disables)
+            offline: Fail every request that isn't to 127.0.0.1 (replay_harness.py, so
+                     replayed fixtures never pull resources from the live site)
         """
         self.headless = headless
-        self.driver = None
-        self.properties = []
+        self.base_url = base_url.rstrip('/')
+        self.harvest_api = harvest_api
+        self.fast_profile = fast_profile
+        self.profile_dir = Path(profile_dir)
+        self.offline = offline
+        self._harvested_request_ids = set()
+
+        # Optional callback(city, page_num, page_source, page_properties) after each results page
+        self.page_hook = None
+
+        self.recycle_after_pages = recycle_after_pages
+        self.supervisor = None
+        self.last_search_truncated = False
+        self.last_search_aborted: Optional[str] = None
+        self.properties: List[PropertyRecord] = []
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
         # Session for downloading images
         self.session = requests.Session()
 
+        # Shared adaptive per-host throttle for page loads and image downloads
+        self.limiter = rate_limiter
+
+        # Per-stage timers/counters for the run report (and optional trace)
+        self.metrics = Instrumentation()
+
+        # Local staging database shared with the uploaders/importers
+        self.store = StagingStore()
+
+    @property
+    def driver(self):
+        """Current browser session (replaced when the supervisor restarts Chrome)"""
+        return self.supervisor.driver if self.supervisor else None
+
     def _setup_driver(self):
-        """Setup Chrome driver with options"""
+        """Start Chrome under a supervisor that restarts/recycles it as needed"""
+        self.supervisor = DriverSupervisor(self._create_driver, recycle_after_pages=self.recycle_after_pages)
+        self.supervisor.start()
+
+    def _create_driver(self):
+        """Launch Chrome driver with options"""
+        _import_selenium()
         chrome_options = Options()
 
         if self.headless:
@@ -89,28 +180,113 @@ class RealtorSeleniumScraper:
 
         # Disable geolocation to prevent location-based filtering
         chrome_options.add_argument('--disable-geolocation')
+
+        if self.offline:
+            # Every other host fails DNS, so nothing off the fixture server is fetched
+            chrome_options.add_argument('--host-resolver-rules=MAP * ~NOTFOUND , EXCLUDE 127.0.0.1')
         prefs = {
             "profile.default_content_setting_values.geolocation": 2,  # Block geolocation
             "profile.managed_default_content_settings.geolocation": 2
         }
+
+        if self.fast_profile:
+            # Return from driver.get at DOMContentLoaded - search_city waits for cards explicitly
+            chrome_options.page_load_strategy = 'eager'
+            # Warm profile: cached JS bundles and cookies survive between runs
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            chrome_options.add_argument(f'--user-data-dir={self.profile_dir.resolve()}')
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+            chrome_options.add_argument('--disable-extensions')
+            chrome_options.add_argument('--disable-background-networking')
+            chrome_options.add_argument('--disable-component-update')
+            chrome_options.add_argument('--mute-audio')
+            prefs["profile.managed_default_content_settings.images"] = 2
+
         chrome_options.add_experimental_option("prefs", prefs)
 
-        # Automatically download and setup ChromeDriver
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        # API mode reads listing XHRs from the DevTools performance/network log
+        if self.harvest_api:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+        # Automatically download and setup ChromeDriver (resolved once per process)
+        service = Service(chromedriver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+        if self.fast_profile:
+            # Block requests at the network layer so they never leave the browser
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+
+        # Request IDs in the performance log belong to the old session
+        self._harvested_request_ids = set()
 
         print("Chrome driver initialized")
+        return driver
 
-    def search_city(self, city: str, max_properties: int = 500, max_pages: int = 10) -> List[Dict]:
+    def search_city(self, city: str, max_properties: int = 500, max_pages: int = 10,
+                    map_url: Optional[str] = None) -> List[Dict]:
         """
         Search for properties in a city by loading the map view and paginating through results
+        If Chrome crashes or hangs mid-city, it is restarted and the search resumes from the failed page
 
         Args:
             city: City name to search (e.g., "Toronto, ON")
             max_properties: Maximum number of properties to collect for this city
             max_pages: Maximum number of pages to scrape (default: 10)
+            map_url: Open this map area URL instead of typing the city (search_planner.py tiles)
+
+        Sets self.last_search_truncated when results were cut off by max_properties/max_pages
+        rather than running out of pages, and self.last_search_aborted to why the search
+        stopped early otherwise ('load_failed', 'resume_failed', 'captcha', 'error',
+        'crashed'; None if it finished)
         """
         properties = []
+        position = {'page_num': 1, 'truncated': False, 'aborted': None}
+
+        with self.metrics.stage('search_city'):
+            for restart in range(MAX_DRIVER_RESTARTS + 1):
+                try:
+                    self._search_city_pages(city, max_properties, max_pages, properties, position, map_url)
+                    break
+                except BrowserCrashed as e:
+                    if restart == MAX_DRIVER_RESTARTS:
+                        print(f"  ✗ Browser died {restart + 1} times, keeping {len(properties)} properties from {city}")
+                        position['truncated'] = False
+                        position['aborted'] = 'crashed'
+                        break
+                    self.supervisor.restart(f"died on page {position['page_num']}: {str(e)[:50]}")
+                    print(f"  Resuming {city} from page {position['page_num']}...")
+
+        self.last_search_truncated = position['truncated']
+        self.last_search_aborted = position['aborted']
+        return properties
+
+    def _wait_for_results(self, timeout: float = 15) -> bool:
+        """
+        Wait for listing cards or realtor.ca's no-results state, whichever shows first
+        Returns False for an empty search; raises TimeoutException if neither appears
+        """
+        def settled(driver):
+            if driver.find_elements(By.CLASS_NAME, "listingCard"):
+                return 'cards'
+            if shows_no_results(driver.page_source):
+                return 'empty'
+            return False
+
+        return WebDriverWait(self.driver, timeout).until(settled) == 'cards'
+
+    def _check_browser(self, error: Exception):
+        """Escalate an error to BrowserCrashed if the session itself is gone"""
+        if not self.supervisor.is_alive():
+            raise BrowserCrashed(str(error)) from error
+
+    def _search_city_pages(self, city: str, max_properties: int, max_pages: int,
+                           properties: List[Dict], position: Dict, map_url: Optional[str] = None):
+        """
+        One browser session's worth of search_city: load the search, skip ahead to
+        position['page_num'] and extract pages into properties (deduplicated by MLS)
+        """
         max_refresh_attempts = 5
 
         try:
@@ -118,9 +294,22 @@ class RealtorSeleniumScraper:
                 try:
                     print(f"  Loading page (attempt {attempt + 1}/{max_refresh_attempts})...")
 
+                    self._throttle(self.base_url)
+                    if map_url:
+                        # Map area search: the bounds are in the URL, no need to type a city
+                        with self.metrics.stage('page_load'):
+                            self.driver.get(map_url)
+                        if not self._wait_for_results():
+                            # Empty map area (tiles over water, parks): a real answer, not a failed load
+                            print("  ✓ No listings in this area")
+                            return
+                        print("  ✓ Properties loaded successfully")
+                        break
+
                     # Load the map page in LIST VIEW (not map view)
                     # The key is adding #view=list to the URL
-                    self.driver.get("https://www.realtor.ca/map#view=list")
+                    with self.metrics.stage('page_load'):
+                        self.driver.get(f"{self.base_url}/map#view=list")
 
                     print("  Waiting for list view to load...")
                     time.sleep(3)
@@ -168,9 +357,9 @@ class RealtorSeleniumScraper:
 
                     # Try to find properties - if they're not there yet, just continue anyway
                     try:
-                        WebDriverWait(self.driver, 15).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "listingCard"))
-                        )
+                        if not self._wait_for_results():
+                            print(f"  ✓ No listings found for {city}")
+                            return
                         print("  ✓ Properties loaded successfully")
                     except:
                         print("  ⚠ Timeout waiting for cards, but continuing anyway...")
@@ -186,111 +375,199 @@ class RealtorSeleniumScraper:
                     break  # Success, exit retry loop
 
                 except Exception as e:
+                    self._check_browser(e)
                     if attempt < max_refresh_attempts - 1:
                         print(f"  ✗ Timeout or error: {str(e)[:50]}")
                         print(f"  Refreshing page (attempt {attempt + 2}/{max_refresh_attempts})...")
                         time.sleep(2)
                     else:
                         print(f"  ✗ Failed to load after {max_refresh_attempts} attempts, skipping {city}")
-                        return []
+                        position['aborted'] = 'load_failed'
+                        return
 
-            # NEW: Pagination loop - scrape multiple pages
+            # Resuming after a restart: click through the pages we already have
             page_num = 1
+            while page_num < position['page_num']:
+                with self.metrics.stage('next_page'):
+                    clicked = self._click_next_page(page_num)
+                if not clicked:
+                    position['aborted'] = 'resume_failed'
+                    return
+                page_num += 1
+
+            # NEW: Pagination loop - scrape multiple pages
+            # Truncated unless we run out of pages before hitting max_pages/max_properties
+            position['truncated'] = True
+            seen = {p.get('mls_number') for p in properties}
             while page_num <= max_pages and len(properties) < max_properties:
                 print(f"\n  --- Page {page_num} ---")
 
-                # Scroll to load more properties (lazy-loaded by Realtor.ca)
-                print("  Scrolling to load more properties...")
-                for i in range(5):
-                    try:
-                        # Scroll to bottom
-                        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                        time.sleep(1.5)  # Short wait for lazy-load
-                    except Exception as e:
-                        print(f"    Warning: Scroll failed, continuing with what we have...")
-                        break
+                # API mode: parse the listing JSON the page fetched, fall back to the DOM
+                api_items = []
+                if self.harvest_api:
+                    with self.metrics.stage('api_harvest'):
+                        api_items = self._harvest_api_listings()
 
-                # Extract property cards (use correct class name from actual DOM)
-                property_cards = self.driver.find_elements(By.CLASS_NAME, "listingCard")
-                print(f"  Found {len(property_cards)} property cards on page {page_num}")
+                # Scroll to load more properties (lazy-loaded by Realtor.ca)
+                # Not needed when the API response already holds the whole page
+                if not api_items:
+                    print("  Scrolling to load more properties...")
+                    with self.metrics.stage('scroll'):
+                        for i in range(5):
+                            try:
+                                # Scroll to bottom
+                                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                                time.sleep(1.5)  # Short wait for lazy-load
+                            except Exception as e:
+                                print(f"    Warning: Scroll failed, continuing with what we have...")
+                                break
 
                 # Extract properties from this page
                 page_properties = 0
-                for i, card in enumerate(property_cards, 1):
-                    if len(properties) >= max_properties:
-                        break
+                page_items = []
+                property_cards = []
 
-                    try:
-                        property_data = self._extract_property_from_card(card)
-                        if property_data:
-                            properties.append(property_data)
-                            page_properties += 1
-                            if i == 1 and page_num == 1:  # Debug first property of first page
-                                print(f"    ✓ First property: {property_data.get('address', 'No addr')[:40]} - ${property_data.get('price', 0):,}")
-                        else:
-                            if i <= 3 and page_num == 1:  # Debug first 3 failures on first page
-                                print(f"    ✗ Card {i}: Failed extraction (likely missing price or address)")
-                    except Exception as e:
-                        print(f"    ✗ Card {i}: Error - {str(e)[:60]}")
-                        continue
+                if api_items:
+                    print(f"  Harvested {len(api_items)} listings from API responses on page {page_num}")
+                    for property_data in api_items:
+                        if len(properties) >= max_properties:
+                            break
+                        if property_data['mls_number'] in seen:
+                            continue
+                        seen.add(property_data['mls_number'])
+                        properties.append(property_data)
+                        page_items.append(property_data)
+                        page_properties += 1
+                else:
+                    # Extract property cards (use correct class name from actual DOM)
+                    property_cards = self.driver.find_elements(By.CLASS_NAME, "listingCard")
+                    print(f"  Found {len(property_cards)} property cards on page {page_num}")
+
+                    for i, card in enumerate(property_cards, 1):
+                        if len(properties) >= max_properties:
+                            break
+
+                        try:
+                            with self.metrics.stage('extract_card'):
+                                property_data = self._extract_property_from_card(card)
+                            self.metrics.count('cards')
+                            if property_data and property_data['mls_number'] and property_data['mls_number'] in seen:
+                                continue  # Already collected before a browser restart
+                            if property_data:
+                                seen.add(property_data['mls_number'])
+                                properties.append(property_data)
+                                page_items.append(property_data)
+                                page_properties += 1
+                                if i == 1 and page_num == 1:  # Debug first property of first page
+                                    print(f"    ✓ First property: {property_data.get('address', 'No addr')[:40]} - ${property_data.get('price', 0):,}")
+                            else:
+                                if i <= 3 and page_num == 1:  # Debug first 3 failures on first page
+                                    print(f"    ✗ Card {i}: Failed extraction (likely missing price or address)")
+                        except Exception as e:
+                            self._check_browser(e)
+                            print(f"    ✗ Card {i}: Error - {str(e)[:60]}")
+                            continue
 
                 print(f"  Extracted {page_properties} properties from page {page_num} (total: {len(properties)})")
+                self.metrics.count('pages')
+                self.metrics.count('properties', page_properties)
+
+                # Feed the page into the rate limiter: captcha/empty pages back off, good pages ramp up
+                # Zero results only look like a block on the first page; later pages can
+                # legitimately run dry, so they are checked for a captcha and nothing else
+                result_count = len(api_items) if api_items else len(property_cards)
+                ban_reason = self.limiter.report(
+                    self.base_url, result_count=result_count if page_num == 1 else (result_count or None),
+                    page_source=self.driver.page_source if not result_count else None,
+                )
+                if ban_reason == 'captcha':
+                    print(f"  ✗ Captcha on page {page_num}, stopping {city} here")
+                    # Cut short, not saturated - splitting it would only mean more requests mid-ban
+                    position['truncated'] = False
+                    position['aborted'] = 'captcha'
+                    break
+
+                if self.page_hook:
+                    self.page_hook(city, page_num, self.driver.page_source, page_items)
 
                 # Check if we've hit our target
                 if len(properties) >= max_properties:
                     print(f"  ✓ Reached target of {max_properties} properties")
                     break
 
+                self.supervisor.page_done()
+
                 # Try to find and click the "Next" button
-                try:
-                    # Scroll to pagination area first
-                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(1.5)
-
-                    # Wait for the next button to be present
-                    next_button = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "lnkNextResultsPage"))
-                    )
-
-                    # Check if it's disabled or hidden
-                    is_disabled = next_button.get_attribute("disabled")
-                    is_hidden = next_button.get_attribute("style")
-                    aria_disabled = next_button.get_attribute("aria-disabled")
-
-                    if is_disabled or aria_disabled == "true" or (is_hidden and "display: none" in is_hidden):
-                        print(f"  ✓ Reached last page (Next button disabled)")
-                        break
+                with self.metrics.stage('next_page'):
+                    clicked = self._click_next_page(page_num)
+                if not clicked:
+                    position['truncated'] = False
+                    break
+                page_num += 1
+                position['page_num'] = page_num
 
-                    # Scroll the button into view
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-                    time.sleep(0.5)
+        except BrowserCrashed:
+            raise
+        except Exception as e:
+            self._check_browser(e)
+            print(f"  Error searching {city}: {str(e)}")
+            position['truncated'] = False
+            position['aborted'] = 'error'
 
-                    # Click the next button using JavaScript (more reliable than regular click)
-                    print(f"  Clicking 'Next' to load page {page_num + 1}...")
-                    self.driver.execute_script("arguments[0].click();", next_button)
 
-                    # Wait for new page to load
-                    time.sleep(3)
+    def _throttle(self, url: str):
+        """Wait for the rate limiter (timed, so the report shows time lost to throttling)"""
+        with self.metrics.stage('rate_limit_wait'):
+            self.limiter.acquire(url)
 
-                    # Wait for property cards to reload
-                    try:
-                        WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_element_located((By.CLASS_NAME, "listingCard"))
-                        )
-                    except:
-                        print("  ⚠ Timeout waiting for next page to load")
+    def _click_next_page(self, page_num: int) -> bool:
+        """Click "Next" from page_num; returns False on the last page or if pagination failed"""
+        try:
+            # Scroll to pagination area first
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(1.5)
 
-                    page_num += 1
+            # Wait for the next button to be present
+            next_button = WebDriverWait(self.driver, 5).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "lnkNextResultsPage"))
+            )
 
-                except Exception as e:
-                    print(f"  ✗ Could not find/click Next button: {str(e)[:60]}")
-                    print(f"  Assuming this is the last page")
-                    break
+            # Check if it's disabled or hidden
+            is_disabled = next_button.get_attribute("disabled")
+            is_hidden = next_button.get_attribute("style")
+            aria_disabled = next_button.get_attribute("aria-disabled")
 
-        except Exception as e:
-            print(f"  Error searching {city}: {str(e)}")
+            if is_disabled or aria_disabled == "true" or (is_hidden and "display: none" in is_hidden):
+                print(f"  ✓ Reached last page (Next button disabled)")
+                return False
 
-        return properties
+            # Scroll the button into view
+            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
+            time.sleep(0.5)
+
+            # Click the next button using JavaScript (more reliable than regular click)
+            self._throttle(self.base_url)
+            print(f"  Clicking 'Next' to load page {page_num + 1}...")
+            self.driver.execute_script("arguments[0].click();", next_button)
+
+            # Wait for new page to load
+            time.sleep(3)
+
+            # Wait for property cards to reload
+            try:
+                WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "listingCard"))
+                )
+            except:
+                print("  ⚠ Timeout waiting for next page to load")
+
+            return True
+
+        except Exception as e:
+            self._check_browser(e)
+            print(f"  ✗ Could not find/click Next button: {str(e)[:60]}")
+            print(f"  Assuming this is the last page")
+            return False
 
     def _extract_property_from_card(self, card) -> Optional[Dict]:
         """
@@ -364,7 +641,6 @@ class RealtorSeleniumScraper:
                             property_data['bathrooms'] = num_text
                         elif 'square' in label or 'sqft' in label or 'sq ft' in label:
                             # For sqft, extract the number (remove commas, $, etc)
-                            import re
                             clean_num = num_text.replace('$', '').replace(',', '')
                             sqft_match = re.search(r'(\d+)', clean_num)
                             if sqft_match:
@@ -403,6 +679,116 @@ class RealtorSeleniumScraper:
             print(f"    Error in _extract_property_from_card: {str(e)}")
             return None
 
+    def _harvest_api_listings(self) -> List[Dict]:
+        """
+        Collect listings from PropertySearch_Post responses seen since the last call
+        Uses the performance log to find the requests and CDP to read their bodies
+        """
+        listings = []
+
+        try:
+            log_entries = self.driver.get_log('performance')
+        except Exception as e:
+            print(f"    Warning: Could not read performance log: {str(e)[:60]}")
+            return listings
+
+        for entry in log_entries:
+            try:
+                message = json.loads(entry['message'])['message']
+                if message.get('method') != 'Network.responseReceived':
+                    continue
+                params = message['params']
+                if LISTING_API_PATTERN not in params['response']['url']:
+                    continue
+                request_id = params['requestId']
+                if request_id in self._harvested_request_ids:
+                    continue
+                self._harvested_request_ids.add(request_id)
+
+                body = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+                payload = json.loads(body['body'])
+
+                for result in payload.get('Results', []):
+                    property_data = self._parse_api_listing(result)
+                    if property_data:
+                        listings.append(property_data)
+            except Exception as e:
+                print(f"    Warning: Skipping API response: {str(e)[:60]}")
+                continue
+
+        return listings
+
+    def _parse_api_listing(self, result: Dict) -> Optional[Dict]:
+        """
+        Map one PropertySearch_Post result onto the same fields as _extract_property_from_card
+        The JSON also carries coordinates, property type and postal code the cards don't show
+        """
+        prop = result.get('Property') or {}
+        building = result.get('Building') or {}
+        address = prop.get('Address') or {}
+
+        property_data = {}
+
+        # Use the listing ID from the details URL, same as DOM mode (images are named by it)
+        relative_url = result.get('RelativeDetailsURL') or ''
+        property_data['url'] = f"{BASE_URL}{relative_url}" if relative_url else None
+        property_data['mls_number'] = str(result['Id']) if result.get('Id') else None
+
+        # "123 MAIN ST|Toronto (Annex), Ontario M5R1A1" -> "123 MAIN ST, Toronto (Annex), Ontario"
+        address_text = (address.get('AddressText') or '').replace('|', ', ').strip()
+        postal_match = POSTAL_CODE_RE.search(address_text)
+        property_data['postal_code'] = None
+        if postal_match:
+            property_data['postal_code'] = f"{postal_match.group(1)} {postal_match.group(2)}"
+            address_text = address_text[:postal_match.start()].strip()
+        property_data['address'] = address_text or None
+
+        price_text = str(prop.get('PriceUnformattedValue') or prop.get('Price') or '')
+        price_text = ''.join(c for c in price_text.split('.')[0] if c.isdigit())
+        property_data['price'] = int(price_text) if price_text else None
+
+        # Keep beds/baths as strings to preserve "3 + 1", like DOM mode
+        property_data['bedrooms'] = building.get('Bedrooms') or None
+        property_data['bathrooms'] = building.get('BathroomTotal') or None
+
+        property_data['sqft'] = None
+        size_text = (building.get('SizeInterior') or '').replace(',', '')
+        sqft_match = re.search(r'(\d+)', size_text)
+        if sqft_match:
+            property_data['sqft'] = int(sqft_match.group(1))
+
+        property_data['property_type'] = prop.get('Type') or building.get('Type') or None
+
+        try:
+            property_data['latitude'] = float(address['Latitude'])
+            property_data['longitude'] = float(address['Longitude'])
+        except (KeyError, ValueError, TypeError):
+            property_data['latitude'] = None
+            property_data['longitude'] = None
+
+        photos = prop.get('Photo') or []
+        property_data['image_url'] = photos[0].get('HighResPath') if photos else None
+        property_data['image_urls'] = [p['HighResPath'] for p in photos if p.get('HighResPath')]
+
+        property_data['country'] = 'CA'
+
+        # Filter out incomplete data
+        if not property_data['price'] or not property_data['address']:
+            return None
+
+        return property_data
+
+    def parse_location(self, prop: Dict, search_city: str):
+        """Fill city/province from the card address, falling back to the searched city"""
+        if prop['address']:
+            parts = prop['address'].split(',')
+            if len(parts) >= 2:
+                prop['city'] = parts[-2].strip()
+                prop['province'] = parts[-1].strip().split()[0]
+            else:
+                prop['city'] = search_city.split(',')[0]
+                prop['province'] = 'ON'
+
     def download_image(self, image_url: str, property_id: str) -> Optional[str]:
         """Download property image"""
         if not image_url:
@@ -415,12 +801,17 @@ class RealtorSeleniumScraper:
             if filepath.exists():
                 return str(filepath.relative_to(Path(__file__).parent.parent))
 
-            response = self.session.get(image_url, timeout=10)
-            response.raise_for_status()
+            self._throttle(image_url)
+            with self.metrics.stage('download_image'):
+                response = self.session.get(image_url, timeout=10)
+                self.limiter.report(image_url, status_code=response.status_code)
+                response.raise_for_status()
 
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+                with open(filepath, 'wb') as f:
+                    f.write(response.content)
 
+            self.metrics.count('images_downloaded')
+            self.metrics.count('bytes_downloaded', len(response.content))
             return str(filepath.relative_to(Path(__file__).parent.parent))
 
         except Exception as e:
@@ -447,22 +838,19 @@ class RealtorSeleniumScraper:
 
                 print(f"\nSearching {city}...")
 
+                # Fresh browser every N pages keeps memory flat on long runs
+                self.supervisor.maybe_recycle()
+
                 # Search city
                 city_properties = self.search_city(city, max_properties=500)
+                city_collected = []
 
                 for prop in city_properties:
                     if properties_collected >= target_count:
                         break
 
                     # Parse city from address
-                    if prop['address']:
-                        parts = prop['address'].split(',')
-                        if len(parts) >= 2:
-                            prop['city'] = parts[-2].strip()
-                            prop['province'] = parts[-1].strip().split()[0]
-                        else:
-                            prop['city'] = city.split(',')[0]
-                            prop['province'] = 'ON'
+                    self.parse_location(prop, city)
 
                     # Download image if requested
                     if download_images and prop['image_url']:
@@ -470,7 +858,10 @@ class RealtorSeleniumScraper:
                         local_path = self.download_image(prop['image_url'], mls)
                         prop['local_image_path'] = local_path
 
-                    self.properties.append(prop)
+                    # Parsed once into the shared typed record; nothing downstream re-parses it
+                    record = PropertyRecord.from_dict(prop)
+                    self.properties.append(record)
+                    city_collected.append(record.to_dict())
                     properties_collected += 1
 
                     # Auto-save progress every 100 properties (in case of crash/ban)
@@ -481,20 +872,20 @@ class RealtorSeleniumScraper:
                     elif properties_collected % 50 == 0:
                         print(f"  Progress: {properties_collected}/{target_count}")
 
-                # Rate limiting
-                if properties_collected < target_count:
-                    delay = random.uniform(*RATE_LIMIT_DELAY)
-                    print(f"  Waiting {delay:.1f}s before next city...")
-                    time.sleep(delay)
+                # Stage this city's properties in one transaction
+                staged = self.store.upsert_properties(city_collected)
+                print(f"  ✓ Staged {staged} properties in {self.store.path.name}")
 
             print(f"\n{'='*60}")
             print(f"Scraping complete! Collected {len(self.properties)} properties")
+            for host, stats in self.limiter.stats().items():
+                print(f"  {host}: {stats['requests']} requests, {stats['bans']} backoffs, final rate {stats['rate']} req/s")
             print(f"{'='*60}\n")
 
         finally:
             # Always close the browser
             if self.driver:
-                self.driver.quit()
+                self.supervisor.quit()
                 print("Browser closed")
 
     def save_to_csv(self, filename: str = "properties_ca_selenium.csv"):
@@ -504,12 +895,16 @@ class RealtorSeleniumScraper:
             return
 
         filepath = OUTPUT_DIR / filename
-        fieldnames = list(self.properties[0].keys())
+
+        # Union of keys across all rows (first-seen order) - rows aren't guaranteed
+        # to share keys, e.g. local_image_path only exists when images were downloaded
+        rows = [record.to_dict() for record in self.properties]
+        fieldnames = list(dict.fromkeys(key for row in rows for key in row))
 
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=fieldnames, restval='')
             writer.writeheader()
-            writer.writerows(self.properties)
+            writer.writerows(rows)
 
         print(f"Saved {len(self.properties)} properties to {filepath}")
 
@@ -521,18 +916,45 @@ class RealtorSeleniumScraper:
 
         filepath = OUTPUT_DIR / filename
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.properties, f, indent=2)
+        with self.metrics.stage('save_json'):
+            rows = save_records(self.properties, filepath)
+        with self.metrics.stage('save_shards'):
+            shards = write_shards(rows, filepath)
 
-        print(f"Saved {len(self.properties)} properties to {filepath}")
+        print(f"Saved {len(self.properties)} properties to {filepath} (viewer pages in {shards.name}/)")
+
+    def save_to_parquet(self, filename: str = "properties_ca_selenium.parquet"):
+        """Save a typed columnar snapshot (requires pyarrow)"""
+        if not self.properties:
+            print("No properties to save!")
+            return
+
+        try:
+            from parquet_snapshot import write_snapshot
+            write_snapshot(self.properties, OUTPUT_DIR / filename)
+        except ImportError as e:
+            print(f"Skipping Parquet snapshot: {e}")
 
 
 def main():
     # Set headless=False to see the browser (useful for debugging)
-    scraper = RealtorSeleniumScraper(headless=False)
+    # --api: harvest listings from the page's JSON responses instead of the DOM
+    # --fast: block images/fonts/tiles/trackers and reuse a warm Chrome profile
+    # --trace: also write per-stage spans as Chrome trace events (data/run_trace.json)
+    scraper = RealtorSeleniumScraper(
+        headless=False,
+        harvest_api='--api' in sys.argv[1:],
+        fast_profile='--fast' in sys.argv[1:],
+    )
     scraper.scrape(target_count=TARGET_PROPERTIES, download_images=True)
     scraper.save_to_csv()
     scraper.save_to_json()
+    scraper.save_to_parquet()
+
+    scraper.metrics.print_summary()
+    scraper.metrics.save_report(OUTPUT_DIR / "run_report.json")
+    if '--trace' in sys.argv[1:]:
+        scraper.metrics.save_trace(OUTPUT_DIR / "run_trace.json")
     print("\nDone! Check the 'data' and 'images_ca_selenium' folders for results.")
 
 
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Geographic tiling search planner for the Realtor.ca scraper
+Splits each city's bounding box into map tiles and subdivides any tile whose
+results hit the per-search cap, so coverage isn't limited by pagination.
+Tiles that fail to load are retried; tiles cut short by a captcha are not split
+or retried, only reported, so a ban isn't met with more requests. Empty tiles
+(realtor.ca's no-results state) finish normally with nothing to add.
+Tiles are shared across parallel browser workers through one queue.
+
+Usage:
+  python search_planner.py [--workers 3] [--city "Toronto, ON" ...] [--target 5000]
+"""
+
+import argparse
+import math
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from scrape_realtor_selenium import RealtorSeleniumScraper, SEARCH_CITIES, TARGET_PROPERTIES, BASE_URL
+from property_record import as_record
+
+# Per-tile search limits - a tile that fills them is subdivided
+TILE_MAX_PAGES = 10
+TILE_MAX_PROPERTIES = 500
+MAX_TILE_DEPTH = 4  # 4^4 = 256 leaf tiles per starting tile at most
+INITIAL_GRID = 2  # Start each city as a 2x2 grid
+TILE_RETRIES = 2  # Re-queues for a tile whose search failed (not for captchas)
+
+# Approximate (lat_min, lng_min, lat_max, lng_max) for SEARCH_CITIES
+CITY_BOUNDS = {
+    "Toronto, ON": (43.58, -79.64, 43.86, -79.11),
+    "Waterloo, ON": (43.43, -80.62, 43.53, -80.47),
+    "London, ON": (42.88, -81.39, 43.07, -81.10),
+    "Hamilton, ON": (43.18, -80.05, 43.30, -79.70),
+    "Ottawa, ON": (45.25, -75.95, 45.50, -75.50),
+    "Oshawa, ON": (43.85, -78.95, 44.05, -78.78),
+    "Guelph, ON": (43.50, -80.32, 43.60, -80.15),
+    "Kingston, ON": (44.20, -76.62, 44.30, -76.40),
+    "Mississauga, ON": (43.50, -79.81, 43.74, -79.52),
+    "Brampton, ON": (43.62, -79.89, 43.85, -79.63),
+    "Markham, ON": (43.80, -79.43, 43.96, -79.17),
+    "Scarborough, ON": (43.71, -79.32, 43.86, -79.12),
+    "North York, ON": (43.70, -79.56, 43.81, -79.32),
+    "Vaughan, ON": (43.75, -79.70, 43.92, -79.42),
+    "Richmond Hill, ON": (43.83, -79.47, 43.95, -79.37),
+    "Oakville, ON": (43.38, -79.78, 43.52, -79.62),
+    "Burlington, ON": (43.28, -79.90, 43.43, -79.74),
+    "Pickering, ON": (43.80, -79.18, 43.90, -79.02),
+    "Ajax, ON": (43.83, -79.07, 43.90, -78.98),
+    "Whitby, ON": (43.85, -78.98, 43.96, -78.90),
+    "Windsor, ON": (42.23, -83.10, 42.35, -82.90),
+    "Niagara Falls, ON": (43.03, -79.15, 43.15, -79.02),
+}
+
+
+class Tile(NamedTuple):
+    city: str
+    lat_min: float
+    lng_min: float
+    lat_max: float
+    lng_max: float
+    depth: int = 0
+    retries: int = 0
+
+    def split(self) -> List['Tile']:
+        """Four quadrant child tiles"""
+        lat_mid = (self.lat_min + self.lat_max) / 2
+        lng_mid = (self.lng_min + self.lng_max) / 2
+        return [
+            Tile(self.city, lat_min, lng_min, lat_max, lng_max, self.depth + 1)
+            for lat_min, lat_max in ((self.lat_min, lat_mid), (lat_mid, self.lat_max))
+            for lng_min, lng_max in ((self.lng_min, lng_mid), (lng_mid, self.lng_max))
+        ]
+
+    def map_url(self, base_url: str = BASE_URL) -> str:
+        """realtor.ca map URL restricted to this tile, in list view"""
+        lat_center = (self.lat_min + self.lat_max) / 2
+        lng_center = (self.lng_min + self.lng_max) / 2
+        span = max(self.lng_max - self.lng_min, 1e-6)
+        zoom = min(max(round(math.log2(360 / span)), 8), 17)
+        return (
+            f"{base_url}/map#ZoomLevel={zoom}"
+            f"&Center={lat_center:.6f}%2C{lng_center:.6f}"
+            f"&LatitudeMax={self.lat_max:.6f}&LongitudeMax={self.lng_max:.6f}"
+            f"&LatitudeMin={self.lat_min:.6f}&LongitudeMin={self.lng_min:.6f}"
+            f"&view=list&CurrentPage=1"
+        )
+
+
+def initial_tiles(city: str, grid: int = INITIAL_GRID) -> List[Tile]:
+    """Split a city's bounding box into a grid x grid set of starting tiles"""
+    lat_min, lng_min, lat_max, lng_max = CITY_BOUNDS[city]
+    lat_step = (lat_max - lat_min) / grid
+    lng_step = (lng_max - lng_min) / grid
+    return [
+        Tile(city, lat_min + r * lat_step, lng_min + c * lng_step,
+             lat_min + (r + 1) * lat_step, lng_min + (c + 1) * lng_step)
+        for r in range(grid)
+        for c in range(grid)
+    ]
+
+
+class SearchPlanner:
+    def __init__(self, cities: List[str], target_count: int = TARGET_PROPERTIES, workers: int = 2,
+                 headless: bool = True, fast_profile: bool = False):
+        self.target_count = target_count
+        self.workers = workers
+        self.headless = headless
+        self.fast_profile = fast_profile
+
+        self.properties: List[Dict] = []
+        self.seen_mls = set()
+        self.tiles_searched = 0
+        self.tiles_split = 0
+        self.failed_tiles: List[Tuple[Tile, str]] = []
+        self._lock = threading.Lock()
+
+        # Tiles queued or in progress - workers only stop when this reaches 0,
+        # since a tile being searched elsewhere may still split into more work
+        self.tiles = queue.Queue()
+        self._pending = 0
+        for city in cities:
+            if city not in CITY_BOUNDS:
+                print(f"⚠ No bounding box for {city}, skipping")
+                continue
+            for tile in initial_tiles(city):
+                self._enqueue(tile)
+
+    def _enqueue(self, tile: Tile):
+        with self._lock:
+            self._pending += 1
+        self.tiles.put(tile)
+
+    def _next_tile(self) -> Optional[Tile]:
+        """Next tile to search, or None once every tile has been finished"""
+        while not self._done():
+            try:
+                return self.tiles.get(timeout=1)
+            except queue.Empty:
+                with self._lock:
+                    if self._pending == 0:
+                        return None
+        return None
+
+    def _done(self) -> bool:
+        with self._lock:
+            return len(self.properties) >= self.target_count
+
+    def _collect(self, tile: Tile, results: List[Dict]) -> int:
+        """Merge a tile's results, dropping listings already found by overlapping tiles"""
+        added = 0
+        with self._lock:
+            self.tiles_searched += 1
+            for prop in results:
+                mls_number = prop.get('mls_number')
+                if mls_number and mls_number in self.seen_mls:
+                    continue
+                self.seen_mls.add(mls_number)
+                self.properties.append(prop)
+                added += 1
+        return added
+
+    def worker(self, worker_id: int):
+        """One browser: pull tiles until the queue is empty or the target is reached"""
+        profile_dir = Path(__file__).parent / f".chrome_profile_{worker_id}"
+        scraper = RealtorSeleniumScraper(headless=self.headless, fast_profile=self.fast_profile,
+                                         profile_dir=profile_dir)
+        scraper._setup_driver()
+
+        try:
+            while True:
+                tile = self._next_tile()
+                if tile is None:
+                    break
+
+                try:
+                    label = f"{tile.city} tile d{tile.depth} ({tile.lat_min:.3f},{tile.lng_min:.3f})"
+                    print(f"\n[worker {worker_id}] Searching {label}...")
+                    scraper.supervisor.maybe_recycle()
+
+                    results = scraper.search_city(
+                        tile.city, max_properties=TILE_MAX_PROPERTIES, max_pages=TILE_MAX_PAGES,
+                        map_url=tile.map_url(),
+                    )
+                    for prop in results:
+                        scraper.parse_location(prop, tile.city)
+                    added = self._collect(tile, results)
+
+                    aborted = scraper.last_search_aborted
+                    if aborted and aborted != 'captcha' and tile.retries < TILE_RETRIES:
+                        self._enqueue(tile._replace(retries=tile.retries + 1))
+                        print(f"[worker {worker_id}] Tile search {aborted}, re-queued "
+                              f"(retry {tile.retries + 1}/{TILE_RETRIES})")
+                    elif aborted:
+                        with self._lock:
+                            self.failed_tiles.append((tile, aborted))
+                        print(f"[worker {worker_id}] Tile search {aborted}, giving up on it")
+                    # Saturated tile: its results were capped, so search its quadrants too
+                    elif scraper.last_search_truncated and tile.depth < MAX_TILE_DEPTH:
+                        for child in tile.split():
+                            self._enqueue(child)
+                        with self._lock:
+                            self.tiles_split += 1
+                        print(f"[worker {worker_id}] Tile capped at {len(results)} results, split into 4")
+
+                    print(f"[worker {worker_id}] +{added} new ({len(self.properties)}/{self.target_count})")
+                finally:
+                    # Children were enqueued first, so idle workers never see 0 early
+                    with self._lock:
+                        self._pending -= 1
+        finally:
+            scraper.supervisor.quit()
+
+    def run(self) -> List[Dict]:
+        threads = [
+            threading.Thread(target=self.worker, args=(n,), name=f'planner-{n}')
+            for n in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        print(f"\n{'='*60}")
+        print(f"TILED SEARCH SUMMARY")
+        print(f"{'='*60}")
+        print(f"Tiles searched: {self.tiles_searched} ({self.tiles_split} split)")
+        print(f"Unique properties: {len(self.properties):,}")
+        if self.failed_tiles:
+            print(f"Tiles not fully searched: {len(self.failed_tiles)}")
+            for tile, reason in self.failed_tiles:
+                print(f"  {tile.city} d{tile.depth} ({tile.lat_min:.3f},{tile.lng_min:.3f})-"
+                      f"({tile.lat_max:.3f},{tile.lng_max:.3f}): {reason}")
+        print(f"{'='*60}\n")
+
+        return self.properties[:self.target_count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Realtor.ca by adaptive map tiles across parallel browsers")
+    parser.add_argument('--city', action='append', help='City to cover (repeatable, default: all SEARCH_CITIES)')
+    parser.add_argument('--workers', type=int, default=2, help="Parallel browsers")
+    parser.add_argument('--target', type=int, default=TARGET_PROPERTIES, help="Stop after this many properties")
+    parser.add_argument('--fast', action='store_true', help="Use the resource-blocking driver profile")
+    parser.add_argument('--show-browser', action='store_true', help="Run Chrome with a visible window")
+    args = parser.parse_args()
+
+    planner = SearchPlanner(
+        cities=args.city or SEARCH_CITIES,
+        target_count=args.target,
+        workers=args.workers,
+        headless=not args.show_browser,
+        fast_profile=args.fast,
+    )
+    properties = planner.run()
+
+    # Save with the regular scraper outputs (JSON + staging store), as parsed records like the scraper's own
+    records = [as_record(prop) for prop in properties]
+    saver = RealtorSeleniumScraper()
+    saver.properties = records
+    saver.save_to_json()
+    saver.store.upsert_properties(record.to_dict() for record in records)
+
+
+if __name__ == "__main__":
+    main()
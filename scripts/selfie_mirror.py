@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Local mirror of the selfie objects referenced by leaderboard rows
+backup_leaderboard.py mirrors them next to the row backups so a restore
+doesn't bring back dead avatar links; restore_leaderboard.py re-uploads them.
+Downloads share one pooled HTTP session across a thread pool and are
+incremental: objects whose ETag (or size, when there is no ETag) matches the
+manifest from the last run are skipped. Uploads skip objects the bucket
+already holds at the same size.
+"""
+
+import json
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from supabase_client import get_client
+from instrumentation import Instrumentation
+from thumbnail_selfies import BUCKET_NAME, object_path
+
+MIRROR_DIR = Path(__file__).parent / "backups" / "selfies"
+MANIFEST_FILE = "manifest.json"
+
+WORKERS = 16
+LIST_PAGE_SIZE = 1000
+DOWNLOAD_TIMEOUT = 30  # seconds
+
+
+def referenced_objects(rows: Iterable[Dict]) -> Set[str]:
+    """Bucket paths of every selfie/thumbnail a set of leaderboard rows points to"""
+    paths = set()
+    for row in rows:
+        for column in ('selfie_url', 'selfie_thumb_url'):
+            path = object_path(row.get(column))
+            if path:
+                paths.add(path)
+    return paths
+
+
+class SelfieMirror:
+    def __init__(self, directory: Path = MIRROR_DIR, workers: int = WORKERS):
+        self.directory = Path(directory)
+        self.workers = workers
+        self.supabase = get_client()
+        self.bucket = self.supabase.storage.from_(BUCKET_NAME)
+        self.metrics = Instrumentation()
+        self.manifest_path = self.directory / MANIFEST_FILE
+        self.manifest: Dict[str, Dict] = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def list_remote(self, paths: Iterable[str]) -> Dict[str, Dict]:
+        """{path: {'etag', 'size'}} for the objects in every folder `paths` live in"""
+        remote = {}
+        for folder in sorted({os.path.dirname(path) for path in paths}):
+            offset = 0
+            while True:
+                with self.metrics.stage('list_page'):
+                    page = self.bucket.list(folder, {'limit': LIST_PAGE_SIZE, 'offset': offset}) or []
+                for entry in page:
+                    metadata = entry.get('metadata') or {}
+                    if entry.get('id'):
+                        remote[f"{folder}/{entry['name']}" if folder else entry['name']] = {
+                            'etag': (metadata.get('eTag') or '').strip('"') or None,
+                            'size': metadata.get('size'),
+                        }
+                if len(page) < LIST_PAGE_SIZE:
+                    break
+                offset += LIST_PAGE_SIZE
+        return remote
+
+    def _is_current(self, path: str, remote: Dict) -> bool:
+        local_file = self.directory / path
+        known = self.manifest.get(path)
+        if not known or not local_file.exists() or local_file.stat().st_size != known.get('size'):
+            return False
+        if remote.get('etag') and known.get('etag'):
+            return remote['etag'] == known['etag']
+        return remote.get('size') == known.get('size')
+
+    def backup(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Download referenced objects that changed since the last mirror"""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        paths = sorted(set(paths))
+        remote = self.list_remote(paths)
+        missing = [path for path in paths if path not in remote]
+        pending = [path for path in paths if path in remote and not self._is_current(path, remote[path])]
+        print(f"\nSelfies: {len(paths):,} referenced, {len(paths) - len(missing) - len(pending):,} already mirrored, "
+              f"{len(pending):,} to download, {len(missing):,} missing from the bucket")
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        def download(path: str) -> Optional[Dict]:
+            try:
+                with self.metrics.stage('download'):
+                    response = session.get(self.bucket.get_public_url(path), timeout=DOWNLOAD_TIMEOUT)
+                    response.raise_for_status()
+                local_file = self.directory / path
+                local_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = local_file.with_name(local_file.name + '.tmp')
+                tmp_file.write_bytes(response.content)
+                os.replace(tmp_file, local_file)
+                self.metrics.count('bytes_downloaded', len(response.content))
+                return {'etag': remote[path]['etag'], 'size': len(response.content)}
+            except Exception as e:
+                self.metrics.error('download', e)
+                print(f"  ✗ {path}: {str(e)[:100]}")
+                return None
+
+        downloaded = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path, entry in zip(pending, pool.map(download, pending)):
+                if entry:
+                    self.manifest[path] = entry
+                    downloaded += 1
+                    if downloaded % 500 == 0:
+                        self._save_manifest()
+                        print(f"  ✓ {downloaded:,} / {len(pending):,} selfies downloaded")
+        session.close()
+        self._save_manifest()
+
+        self.metrics.count('selfies_downloaded', downloaded)
+        print(f"✓ Selfie mirror: {downloaded:,} downloaded into {self.directory}")
+        return {'referenced': len(paths), 'downloaded': downloaded,
+                'failed': len(pending) - downloaded, 'missing': len(missing)}
+
+    def restore(self, paths: Iterable[str]) -> Dict[str, int]:
+        """Re-upload mirrored objects the bucket no longer has (or has at a different size)"""
+        paths = sorted(path for path in set(paths) if (self.directory / path).exists())
+        remote = self.list_remote(paths)
+        pending = [path for path in paths
+                   if remote.get(path, {}).get('size') != (self.directory / path).stat().st_size]
+        print(f"\nSelfies: {len(paths):,} mirrored, {len(pending):,} to re-upload")
+
+        def upload(path: str) -> bool:
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+            try:
+                data = (self.directory / path).read_bytes()
+                with self.metrics.stage('upload'):
+                    self.bucket.upload(path, data, file_options={"content-type": content_type, "upsert": "true"})
+                self.metrics.count('bytes_uploaded', len(data))
+                return True
+            except Exception as e:
+                self.metrics.error('upload', e)
+                print(f"  ✗ {path}: {str(e)[:100]}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            uploaded = sum(pool.map(upload, pending))
+
+        self.metrics.count('selfies_uploaded', uploaded)
+        print(f"✓ Re-uploaded {uploaded:,} selfies to '{BUCKET_NAME}'")
+        return {'mirrored': len(paths), 'uploaded': uploaded, 'failed': len(pending) - uploaded}
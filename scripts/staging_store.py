@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local SQLite staging store for the property data pipeline
+Scraper, uploaders, importers and check_data share one indexed database
+instead of rewriting properties_ca_selenium*.json at every step
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import json_codec
+
+# Data paths
+DATA_DIR = Path(__file__).parent / "data"
+STAGING_DB = DATA_DIR / "staging.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS properties (
+    mls_number TEXT PRIMARY KEY,
+    country TEXT,
+    city TEXT,
+    province TEXT,
+    price INTEGER,
+    image_url TEXT,
+    local_image_path TEXT,
+    supabase_image_url TEXT,
+    pack_id INTEGER,
+    imported_at TEXT,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_staging_city ON properties(city);
+CREATE INDEX IF NOT EXISTS idx_staging_pack_id ON properties(pack_id);
+"""
+
+# Columns kept outside the JSON blob so they can be indexed or updated in place
+PROMOTED_COLUMNS = ('country', 'city', 'province', 'price', 'image_url', 'local_image_path', 'supabase_image_url')
+
+
+class StagingStore:
+    def __init__(self, path: Path = STAGING_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_properties(self, properties: Iterable[Dict]) -> int:
+        """
+        Insert or refresh scraped properties keyed by MLS number
+        Keeps URLs/pack assignments already attached by later pipeline steps
+        Returns the number of rows written (properties without MLS are skipped)
+        """
+        rows = []
+        for prop in properties:
+            mls_number = prop.get('mls_number')
+            if not mls_number:
+                continue
+            rows.append((
+                str(mls_number),
+                *(prop.get(col) for col in PROMOTED_COLUMNS),
+                json_codec.dumps(prop).decode('utf-8'),  # TEXT column, not a BLOB
+            ))
+
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO properties (mls_number, country, city, province, price, image_url,
+                                        local_image_path, supabase_image_url, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(mls_number) DO UPDATE SET
+                    country = excluded.country,
+                    city = excluded.city,
+                    province = excluded.province,
+                    price = excluded.price,
+                    image_url = excluded.image_url,
+                    local_image_path = COALESCE(excluded.local_image_path, properties.local_image_path),
+                    supabase_image_url = COALESCE(excluded.supabase_image_url, properties.supabase_image_url),
+                    data = excluded.data,
+                    updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def set_supabase_image_url(self, mls_number: str, url: str):
+        """Attach the Supabase Storage URL for one property (indexed point update)"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE properties SET supabase_image_url = ?, "
+                "updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE mls_number = ?",
+                (url, str(mls_number)),
+            )
+
+    def mark_imported(self, mls_numbers: Iterable[str], pack_id: Optional[int] = None):
+        """Record which properties were imported to Supabase (and into which pack)"""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE properties SET pack_id = ?, imported_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') "
+                "WHERE mls_number = ?",
+                [(pack_id, str(mls)) for mls in mls_numbers],
+            )
+
+    def _row_to_property(self, row: sqlite3.Row) -> Dict:
+        prop = json_codec.loads(row['data'])
+        for col in PROMOTED_COLUMNS:
+            if row[col] is not None:
+                prop[col] = row[col]
+        if row['pack_id'] is not None:
+            prop['pack_id'] = row['pack_id']
+        return prop
+
+    def get(self, mls_number: str) -> Optional[Dict]:
+        """Look up a single property by MLS number"""
+        row = self.conn.execute(
+            "SELECT * FROM properties WHERE mls_number = ?", (str(mls_number),)
+        ).fetchone()
+        return self._row_to_property(row) if row else None
+
+    def load_properties(self, city: Optional[str] = None, pack_id: Optional[int] = None,
+                        country: Optional[str] = None) -> List[Dict]:
+        """Load properties as dicts (same shape as the scrape JSON), optionally filtered"""
+        clauses = []
+        params = []
+        if city is not None:
+            clauses.append("city = ?")
+            params.append(city)
+        if pack_id is not None:
+            clauses.append("pack_id = ?")
+            params.append(pack_id)
+        if country is not None:
+            clauses.append("country = ?")
+            params.append(country)
+
+        query = "SELECT * FROM properties"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY rowid"
+
+        return [self._row_to_property(row) for row in self.conn.execute(query, params)]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM properties").fetchone()[0]
+
+    def export_json(self, filepath: Path, pretty: bool = False):
+        """Write the staged properties out in the legacy JSON format"""
+        properties = self.load_properties()
+        json_codec.dump(properties, filepath, pretty=pretty)
+        print(f"Exported {len(properties)} staged properties to {filepath}")
+
+
+def import_json(filepath: Path, store: Optional[StagingStore] = None) -> int:
+    """Seed the staging store from an existing scrape JSON file"""
+    store = store or StagingStore()
+    properties = json_codec.load(filepath)
+    written = store.upsert_properties(properties)
+    print(f"Staged {written} of {len(properties)} properties from {filepath.name}")
+    return written
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage:")
+        print("  python staging_store.py --import <file.json>   Seed the store from a scrape JSON")
+        print("  python staging_store.py --export <file.json>   Export the store to JSON")
+        print("  python staging_store.py --count                 Show number of staged properties")
+        sys.exit(1)
+
+    store = StagingStore()
+    command = sys.argv[1]
+
+    if command == "--import" and len(sys.argv) > 2:
+        import_json(Path(sys.argv[2]), store)
+    elif command == "--export" and len(sys.argv) > 2:
+        store.export_json(Path(sys.argv[2]))
+    elif command == "--count":
+        print(f"{store.count():,} properties staged in {store.path}")
+    else:
+        print(f"Unknown command: {' '.join(sys.argv[1:])}")
+        sys.exit(1)
+
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
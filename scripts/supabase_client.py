@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Shared, lazily-created Supabase client for the scripts
+The client (and the supabase package itself) is only loaded on first use,
+so modules can be imported without credentials and without paying for the
+import. One cached client per process means every importer/uploader reuses
+the same HTTP connection pools.
+"""
+
+import os
+import threading
+
+_client = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide Supabase client, creating it on first call"""
+    global _client
+    if _client is not None:
+        return _client
+
+    with _lock:
+        if _client is None:
+            from dotenv import load_dotenv
+            from supabase import create_client
+
+            # Load environment variables
+            load_dotenv()
+
+            url = os.getenv('SUPABASE_URL') or os.getenv('VITE_SUPABASE_URL')
+            key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+            if not url or not key:
+                raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY environment variables")
+
+            # Service role key for write access
+            _client = create_client(url, key)
+
+    return _client
+
+
+def reset_client():
+    """Forget the cached client (e.g. after pointing SUPABASE_URL somewhere else)"""
+    global _client
+    with _lock:
+        _client = None
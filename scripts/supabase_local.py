@@ -0,0 +1,619 @@
+#!/usr/bin/env python3
+"""
+Local Supabase stand-in for offline load testing
+Implements the PostgREST table endpoints (select/insert/upsert/update/delete)
+and the Storage object endpoints the scripts use, backed by SQLite and the
+local filesystem, with configurable latency and error injection.
+
+Point any script at it by overriding the env vars:
+  python supabase_local.py --latency-ms 40 --error-rate 0.02
+  SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_SERVICE_ROLE_KEY=<any JWT-shaped string> \\
+      python import_pack2_to_supabase.py
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import mimetypes
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+DATA_DIR = Path(__file__).parent / "data" / "local_supabase"
+DEFAULT_PORT = 54321
+
+# Dummy JWT-shaped key - supabase-py validates the key format, the stand-in ignores it
+SERVICE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.local"
+
+# Unique constraints from schema.sql and the migrations, as PostgREST on_conflict
+# strings (every table also gets a unique id)
+UNIQUE_COLUMNS = {
+    'properties': ['mls_number'],
+    'leaderboard_ranks': ['pack_id,player_key'],
+    'leaderboard_score_buckets': ['pack_id,score'],
+    'leaderboard_rank_state': ['pack_id'],
+    'property_neighbors': ['property_id,neighbor_rank'],
+    'property_lookalikes': ['property_id,lookalike_rank'],
+}
+
+# Generated columns from the migrations: column -> (source column, function of the source value)
+GENERATED_COLUMNS = {
+    'properties': {
+        'image_hash': ('image_url', lambda url: hashlib.md5((url or '').encode('utf-8')).hexdigest()),
+    },
+}
+
+# PostgREST query parameters that aren't column filters
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+             'like': 'LIKE', 'ilike': 'LIKE'}
+
+
+class PostgrestError(Exception):
+    """An error response in PostgREST's JSON shape"""
+
+    def __init__(self, status: int, code: str, message: str, details: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {'code': code, 'message': message, 'details': details, 'hint': None}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_type(value) -> str:
+    """SQLite affinity from the first value seen, so string filter values compare correctly"""
+    if isinstance(value, (bool, int)):
+        return 'INTEGER'
+    if isinstance(value, float):
+        return 'REAL'
+    if value is None:
+        return ''
+    return 'TEXT'
+
+
+def _encode(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _in_values(raw: str) -> List[str]:
+    """Parse an in.(a,"b,c") list"""
+    return next(csv.reader([raw.strip('()')], skipinitialspace=True)) if raw.strip('()') else []
+
+
+class LocalDatabase:
+    """Schemaless SQLite tables: columns are added as rows with new keys arrive"""
+
+    def __init__(self, path: Path):
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.lock = threading.Lock()
+        self.columns: Dict[str, Dict[str, str]] = {}
+        for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table'"):
+            self.columns[table] = {
+                row['name']: row['type'] for row in self.conn.execute(f"PRAGMA table_info({_quote(table)})")
+            }
+
+    def _ensure_table(self, table: str):
+        if table in self.columns:
+            return
+        self.conn.execute(f"CREATE TABLE {_quote(table)} (id TEXT)")
+        self.conn.execute(f"CREATE UNIQUE INDEX {_quote(f'{table}_id_key')} ON {_quote(table)} (id)")
+        self.columns[table] = {'id': 'TEXT'}
+        for constraint in UNIQUE_COLUMNS.get(table, []):
+            columns = constraint.split(',')
+            for column in columns:
+                self._ensure_column(table, column, None)
+            self.conn.execute(
+                f"CREATE UNIQUE INDEX {_quote(table + '_' + '_'.join(columns) + '_key')} ON {_quote(table)} "
+                f"({','.join(_quote(c) for c in columns)})"
+            )
+
+    def _ensure_column(self, table: str, column: str, sample):
+        if column in self.columns[table]:
+            return
+        column_type = _column_type(sample)
+        self.conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {column_type}")
+        self.columns[table][column] = column_type
+
+    @staticmethod
+    def _generated(table: str, values: Dict) -> Dict:
+        """Generated column values for the source columns present in `values`"""
+        return {
+            column: compute(values[source])
+            for column, (source, compute) in GENERATED_COLUMNS.get(table, {}).items()
+            if source in values
+        }
+
+    def _prepare(self, table: str, rows: List[Dict]) -> List[Tuple[Dict, set]]:
+        """
+        Apply defaults/generated columns and make sure every column exists
+        Returns (row, explicitly written columns) - an upsert only overwrites the latter
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        prepared = []
+        for row in rows:
+            row = {**row, **self._generated(table, row)}
+            explicit = set(row)
+            full = {'id': str(uuid.uuid4()), 'created_at': now, **row}
+            # A generated column's source is NULL when it isn't written
+            for column, (source, compute) in GENERATED_COLUMNS.get(table, {}).items():
+                full.setdefault(column, compute(None))
+            prepared.append((full, explicit))
+
+        self._ensure_table(table)
+        for row, _ in prepared:
+            for column, value in row.items():
+                self._ensure_column(table, column, value)
+        return prepared
+
+    def _where(self, table: str, filters: List[Tuple[str, str]]) -> Tuple[str, List]:
+        clauses = []
+        params = []
+        for column, expression in filters:
+            if column in ('or', 'and', 'not'):
+                raise PostgrestError(400, 'PGRST100', f"'{column}' filters are not supported by the stand-in")
+            self._ensure_column(table, column, None)
+
+            negate = expression.startswith('not.')
+            if negate:
+                expression = expression[4:]
+            operator, _, value = expression.partition('.')
+
+            if operator == 'is':
+                clause = f"{_quote(column)} IS {'NULL' if value == 'null' else ('1' if value == 'true' else '0')}"
+            elif operator == 'in':
+                values = _in_values(value)
+                clause = f"{_quote(column)} IN ({','.join('?' * len(values))})" if values else "0"
+                params.extend(values)
+            elif operator in OPERATORS:
+                if operator in ('like', 'ilike'):
+                    value = value.replace('*', '%')
+                clause = f"{_quote(column)} {OPERATORS[operator]} ?"
+                params.append(value)
+            else:
+                raise PostgrestError(400, 'PGRST100', f"Unsupported operator '{operator}'")
+
+            clauses.append(f"NOT ({clause})" if negate else clause)
+
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _decode_row(self, row: sqlite3.Row, columns: Optional[List[str]]) -> Dict:
+        data = dict(row)
+        if columns:
+            data = {column: data.get(column) for column in columns}
+        return data
+
+    def select(self, table: str, select: str, filters: List[Tuple[str, str]], order: Optional[str],
+               limit: Optional[int], offset: int) -> Tuple[List[Dict], int]:
+        """Rows matching the filters plus the total count (before limit/offset)"""
+        with self.lock:
+            if table not in self.columns:
+                return [], 0
+            columns = None
+            if select and select != '*':
+                columns = [c.split(':')[-1].strip() for c in select.split(',') if '(' not in c and c.strip()]
+                for column in columns:
+                    self._ensure_column(table, column, None)
+
+            where, params = self._where(table, filters)
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}{where}", params).fetchone()[0]
+
+            sql = f"SELECT * FROM {_quote(table)}{where}"
+            if order:
+                terms = []
+                for term in order.split(','):
+                    column, *modifiers = term.split('.')
+                    self._ensure_column(table, column, None)
+                    direction = 'DESC' if 'desc' in modifiers else 'ASC'
+                    nulls = ' NULLS FIRST' if 'nullsfirst' in modifiers else (' NULLS LAST' if 'nullslast' in modifiers else '')
+                    terms.append(f"{_quote(column)} {direction}{nulls}")
+                sql += ' ORDER BY ' + ', '.join(terms)
+            if limit is not None or offset:
+                sql += ' LIMIT ? OFFSET ?'
+                params = params + [limit if limit is not None else -1, offset]
+
+            rows = [self._decode_row(row, columns) for row in self.conn.execute(sql, params)]
+            return rows, total
+
+    def insert(self, table: str, rows: List[Dict], on_conflict: Optional[str] = None,
+               resolution: Optional[str] = None) -> List[Dict]:
+        """Insert (or upsert, when resolution is merge-duplicates/ignore-duplicates) in one transaction"""
+        with self.lock:
+            prepared = self._prepare(table, rows)
+            conflict_column = on_conflict or 'id'
+            if resolution and conflict_column not in ('id', *UNIQUE_COLUMNS.get(table, [])):
+                raise PostgrestError(400, '42P10', f"there is no unique or exclusion constraint matching the ON CONFLICT specification")
+            conflict_columns = conflict_column.split(',')
+            conflict_target = ','.join(_quote(c) for c in conflict_columns)
+
+            written = []
+            try:
+                with self.conn:
+                    for row, explicit in prepared:
+                        columns = list(row)
+                        sql = (f"INSERT INTO {_quote(table)} ({','.join(_quote(c) for c in columns)}) "
+                               f"VALUES ({','.join('?' * len(columns))})")
+                        if resolution == 'merge-duplicates':
+                            updates = [c for c in columns if c in explicit and c not in ('id', *conflict_columns)]
+                            sql += f" ON CONFLICT ({conflict_target}) DO "
+                            sql += ('UPDATE SET ' + ', '.join(f"{_quote(c)}=excluded.{_quote(c)}" for c in updates)) if updates else 'NOTHING'
+                        elif resolution == 'ignore-duplicates':
+                            sql += f" ON CONFLICT ({conflict_target}) DO NOTHING"
+                        written.extend(dict(r) for r in self.conn.execute(sql + " RETURNING *", [_encode(row[c]) for c in columns]))
+            except sqlite3.IntegrityError as e:
+                raise PostgrestError(409, '23505', f'duplicate key value violates unique constraint "{table}_key"', str(e))
+            return written
+
+    def update(self, table: str, values: Dict, filters: List[Tuple[str, str]]) -> List[Dict]:
+        with self.lock:
+            if table not in self.columns:
+                return []
+            values = {**values, **self._generated(table, values)}
+            for column, value in values.items():
+                self._ensure_column(table, column, value)
+            where, params = self._where(table, filters)
+            assignments = ', '.join(f"{_quote(c)} = ?" for c in values)
+            try:
+                with self.conn:
+                    return [dict(r) for r in self.conn.execute(
+                        f"UPDATE {_quote(table)} SET {assignments}{where} RETURNING *",
+                        [_encode(v) for v in values.values()] + params,
+                    )]
+            except sqlite3.IntegrityError as e:
+                raise PostgrestError(409, '23505', f'duplicate key value violates unique constraint "{table}_key"', str(e))
+
+    def delete(self, table: str, filters: List[Tuple[str, str]]) -> List[Dict]:
+        with self.lock:
+            if table not in self.columns:
+                return []
+            if not filters:
+                raise PostgrestError(400, '21000', "DELETE requires a WHERE clause")
+            where, params = self._where(table, filters)
+            with self.conn:
+                return [dict(r) for r in self.conn.execute(f"DELETE FROM {_quote(table)}{where} RETURNING *", params)]
+
+
+class LocalStorage:
+    """Buckets are directories, objects are files"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        path = (self.root / bucket / key).resolve()
+        if not str(path).startswith(str(self.root.resolve())):
+            raise PostgrestError(400, 'InvalidKey', f"Invalid key: {key}")
+        return path
+
+    def bucket(self, bucket: str) -> Optional[Dict]:
+        path = self.root / bucket
+        if not path.is_dir():
+            return None
+        return {'id': bucket, 'name': bucket, 'public': True}
+
+    def create_bucket(self, bucket: str):
+        (self.root / bucket).mkdir(parents=True, exist_ok=True)
+
+    def put(self, bucket: str, key: str, data: bytes, upsert: bool):
+        if self.bucket(bucket) is None:
+            raise PostgrestError(404, '404', 'Bucket not found')
+        path = self._path(bucket, key)
+        if path.exists() and not upsert:
+            raise PostgrestError(400, '409', 'The resource already exists')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, bucket: str, key: str) -> Optional[bytes]:
+        path = self._path(bucket, key)
+        return path.read_bytes() if path.is_file() else None
+
+    def remove(self, bucket: str, keys: List[str]) -> List[Dict]:
+        removed = []
+        for key in keys:
+            path = self._path(bucket, key)
+            if path.is_file():
+                path.unlink()
+                removed.append({'name': key, 'bucket_id': bucket})
+        return removed
+
+    def list(self, bucket: str, prefix: str, limit: int, offset: int) -> List[Dict]:
+        """Storage API folder listing: files with metadata, sub-folders as placeholder entries"""
+        folder = self._path(bucket, prefix) if prefix else self.root / bucket
+        if not folder.is_dir():
+            return []
+
+        # Page by name first: only the returned files are stat'd and hashed
+        children = sorted((child for child in folder.iterdir() if not child.name.endswith('.tmp')),
+                          key=lambda p: p.name)
+        entries = []
+        for child in children[offset:offset + limit]:
+            if child.is_dir():
+                entries.append({'name': child.name, 'id': None, 'updated_at': None, 'metadata': None})
+                continue
+            stat = child.stat()
+            modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+            entries.append({
+                'name': child.name,
+                'id': str(uuid.uuid5(uuid.NAMESPACE_URL, f"{bucket}/{prefix}/{child.name}")),
+                'updated_at': modified,
+                'created_at': modified,
+                'metadata': {
+                    'size': stat.st_size,
+                    'mimetype': mimetypes.guess_type(child.name)[0] or 'application/octet-stream',
+                    'eTag': '"' + hashlib.md5(child.read_bytes()).hexdigest() + '"',
+                    'lastModified': modified,
+                },
+            })
+        return entries
+
+
+class LocalSupabase:
+    """
+    HTTP front end for LocalDatabase/LocalStorage
+    Usable as a context manager (sets SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY for the scripts)
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, port: int = 0, latency_ms: float = 0,
+                 jitter_ms: float = 0, error_rate: float = 0, error_status: int = 503):
+        data_dir = Path(data_dir)
+        data_dir.mkdir(parents=True, exist_ok=True)
+        self.db = LocalDatabase(data_dir / "postgrest.sqlite3")
+        self.storage = LocalStorage(data_dir / "storage")
+
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats: Dict[str, int] = {}
+        self.requests = 0
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.handle(self, 'GET')
+
+            def do_HEAD(self):
+                server.handle(self, 'HEAD')
+
+            def do_POST(self):
+                server.handle(self, 'POST')
+
+            def do_PUT(self):
+                server.handle(self, 'PUT')
+
+            def do_PATCH(self):
+                server.handle(self, 'PATCH')
+
+            def do_DELETE(self):
+                server.handle(self, 'DELETE')
+
+            def log_message(self, format, *args):
+                pass  # Stats are collected instead
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        os.environ['SUPABASE_URL'] = self.url
+        os.environ['SUPABASE_SERVICE_ROLE_KEY'] = SERVICE_KEY
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    @staticmethod
+    def _send(handler, status: int, body=None, headers: Optional[Dict] = None, raw: Optional[bytes] = None,
+              content_type: str = 'application/json'):
+        payload = raw if raw is not None else (json.dumps(body).encode() if body is not None else b'')
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        if handler.command != 'HEAD':
+            handler.wfile.write(payload)
+
+    def handle(self, handler, method: str):
+        parts = urlsplit(handler.path)
+        path = unquote(parts.path)
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+
+        if path == '/_stats':
+            return self._send(handler, 200, self.stats)
+
+        route = '/'.join(path.split('/')[:4])
+        self._count(f"{method} {route}")
+        self.requests += 1
+
+        # Injected latency (outside any lock, so concurrent clients overlap like on a real network)
+        delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self._count('injected_errors')
+            return self._send(handler, self.error_status, {'code': 'INJECTED', 'message': 'Injected failure',
+                                                         'details': None, 'hint': None})
+
+        try:
+            if path.startswith('/rest/v1/'):
+                self._handle_rest(handler, method, path[len('/rest/v1/'):], parts.query, body)
+            elif path.startswith('/storage/v1/'):
+                self._handle_storage(handler, method, path[len('/storage/v1/'):], body)
+            else:
+                self._send(handler, 404, {'message': 'Not found'})
+        except PostgrestError as e:
+            self._count(f"error {e.body['code']}")
+            self._send(handler, e.status, e.body)
+        except Exception as e:
+            self._count('error 500')
+            self._send(handler, 500, {'code': 'XX000', 'message': str(e), 'details': None, 'hint': None})
+
+    def _handle_rest(self, handler, method: str, table: str, query: str, body: bytes):
+        if table.startswith('rpc/'):
+            raise PostgrestError(404, 'PGRST202', f"Could not find the function {table[4:]} in the stand-in")
+
+        params = parse_qsl(query, keep_blank_values=True)
+        options = {k: v for k, v in params if k in RESERVED_PARAMS}
+        filters = [(k, v) for k, v in params if k not in RESERVED_PARAMS]
+        prefer = handler.headers.get('Prefer', '')
+        representation = 'return=representation' in prefer
+
+        if method in ('GET', 'HEAD'):
+            rows, total = self.db.select(
+                table, options.get('select', '*'), filters, options.get('order'),
+                int(options['limit']) if 'limit' in options else None, int(options.get('offset', 0)),
+            )
+            start = int(options.get('offset', 0))
+            content_range = f"{start}-{start + len(rows) - 1}/{total if 'count=' in prefer else '*'}" if rows else f"*/{total}"
+            return self._send(handler, 200, rows, {'Content-Range': content_range})
+
+        if method == 'POST':
+            payload = json.loads(body or b'[]')
+            rows = payload if isinstance(payload, list) else [payload]
+            resolution = None
+            if 'resolution=merge-duplicates' in prefer:
+                resolution = 'merge-duplicates'
+            elif 'resolution=ignore-duplicates' in prefer:
+                resolution = 'ignore-duplicates'
+            inserted = self.db.insert(table, rows, options.get('on_conflict'), resolution)
+            return self._send(handler, 201, inserted if representation else None)
+
+        if method == 'PATCH':
+            updated = self.db.update(table, json.loads(body or b'{}'), filters)
+            return self._send(handler, 200, updated if representation else None)
+
+        if method == 'DELETE':
+            deleted = self.db.delete(table, filters)
+            return self._send(handler, 200, deleted if representation else None)
+
+        raise PostgrestError(405, 'PGRST000', f"Method {method} not supported")
+
+    def _upload_payload(self, handler, body: bytes) -> bytes:
+        """storage3 sends multipart/form-data (field 'file'); older clients send the raw bytes"""
+        content_type = handler.headers.get('Content-Type', '')
+        if not content_type.startswith('multipart/form-data'):
+            return body
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        for part in message.iter_parts():
+            if part.get_param('name', header='content-disposition') == 'file':
+                return part.get_payload(decode=True)
+        raise PostgrestError(400, 'InvalidRequest', "multipart upload without a 'file' field")
+
+    def _handle_storage(self, handler, method: str, path: str, body: bytes):
+        segments = path.split('/')
+
+        if segments[0] == 'bucket':
+            if method == 'GET' and len(segments) > 1:
+                bucket = self.storage.bucket(segments[1])
+                if bucket is None:
+                    raise PostgrestError(404, '404', 'Bucket not found')
+                return self._send(handler, 200, bucket)
+            if method == 'POST':
+                payload = json.loads(body or b'{}')
+                self.storage.create_bucket(payload.get('id') or payload.get('name'))
+                return self._send(handler, 200, {'name': payload.get('name') or payload.get('id')})
+
+        if segments[0] == 'object':
+            if len(segments) > 2 and segments[1] == 'list' and method == 'POST':
+                payload = json.loads(body or b'{}')
+                entries = self.storage.list(segments[2], payload.get('prefix', '').strip('/'),
+                                            int(payload.get('limit', 100)), int(payload.get('offset', 0)))
+                return self._send(handler, 200, entries)
+
+            if len(segments) > 2 and segments[1] in ('public', 'authenticated'):
+                segments = segments[:1] + segments[2:]
+            if len(segments) < 2:
+                raise PostgrestError(400, 'InvalidRequest', 'Missing bucket')
+            bucket, key = segments[1], '/'.join(segments[2:])
+
+            if method in ('POST', 'PUT') and key:
+                upsert = method == 'PUT' or handler.headers.get('x-upsert', '').lower() == 'true'
+                self.storage.put(bucket, key, self._upload_payload(handler, body), upsert)
+                return self._send(handler, 200, {'Key': f"{bucket}/{key}"})
+
+            if method in ('GET', 'HEAD') and key:
+                data = self.storage.get(bucket, key)
+                if data is None:
+                    raise PostgrestError(404, '404', 'Object not found')
+                content_type = mimetypes.guess_type(key)[0] or 'application/octet-stream'
+                return self._send(handler, 200, raw=data, content_type=content_type)
+
+            if method == 'DELETE':
+                payload = json.loads(body or b'{}')
+                keys = payload.get('prefixes') or ([key] if key else [])
+                return self._send(handler, 200, self.storage.remove(bucket, keys))
+
+        raise PostgrestError(404, '404', f"Unsupported storage route: {method} /{path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local PostgREST + Storage stand-in for offline load tests")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help="SQLite database and storage files")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Added latency per request")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="Random +/- variation on the latency")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--bucket', action='append', default=['property-images'], help="Bucket to create up front")
+    parser.add_argument('--reset', action='store_true', help="Delete existing local data first")
+    args = parser.parse_args()
+
+    if args.reset and args.data_dir.exists():
+        shutil.rmtree(args.data_dir)
+
+    server = LocalSupabase(args.data_dir, args.port, args.latency_ms, args.jitter_ms,
+                           args.error_rate, args.error_status)
+    for bucket in args.bucket:
+        server.storage.create_bucket(bucket)
+
+    print(f"Local Supabase stand-in on {server.url} (data in {args.data_dir})")
+    print(f"  latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, error rate {args.error_rate:.1%} (HTTP {args.error_status})")
+    print(f"\nPoint the scripts at it with:")
+    print(f"  export SUPABASE_URL={server.url}")
+    print(f"  export SUPABASE_SERVICE_ROLE_KEY={SERVICE_KEY}")
+    print(f"\nRequest counts: GET {server.url}/_stats  (Ctrl+C to stop)\n")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -34,17 +34,17 @@ def main():
 
             print("Sample property (first result):")
             prop = scraper.properties[0]
-            print(f"  MLS Number: {prop.get('mls_number', 'N/A')}")
-            print(f"  Address: {prop.get('address', 'N/A')}")
-            print(f"  Price: ${prop.get('price', 0):,}")
-            print(f"  Bedrooms: {prop.get('bedrooms', 'N/A')}")
-            print(f"  Bathrooms: {prop.get('bathrooms', 'N/A')}")
-            print(f"  City: {prop.get('city', 'N/A')}")
-            print(f"  Province: {prop.get('province', 'N/A')}")
-            print(f"  Latitude: {prop.get('latitude', 'N/A')}")
-            print(f"  Longitude: {prop.get('longitude', 'N/A')}")
-            print(f"  Image URL: {prop.get('image_url', 'N/A')[:60]}...")
-            print(f"  Listing URL: {prop.get('url', 'N/A')[:60]}...")
+            print(f"  MLS Number: {prop.mls_number or 'N/A'}")
+            print(f"  Address: {prop.address or 'N/A'}")
+            print(f"  Price: ${prop.price or 0:,}")
+            print(f"  Bedrooms: {prop.bedrooms if prop.bedrooms is not None else 'N/A'}")
+            print(f"  Bathrooms: {prop.bathrooms if prop.bathrooms is not None else 'N/A'}")
+            print(f"  City: {prop.city or 'N/A'}")
+            print(f"  Province: {prop.province or 'N/A'}")
+            print(f"  Latitude: {prop.latitude if prop.latitude is not None else 'N/A'}")
+            print(f"  Longitude: {prop.longitude if prop.longitude is not None else 'N/A'}")
+            print(f"  Image URL: {(prop.image_url or 'N/A')[:60]}...")
+            print(f"  Listing URL: {(prop.listing_url or 'N/A')[:60]}...")
 
             # Save test results
             scraper.save_to_json("test_properties_realtor_improved.json")
@@ -66,27 +66,27 @@ def main():
             for prop in scraper.properties:
                 # Check REQUIRED fields
                 has_required = all([
-                    prop.get('mls_number'),
-                    prop.get('address'),
-                    prop.get('price'),
-                    prop.get('city'),
-                    prop.get('image_url')
+                    prop.mls_number,
+                    prop.address,
+                    prop.price,
+                    prop.city,
+                    prop.image_url
                 ])
 
                 if has_required:
                     complete_props += 1
 
                 # Check OPTIONAL fields (nice to have)
-                if not prop.get('sqft'):
+                if not prop.sqft:
                     missing_sqft += 1
 
-                if not prop.get('bedrooms'):
+                if not prop.bedrooms:
                     missing_beds += 1
 
-                if not prop.get('bathrooms'):
+                if not prop.bathrooms:
                     missing_baths += 1
 
-                if not prop.get('image_url'):
+                if not prop.image_url:
                     missing_images += 1
 
             print(f"\nREQUIRED FIELDS (address, price, city, image):")
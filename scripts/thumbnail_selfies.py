@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Generate small WebP thumbnails for leaderboard selfies
+SelfieCapture uploads full camera frames, but the leaderboard shows them as
+48px avatars. This lists the selfie bucket page by page, makes a square WebP
+thumbnail (2x the avatar size, for high-DPI screens) for every selfie that
+doesn't have one yet, uploads it to thumbs/ in the same bucket and fills in
+selfie_thumb_url (migration 011) on the matching leaderboard rows.
+Decoding/resizing runs in a process pool; downloads and uploads in a thread pool.
+
+Requires Pillow: pip install Pillow
+
+Usage:
+  python thumbnail_selfies.py                # Thumbnail new selfies and backfill URLs
+  python thumbnail_selfies.py --dry-run      # Only count what is missing
+  python thumbnail_selfies.py --workers 8 --size 128 --quality 70
+"""
+
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import PurePosixPath
+from typing import Dict, Iterator, List, Optional, Set
+
+from supabase_client import get_client
+from instrumentation import Instrumentation
+
+BUCKET_NAME = "leaderboard-selfies"
+SELFIE_PREFIX = "selfies"
+THUMB_PREFIX = "thumbs"
+
+THUMB_SIZE = 96  # px square - the leaderboard avatar is 48px
+WEBP_QUALITY = 75
+LIST_PAGE_SIZE = 1000
+CHUNK_SIZE = 64  # Selfies in flight at once
+IO_WORKERS = 8
+CACHE_SECONDS = 31536000  # Thumbnail names are derived from unique selfie names, so they never change
+
+ROW_PAGE_SIZE = 1000
+
+
+def _require_pil():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        raise ImportError("Selfie thumbnails require Pillow: pip install Pillow")
+    return Image, ImageOps
+
+
+def make_thumbnail(data: bytes, size: int = THUMB_SIZE, quality: int = WEBP_QUALITY) -> bytes:
+    """Center-cropped square WebP (runs in a worker process)"""
+    Image, ImageOps = _require_pil()
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert('RGB')
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, format='WEBP', quality=quality, method=6)
+    return out.getvalue()
+
+
+def thumb_path(selfie_name: str) -> str:
+    """selfies/<name>.jpg -> thumbs/<name>.webp"""
+    return f"{THUMB_PREFIX}/{PurePosixPath(selfie_name).stem}.webp"
+
+
+def object_path(public_url: str) -> Optional[str]:
+    """Object path inside the selfie bucket from its public URL"""
+    marker = f"/object/public/{BUCKET_NAME}/"
+    if not public_url or marker not in public_url:
+        return None
+    return public_url.split(marker, 1)[1].split('?', 1)[0]
+
+
+class SelfieThumbnailer:
+    def __init__(self, size: int = THUMB_SIZE, quality: int = WEBP_QUALITY,
+                 workers: Optional[int] = None, dry_run: bool = False):
+        self.supabase = get_client()
+        self.bucket = self.supabase.storage.from_(BUCKET_NAME)
+        self.metrics = Instrumentation()
+        self.size = size
+        self.quality = quality
+        self.workers = workers or os.cpu_count() or 2
+        self.dry_run = dry_run
+        self.created_count = 0
+        self.failed_count = 0
+        self.backfilled_count = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def list_objects(self, prefix: str) -> Iterator[Dict]:
+        """Every file under `prefix`, LIST_PAGE_SIZE per request (folders are skipped)"""
+        offset = 0
+        while True:
+            with self.metrics.stage('list_page'):
+                page = self.bucket.list(prefix, {
+                    'limit': LIST_PAGE_SIZE,
+                    'offset': offset,
+                    'sortBy': {'column': 'name', 'order': 'asc'},
+                }) or []
+            for entry in page:
+                if entry.get('id'):
+                    yield entry
+            if len(page) < LIST_PAGE_SIZE:
+                return
+            offset += LIST_PAGE_SIZE
+
+    def _download(self, path: str) -> Optional[bytes]:
+        try:
+            with self.metrics.stage('download'):
+                return self.bucket.download(path)
+        except Exception as e:
+            self.metrics.error('download', e)
+            print(f"  ✗ Download failed for {path}: {str(e)[:100]}")
+            return None
+
+    def _upload(self, path: str, data: bytes) -> bool:
+        try:
+            with self.metrics.stage('upload'):
+                self.bucket.upload(path, data, file_options={
+                    "content-type": "image/webp",
+                    "cache-control": str(CACHE_SECONDS),
+                    "upsert": "true",
+                })
+            return True
+        except Exception as e:
+            self.metrics.error('upload', e)
+            print(f"  ✗ Upload failed for {path}: {str(e)[:100]}")
+            return False
+
+    def create_thumbnails(self, pending: List[str], existing: Set[str]):
+        """Download, thumbnail and upload `pending` selfie paths in chunks"""
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as io_pool, \
+                ProcessPoolExecutor(max_workers=self.workers) as cpu_pool:
+            for i in range(0, len(pending), CHUNK_SIZE):
+                chunk = pending[i:i + CHUNK_SIZE]
+                originals = list(io_pool.map(self._download, chunk))
+                jobs = [
+                    (path, data, cpu_pool.submit(make_thumbnail, data, self.size, self.quality))
+                    for path, data in zip(chunk, originals) if data
+                ]
+                self.failed_count += len(chunk) - len(jobs)
+
+                uploads = []
+                for path, data, job in jobs:
+                    try:
+                        with self.metrics.stage('thumbnail'):
+                            thumb = job.result()
+                    except Exception as e:
+                        self.failed_count += 1
+                        self.metrics.error('thumbnail', e)
+                        print(f"  ✗ Could not thumbnail {path}: {str(e)[:100]}")
+                        continue
+                    self.bytes_before += len(data)
+                    self.bytes_after += len(thumb)
+                    uploads.append((path, thumb))
+
+                target_paths = [thumb_path(path) for path, _ in uploads]
+                results = io_pool.map(self._upload, target_paths, [thumb for _, thumb in uploads])
+                for target, ok in zip(target_paths, results):
+                    if ok:
+                        existing.add(target)
+                        self.created_count += 1
+                        self.metrics.count('thumbnails_created')
+                    else:
+                        self.failed_count += 1
+
+                print(f"  ✓ {min(i + CHUNK_SIZE, len(pending)):,} / {len(pending):,} selfies processed")
+
+    def backfill_urls(self, existing: Set[str]):
+        """Set selfie_thumb_url on leaderboard (and rank table) rows whose thumbnail now exists"""
+        cursor = None
+        while True:
+            query = (
+                self.supabase.table('leaderboard')
+                .select('id,selfie_url,created_at')
+                .not_.is_('selfie_url', 'null')
+                .is_('selfie_thumb_url', 'null')
+            )
+            if cursor:
+                query = query.gt('created_at', cursor)
+            with self.metrics.stage('backfill_page'):
+                rows = query.order('created_at').limit(ROW_PAGE_SIZE).execute().data or []
+            if not rows:
+                return
+
+            for row in rows:
+                source = object_path(row['selfie_url'])
+                target = thumb_path(source) if source else None
+                if target not in existing:
+                    continue
+                thumb_url = self.bucket.get_public_url(target)
+                if not self.dry_run:
+                    with self.metrics.stage('backfill_row'):
+                        (self.supabase.table('leaderboard').update({'selfie_thumb_url': thumb_url})
+                         .eq('id', row['id']).execute())
+                        (self.supabase.table('leaderboard_ranks').update({'selfie_thumb_url': thumb_url})
+                         .eq('selfie_url', row['selfie_url']).execute())
+                self.backfilled_count += 1
+                self.metrics.count('rows_backfilled')
+
+            if len(rows) < ROW_PAGE_SIZE:
+                return
+            cursor = rows[-1]['created_at']
+
+    def run(self, limit: Optional[int] = None):
+        print(f"\n{'='*60}")
+        print(f"SELFIE THUMBNAILS - {BUCKET_NAME}")
+        print(f"{'='*60}")
+
+        existing = {f"{THUMB_PREFIX}/{entry['name']}" for entry in self.list_objects(THUMB_PREFIX)}
+        selfies = [f"{SELFIE_PREFIX}/{entry['name']}" for entry in self.list_objects(SELFIE_PREFIX)]
+        pending = [path for path in selfies if thumb_path(path) not in existing]
+        if limit:
+            pending = pending[:limit]
+        print(f"  {len(selfies):,} selfies, {len(existing):,} thumbnails, {len(pending):,} to create")
+
+        if pending and not self.dry_run:
+            _require_pil()
+            self.create_thumbnails(pending, existing)
+        self.backfill_urls(existing)
+
+    def print_summary(self):
+        print(f"\n{'='*60}")
+        print(f"SELFIE THUMBNAIL SUMMARY{' (dry run)' if self.dry_run else ''}")
+        print(f"{'='*60}")
+        print(f"✓ Thumbnails created: {self.created_count:,}")
+        print(f"✓ Leaderboard rows backfilled: {self.backfilled_count:,}")
+        print(f"✗ Failed: {self.failed_count:,}")
+        if self.bytes_before:
+            print(f"  Size: {self.bytes_before / 1024:,.0f} KB of originals -> "
+                  f"{self.bytes_after / 1024:,.0f} KB of thumbnails "
+                  f"({100 - self.bytes_after * 100 / self.bytes_before:.0f}% smaller)")
+        print(f"{'='*60}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create WebP thumbnails for leaderboard selfies")
+    parser.add_argument('--size', type=int, default=THUMB_SIZE, help="Thumbnail edge in px")
+    parser.add_argument('--quality', type=int, default=WEBP_QUALITY, help="WebP quality (0-100)")
+    parser.add_argument('--workers', type=int, help="Thumbnailing processes (default: CPU count)")
+    parser.add_argument('--limit', type=int, help="Only process this many new selfies")
+    parser.add_argument('--dry-run', action='store_true', help="Only count missing thumbnails/URLs")
+    args = parser.parse_args()
+
+    thumbnailer = SelfieThumbnailer(size=args.size, quality=args.quality,
+                                    workers=args.workers, dry_run=args.dry_run)
+    thumbnailer.run(limit=args.limit)
+    thumbnailer.print_summary()
+    thumbnailer.metrics.export('thumbnail_selfies')
+
+
+if __name__ == "__main__":
+    main()
@@ -4,24 +4,17 @@ Upload property images to Supabase Storage
 Reads from scraped JSON and uploads images to a Supabase bucket
 """
 
-import os
-import json
+import sys
 import requests
 from pathlib import Path
 from typing import Optional
-from dotenv import load_dotenv
-from supabase import create_client, Client
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+from supabase_client import get_client
+from staging_store import StagingStore
+from rate_limiter import rate_limiter
+from instrumentation import Instrumentation
+from data_shards import write_shards
+from property_record import as_record, load_records, save_records
 
 # Configuration
 BUCKET_NAME = "property-images"
@@ -30,11 +23,12 @@ DATA_DIR = Path(__file__).parent / "data"
 
 class ImageUploader:
     def __init__(self):
-        self.supabase = supabase
+        self.supabase = get_client()
         self.session = requests.Session()
         self.uploaded_count = 0
         self.failed_count = 0
         self.skipped_count = 0
+        self.metrics = Instrumentation()
 
     def ensure_bucket_exists(self):
         """Create the storage bucket if it doesn't exist"""
@@ -67,63 +61,78 @@ class ImageUploader:
 
         try:
             # Download image
-            response = self.session.get(image_url, timeout=10)
+            rate_limiter.acquire(image_url)
+            with self.metrics.stage('download'):
+                response = self.session.get(image_url, timeout=10)
+            rate_limiter.report(image_url, status_code=response.status_code)
             response.raise_for_status()
+            self.metrics.count('bytes_downloaded', len(response.content))
 
             # Generate filename
             filename = f"{property_id}.jpg"
             file_path = f"properties/{filename}"
 
             # Upload to Supabase Storage
-            self.supabase.storage.from_(BUCKET_NAME).upload(
-                file_path,
-                response.content,
-                file_options={"content-type": "image/jpeg", "upsert": "true"}
-            )
+            with self.metrics.stage('upload'):
+                self.supabase.storage.from_(BUCKET_NAME).upload(
+                    file_path,
+                    response.content,
+                    file_options={"content-type": "image/jpeg", "upsert": "true"}
+                )
 
             # Get public URL
             public_url = self.supabase.storage.from_(BUCKET_NAME).get_public_url(file_path)
 
             self.uploaded_count += 1
+            self.metrics.count('images_uploaded')
+            self.metrics.count('bytes_uploaded', len(response.content))
             return public_url
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
                 # Image not found, skip
                 self.skipped_count += 1
+                self.metrics.count('images_skipped')
                 return None
             else:
                 self.failed_count += 1
+                self.metrics.count('images_failed')
+                self.metrics.error('download', e)
                 print(f"  ✗ HTTP error downloading {image_url}: {e}")
                 return None
         except Exception as e:
             self.failed_count += 1
+            self.metrics.count('images_failed')
+            self.metrics.error('upload', e)
             print(f"  ✗ Error uploading {property_id}: {str(e)[:100]}")
             return None
 
-    def process_properties(self, json_file: Path):
+    def process_properties(self, json_file: Path, store: Optional[StagingStore] = None):
         """
         Process properties from JSON and upload images
-        Updates the JSON file with Supabase image URLs
+        Updates the JSON file with Supabase image URLs, or attaches them to the
+        staging store in place when one is given
         """
         print(f"\n{'='*60}")
-        print(f"Processing images from {json_file.name}")
+        print(f"Processing images from {store.path.name if store else json_file.name}")
         print(f"{'='*60}\n")
 
-        if not json_file.exists():
+        if not store and not json_file.exists():
             print(f"File not found: {json_file}")
             return
 
         # Load properties
-        with open(json_file, 'r', encoding='utf-8') as f:
-            properties = json.load(f)
+        if store:
+            properties = [as_record(prop) for prop in store.load_properties()]
+        else:
+            properties = load_records(json_file)
 
         print(f"Found {len(properties)} properties")
 
         # Process each property
         for i, prop in enumerate(properties, 1):
-            image_url = prop.get('image_url')
-            mls_number = prop.get('mls_number', f'prop_{i}')
+            image_url = prop.image_url
+            mls_number = prop.mls_number or f'prop_{i}'
 
             if not image_url:
                 self.skipped_count += 1
@@ -134,15 +143,20 @@ class ImageUploader:
 
             if public_url:
                 # Update property with Supabase URL
-                prop['supabase_image_url'] = public_url
+                prop.supabase_image_url = public_url
+                if store:
+                    store.set_supabase_image_url(mls_number, public_url)
 
             if i % 10 == 0:
                 print(f"  Progress: {i}/{len(properties)} ({self.uploaded_count} uploaded)")
 
+        if store:
+            print(f"\n✓ Attached Supabase URLs in {store.path}")
+            return
+
         # Save updated JSON
         output_file = json_file.parent / f"{json_file.stem}_with_supabase_urls.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(properties, f, indent=2)
+        write_shards(save_records(properties, output_file), output_file)
 
         print(f"\n✓ Saved updated properties to {output_file}")
 
@@ -165,7 +179,9 @@ def main():
 
     # Process Canadian properties
     ca_json = DATA_DIR / "properties_ca_selenium.json"
-    if ca_json.exists():
+    if '--staging' in sys.argv[1:]:
+        uploader.process_properties(ca_json, store=StagingStore())
+    elif ca_json.exists():
         uploader.process_properties(ca_json)
     else:
         # Try test file
@@ -177,6 +193,8 @@ def main():
             return
 
     uploader.print_summary()
+    uploader.metrics.print_summary()
+    uploader.metrics.export('upload_images')
 
     print("\nNext steps:")
     print("1. Run import_to_supabase.py to import properties to database")
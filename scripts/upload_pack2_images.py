@@ -4,23 +4,15 @@ Upload Pack 2 property images from local directory to Supabase Storage
 Reads images from scripts/images_ca_selenium/ and uploads them
 """
 
-import os
-import json
+import sys
 from pathlib import Path
 from typing import Optional
-from dotenv import load_dotenv
-from supabase import create_client, Client
 
-# Load environment variables
-load_dotenv()
-
-SUPABASE_URL = os.getenv('SUPABASE_URL')
-SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
-
-if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
-    raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+from supabase_client import get_client
+from staging_store import StagingStore
+from instrumentation import Instrumentation
+from data_shards import write_shards
+from property_record import as_record, load_records, save_records
 
 # Configuration
 BUCKET_NAME = "property-images"
@@ -30,10 +22,11 @@ IMAGES_DIR = Path(__file__).parent / "images_ca_selenium"
 
 class Pack2ImageUploader:
     def __init__(self):
-        self.supabase = supabase
+        self.supabase = get_client()
         self.uploaded_count = 0
         self.failed_count = 0
         self.skipped_count = 0
+        self.metrics = Instrumentation()
 
     def ensure_bucket_exists(self):
         """Create the storage bucket if it doesn't exist"""
@@ -70,33 +63,39 @@ class Pack2ImageUploader:
             file_path = f"pack2/{filename}"  # Store Pack 2 images in separate folder
 
             # Upload to Supabase Storage
-            self.supabase.storage.from_(BUCKET_NAME).upload(
-                file_path,
-                image_data,
-                file_options={"content-type": "image/jpeg", "upsert": "true"}
-            )
+            with self.metrics.stage('upload'):
+                self.supabase.storage.from_(BUCKET_NAME).upload(
+                    file_path,
+                    image_data,
+                    file_options={"content-type": "image/jpeg", "upsert": "true"}
+                )
 
             # Get public URL
             public_url = self.supabase.storage.from_(BUCKET_NAME).get_public_url(file_path)
 
             self.uploaded_count += 1
+            self.metrics.count('images_uploaded')
+            self.metrics.count('bytes_uploaded', len(image_data))
             return public_url
 
         except Exception as e:
             self.failed_count += 1
+            self.metrics.count('images_failed')
+            self.metrics.error('upload', e)
             print(f"  ✗ Error uploading {mls_number}: {str(e)[:100]}")
             return None
 
-    def process_properties(self, json_file: Path):
+    def process_properties(self, json_file: Path, store: Optional[StagingStore] = None):
         """
         Process properties from JSON and upload local images
-        Updates the JSON file with Supabase image URLs
+        Updates the JSON file with Supabase image URLs, or attaches them to the
+        staging store in place when one is given
         """
         print(f"\n{'='*60}")
-        print(f"Processing Pack 2 images from {json_file.name}")
+        print(f"Processing Pack 2 images from {store.path.name if store else json_file.name}")
         print(f"{'='*60}\n")
 
-        if not json_file.exists():
+        if not store and not json_file.exists():
             print(f"File not found: {json_file}")
             return
 
@@ -105,8 +104,10 @@ class Pack2ImageUploader:
             return
 
         # Load properties
-        with open(json_file, 'r', encoding='utf-8') as f:
-            properties = json.load(f)
+        if store:
+            properties = [as_record(prop) for prop in store.load_properties()]
+        else:
+            properties = load_records(json_file)
 
         print(f"Found {len(properties)} properties")
         print(f"Images directory: {IMAGES_DIR}")
@@ -117,14 +118,14 @@ class Pack2ImageUploader:
 
         # Process each property
         for i, prop in enumerate(properties, 1):
-            mls_number = prop.get('mls_number', '')
+            mls_number = prop.mls_number
 
             if not mls_number:
                 self.skipped_count += 1
                 continue
 
             # Find the local image file
-            local_image_path = prop.get('local_image_path')
+            local_image_path = prop.local_image_path
 
             if local_image_path:
                 # Use the path specified in the JSON
@@ -144,15 +145,20 @@ class Pack2ImageUploader:
 
             if public_url:
                 # Update property with Supabase URL
-                prop['supabase_image_url'] = public_url
+                prop.supabase_image_url = public_url
+                if store:
+                    store.set_supabase_image_url(mls_number, public_url)
 
             if i % 50 == 0:
                 print(f"  Progress: {i}/{len(properties)} ({self.uploaded_count} uploaded, {self.failed_count} failed, {self.skipped_count} skipped)")
 
+        if store:
+            print(f"\n✓ Attached Supabase URLs in {store.path}")
+            return
+
         # Save updated JSON
         output_file = DATA_DIR / "properties_ca_selenium_with_supabase_urls.json"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(properties, f, indent=2)
+        write_shards(save_records(properties, output_file), output_file)
 
         print(f"\n✓ Saved updated properties to {output_file}")
 
@@ -192,8 +198,9 @@ def main():
 
     # Process Canadian properties
     ca_json = DATA_DIR / "properties_ca_selenium.json"
-    if ca_json.exists():
-        print(f"✓ Found property data: {ca_json.name}")
+    use_staging = '--staging' in sys.argv[1:]
+    if use_staging or ca_json.exists():
+        print(f"✓ Found property data: {'staging store' if use_staging else ca_json.name}")
 
         # Confirm before proceeding
         print(f"\nThis will upload {image_count:,} images to Supabase Storage.")
@@ -204,12 +211,14 @@ def main():
             print("Upload cancelled.")
             return
 
-        uploader.process_properties(ca_json)
+        uploader.process_properties(ca_json, store=StagingStore() if use_staging else None)
     else:
         print(f"✗ Property JSON not found: {ca_json}")
         return
 
     uploader.print_summary()
+    uploader.metrics.print_summary()
+    uploader.metrics.export('upload_pack2_images')
 
     print("\nNext steps:")
     print("1. Verify images uploaded correctly in Supabase dashboard")
@@ -12,6 +12,7 @@ export default function DevPage({ onBack }) {
   const [message, setMessage] = useState('')
   const [dataFiles, setDataFiles] = useState([])
   const [selectedFile, setSelectedFile] = useState(null)
+  const [filePage, setFilePage] = useState(null) // { page, pages, pageSize, totalRows } of the loaded file
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false)
   const [selectedPackId, setSelectedPackId] = useState(2) // Default to Pack 2 for new uploads
 
@@ -69,12 +70,12 @@ export default function DevPage({ onBack }) {
     }
   }
 
-  // Load selected file
-  const handleLoadFile = async (filename) => {
+  // Load one page of the selected file (only that page is fetched)
+  const handleLoadFile = async (filename, page = 0) => {
     setLoading(true)
-    setMessage('')
+    if (page === 0) setMessage('')
     try {
-      const response = await fetch(`/api/data-files?file=${encodeURIComponent(filename)}`)
+      const response = await fetch(`/api/data-files?file=${encodeURIComponent(filename)}&page=${page}`)
       const result = await response.json()
 
       if (response.ok) {
@@ -84,10 +85,18 @@ export default function DevPage({ onBack }) {
           setProperties(data)
           setCurrentIndex(0)
           setSelectedFile(filename)
+          setFilePage({
+            page: result.page,
+            pages: result.pages,
+            pageSize: result.page_size,
+            totalRows: result.total_rows
+          })
           if (data.length > 0) {
             await checkForDuplicates(data[0])
           }
-          setMessage(`Loaded ${data.length} properties from ${filename}`)
+          if (page === 0) {
+            setMessage(`Loaded ${result.total_rows} properties from ${filename}`)
+          }
         } else {
           setMessage('Invalid file format. Expected an array of properties.')
         }
@@ -197,6 +206,22 @@ export default function DevPage({ onBack }) {
     }
   }
 
+  // Next property in add mode, fetching the file's next page when this one runs out
+  // Returns false once the whole file has been processed
+  const advanceInFile = async () => {
+    if (currentIndex < properties.length - 1) {
+      const nextIndex = currentIndex + 1
+      setCurrentIndex(nextIndex)
+      await checkForDuplicates(properties[nextIndex])
+      return true
+    }
+    if (filePage && filePage.page < filePage.pages - 1) {
+      await handleLoadFile(selectedFile, filePage.page + 1)
+      return true
+    }
+    return false
+  }
+
   // Add property (add mode)
   const handleAdd = async () => {
     setLoading(true)
@@ -218,11 +243,7 @@ export default function DevPage({ onBack }) {
       setMessage(`Property added successfully to Pack ${selectedPackId}`)
 
       // Move to next property
-      if (currentIndex < properties.length - 1) {
-        const nextIndex = currentIndex + 1
-        setCurrentIndex(nextIndex)
-        await checkForDuplicates(properties[nextIndex])
-      } else {
+      if (!(await advanceInFile())) {
         setMessage('All properties processed!')
         setMode(null)
       }
@@ -236,10 +257,7 @@ export default function DevPage({ onBack }) {
 
   // Skip property (add mode)
   const handleSkip = async () => {
-    if (currentIndex < properties.length - 1) {
-      const nextIndex = currentIndex + 1
-      setCurrentIndex(nextIndex)
-      await checkForDuplicates(properties[nextIndex])
+    if (await advanceInFile()) {
       setMessage('')
     } else {
       setMessage('All properties processed!')
@@ -296,6 +314,7 @@ export default function DevPage({ onBack }) {
                       <h3>{file.name}</h3>
                       <p className="file-meta">
                         Size: {(file.size / 1024).toFixed(2)} KB |
+                        {file.rows !== null && file.rows !== undefined && ` ${file.rows} properties (${file.pages} pages) |`}
                         Modified: {new Date(file.modified).toLocaleString()}
                       </p>
                     </div>
@@ -415,7 +434,8 @@ export default function DevPage({ onBack }) {
             <div className="review-header">
               <h2>Add to Database</h2>
               <p className="progress">
-                Property {currentIndex + 1} of {properties.length}
+                Property {(filePage ? filePage.page * filePage.pageSize : 0) + currentIndex + 1} of{' '}
+                {filePage ? filePage.totalRows : properties.length}
               </p>
             </div>
 
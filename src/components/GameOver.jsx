@@ -22,26 +22,17 @@ export default function GameOver({ score, totalGuesses, onPlayAgain, onViewLeade
     try {
       setLoadingPercentile(true)
 
-      // Get all scores for this pack
+      // Point lookup in the precomputed score buckets (migration 009)
+      // Returns 100 when nobody has played this pack yet
       const { data, error: fetchError } = await supabase
-        .from('leaderboard')
-        .select('score')
-        .eq('pack_id', packId)
+        .rpc('get_score_percentile', {
+          filter_pack_id: packId,
+          player_score: score
+        })
 
       if (fetchError) throw fetchError
 
-      if (!data || data.length === 0) {
-        setPercentile(100) // First score ever!
-        return
-      }
-
-      // Count how many scores are lower than current score
-      const lowerScores = data.filter(entry => entry.score < score).length
-      const totalScores = data.length
-
-      // Calculate percentile
-      const percentage = Math.round((lowerScores / totalScores) * 100)
-      setPercentile(percentage)
+      setPercentile(data && data.length > 0 ? data[0].percentile : 100)
     } catch (err) {
       console.error('Error calculating percentile:', err)
       setPercentile(null)
@@ -132,19 +123,19 @@ export default function GameOver({ score, totalGuesses, onPlayAgain, onViewLeade
                 </p>
               ) : percentile >= 90 ? (
                 <p className="percentile-text top-tier">
-                  Your run beats <strong>{percentile}%</strong> of all other leaderboard entries!
+                  Your run beats <strong>{percentile}%</strong> of all other players!
                 </p>
               ) : percentile >= 70 ? (
                 <p className="percentile-text good">
-                  Your run beats <strong>{percentile}%</strong> of all other leaderboard entries!
+                  Your run beats <strong>{percentile}%</strong> of all other players!
                 </p>
               ) : percentile >= 50 ? (
                 <p className="percentile-text average">
-                  Your run beats <strong>{percentile}%</strong> of all other leaderboard entries!
+                  Your run beats <strong>{percentile}%</strong> of all other players!
                 </p>
               ) : (
                 <p className="percentile-text below-average">
-                  Your run beats <strong>{percentile}%</strong> of all other leaderboard entries. Keep practicing!
+                  Your run beats <strong>{percentile}%</strong> of all other players. Keep practicing!
                 </p>
               )}
             </div>
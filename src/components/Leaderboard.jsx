@@ -109,8 +109,9 @@ export default function Leaderboard({ limit = 10, showTitle = true, packId = 2 }
             <div className="player-info">
               {score.selfie_url ? (
                 <img
-                  src={score.selfie_url}
+                  src={score.selfie_thumb_url || score.selfie_url}
                   alt={`${score.player_name}'s selfie`}
+                  loading="lazy"
                   className="player-selfie clickable"
                   onClick={() => handleSelfieClick(score.selfie_url, score.player_name)}
                 />